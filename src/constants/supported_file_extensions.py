@@ -19,8 +19,16 @@ ANDROID_PLAYER_SUPPORTED_FILE_EXTENSIONS: Final = (
 )
 LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS: Final = (
     ".mp3",
+    ".mp4",
+    ".m4a",
+    ".aac",
+    ".flac",
+    ".wav",
+    ".ogg",
+    ".opus",
+    ".mkv",
 )
 WINDOWS_PLAYER_SUPPORTED_FILE_EXTENSIONS: Final = (
     ".mp3",
 )
-# Currently, given file extensions are dummy ones except android player
+# Currently, given file extensions are dummy ones except android & linux players
@@ -1 +1,5 @@
 from .audioplayer import AudioPlayer
+from .playqueue import PlayQueue
+from .soundpool import SoundPool
+from .soundbank import SoundBank
+from .events import PlayerEventDispatcher
@@ -1,9 +1,31 @@
 """
-Not Implemented
+Kivy audio implementation for Linux, decoding to PCM and playing through a pluggable sink
+=========================================================================================
+A decoder thread fills a lock-free ring buffer with the frames decoded by ffmpeg,
+an output thread drains it into the sink (`DeviceSink` by default).
+Decoding never waits on the device and the position is counted in frames handed to the sink,
+minus the ones it has not played yet (its `latency`). At the end of the audio file the sink plays out
+what it buffered before the sound stops, stopping or seeking drops it right away.
+Every block goes through the sound's `dsp_chain` (with the volume) on its way to the sink,
+then to its taps (see `add_tap`).
+Tweak the class attributes (or the ones of an instance) to configure it:
+
+    LinuxSoundPlayer.sink_factory = lambda: NullSink(realtime=False)
+    LinuxSoundPlayer.buffer_duration = 4
 """
 
-from src.constants.supported_file_extensions import LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS
+import math
+import time
+import threading
+from typing import Callable
+from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.core.audio import Sound
+from src.constants.supported_file_extensions import LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS
+from src.utils.audio.decoding import PCM_SAMPLE_RATE, PCM_CHANNELS, PCM_FRAME_SIZE, PCMDecoder, probe_duration
+from src.utils.audio.audioplayer.ringbuffer import RingBuffer
+from src.utils.audio.audioplayer.sinks import AudioSink, DeviceSink
+from src.utils.audio.audioplayer.dsp import DSPChain
 
 __all__ = (
     "LinuxSoundPlayer",
@@ -11,7 +33,254 @@ __all__ = (
 
 
 class LinuxSoundPlayer(Sound):
+    sink_factory: Callable[[], AudioSink] = DeviceSink
+    """
+    Callable returning a new sink for every playback
+    """
+    buffer_duration = 2.0
+    """
+    Seconds of decoded frames the ring buffer holds
+    """
+    prebuffer_duration = 0.2
+    """
+    Seconds of decoded frames buffered before the output starts
+    """
+    block_frames = 1024
+    """
+    Frames per block handed to the sink
+    """
+    drain_timeout = 1.0
+    """
+    Seconds the sink may take to play out its buffered frames beyond its estimated latency
+    """
 
     @staticmethod
     def extensions():
-        return LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS
+        return tuple(extension.lstrip(".") for extension in LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS)
+
+    def __init__(self, **kwargs):
+        self._length = 0
+        self._loaded = False
+        self._position = 0
+        self._frames_written = 0
+        self._decoding_done = False
+        self._underruns = 0
+        self._generation = 0
+        self._sink = None
+        self._stop_event = None
+        self._output_thread = None
+        self._dsp_chain = DSPChain()
+        self._dsp_chain.prepare(PCM_SAMPLE_RATE, PCM_CHANNELS)
+        self._taps = ()
+        super(LinuxSoundPlayer, self).__init__(**kwargs)
+
+    def load(self):
+        self._stop_playback()
+        self._position = 0
+        try:
+            self._length = probe_duration(self.source) or 0
+            self._loaded = True
+        except (OSError, ValueError) as exception:
+            Logger.warning(f"LinuxSoundPlayer: Unable to load {self.source!r}: {exception}")
+            self._length = 0
+            self._loaded = False
+
+    def unload(self):
+        self.stop()
+        self._loaded = False
+        self._position = 0
+
+    def play(self):
+        if not self._loaded:
+            return
+        if self._stop_event is None and not self._start_playback(self._position):
+            return
+        super(LinuxSoundPlayer, self).play()
+
+    def stop(self):
+        self._stop_playback()
+        super(LinuxSoundPlayer, self).stop()
+
+    def seek(self, position):
+        position = min(max(position, 0), self._length)
+        if self._stop_event is None:
+            self._position = position
+            return
+        self._stop_playback()
+        self._start_playback(position)
+
+    def get_pos(self):
+        sink = self._sink
+        if self._stop_event is None or sink is None:
+            return self._position
+        played = max(self._frames_written / PCM_SAMPLE_RATE - sink.latency, 0)
+        return min(self._position + played, self._length or math.inf)
+
+    def _get_length(self):
+        return self._length
+
+    def _start_playback(self, position: float) -> bool:
+        """
+        Private method to start the decoder & output threads of a playback from the given position
+        :param position: Position in seconds
+        :return: bool, whether the playback started
+        """
+        # Looked up on the class (or set on the instance) so plain functions are not bound as methods
+        sink = self.__dict__.get("sink_factory", type(self).sink_factory)()
+        try:
+            sink.open(PCM_SAMPLE_RATE, PCM_CHANNELS)
+        except OSError as exception:
+            Logger.warning(f"LinuxSoundPlayer: Unable to open {sink!r}: {exception}")
+            return False
+        capacity = max(int(self.buffer_duration * PCM_SAMPLE_RATE), self.block_frames) * PCM_FRAME_SIZE
+        # Every playback gets its own ring buffer, so a decoder thread still finishing its read
+        # after a seek can never write into the buffer of the next playback
+        ring_buffer = RingBuffer(capacity, PCM_FRAME_SIZE)
+        self._generation += 1
+        self._position = position
+        self._frames_written = 0
+        self._decoding_done = False
+        self._dsp_chain.reset()
+        self._sink = sink
+        self._stop_event = threading.Event()
+        threading.Thread(
+            target=self._decode,
+            args=(PCMDecoder(self.source, position), ring_buffer, self._stop_event),
+            daemon=True,
+        ).start()
+        self._output_thread = threading.Thread(
+            target=self._output,
+            args=(sink, ring_buffer, self._stop_event, self._generation),
+            daemon=True,
+        )
+        self._output_thread.start()
+        return True
+
+    def _stop_playback(self) -> None:
+        """
+        Private method to stop the threads of the current playback, keeping its position
+        :return: None
+        """
+        if self._stop_event is None:
+            return
+        self._position = self.get_pos()
+        self._stop_event.set()
+        # The output thread is at most a block away from noticing, the decoder thread is not waited for
+        if self._output_thread is not threading.current_thread():
+            self._output_thread.join()
+        self._sink.close()
+        self._sink = None
+        self._stop_event = None
+        self._output_thread = None
+
+    def _decode(self, decoder: PCMDecoder, ring_buffer: RingBuffer, stop_event: threading.Event) -> None:
+        """
+        Private method run by the decoder thread to keep the ring buffer filled
+        :param decoder: Decoder of the audio file, from the playback position
+        :param ring_buffer: Ring buffer of the playback
+        :param stop_event: Event set when the playback stops
+        :return: None
+        """
+        poll_interval = self.block_frames / PCM_SAMPLE_RATE / 2
+        try:
+            while not stop_event.is_set():
+                data = memoryview(decoder.read(self.block_frames))
+                if not data:
+                    break
+                data = data[ring_buffer.write(data):]
+                while data and not stop_event.wait(poll_interval):
+                    data = data[ring_buffer.write(data):]
+        except (OSError, ValueError) as exception:
+            Logger.warning(f"LinuxSoundPlayer: Unable to decode {decoder.source!r}: {exception}")
+        finally:
+            decoder.close()
+            if not stop_event.is_set():
+                self._decoding_done = True
+
+    def _output(self, sink: AudioSink, ring_buffer: RingBuffer, stop_event: threading.Event, generation: int) -> None:
+        """
+        Private method run by the output thread to drain the ring buffer into the sink
+        :param sink: Opened sink of the playback
+        :param ring_buffer: Ring buffer of the playback
+        :param stop_event: Event set when the playback stops
+        :param generation: Playback counter, to ignore the end of playbacks which were replaced since
+        :return: None
+        """
+        block_size = self.block_frames * PCM_FRAME_SIZE
+        poll_interval = self.block_frames / PCM_SAMPLE_RATE / 4
+        prebuffer_size = min(int(self.prebuffer_duration * PCM_SAMPLE_RATE) * PCM_FRAME_SIZE, ring_buffer.capacity)
+        # Letting the decoder get ahead first, waiting for the first frames is not an underrun
+        while ring_buffer.available < prebuffer_size and not self._decoding_done:
+            if stop_event.wait(poll_interval):
+                return
+        starving = False
+        while not stop_event.is_set():
+            # Checked before reading, so every decoded frame is in the buffer when it is true
+            decoding_done = self._decoding_done
+            data = ring_buffer.read(block_size)
+            if not data:
+                if decoding_done:
+                    break
+                if not starving:
+                    starving = True
+                    self._underruns += 1
+                stop_event.wait(poll_interval)
+                continue
+            starving = False
+            volume = self.volume
+            if volume != 1 or self._dsp_chain:
+                data = self._dsp_chain.process_pcm(data, volume)
+            sink.write(data)
+            for tap in self._taps:
+                tap.push(data)
+            self._frames_written += len(data) // PCM_FRAME_SIZE
+        else:
+            return
+        # Letting the sink play out what it buffered, its estimated latency bounds the wait
+        sink.finish()
+        deadline = time.monotonic() + sink.latency + self.drain_timeout
+        while not sink.drained and time.monotonic() < deadline:
+            if stop_event.wait(poll_interval):
+                return
+        Clock.schedule_once(lambda dt: self._reach_end(generation))
+
+    def _reach_end(self, generation: int) -> None:
+        """
+        Private method called on the main thread once the sink of a playback has played every frame
+        :param generation: Playback counter of the ended playback
+        :return: None
+        """
+        if generation != self._generation or self._stop_event is None:
+            return
+        if self.loop:
+            self._stop_playback()
+            self._start_playback(0)
+            return
+        self.stop()
+        self._position = 0
+
+    def add_tap(self, tap) -> None:
+        """
+        Method to hand every block output from now on to a tap as well (e.g `AnalysisTap`)
+        :param tap: Object with a non-blocking `push(data)` method
+        :return: None
+        """
+        if tap not in self._taps:
+            self._taps += (tap,)
+
+    def remove_tap(self, tap) -> None:
+        """
+        Method to stop handing the output blocks to a tap
+        :param tap: Tap added with `add_tap`
+        :return: None
+        """
+        self._taps = tuple(added_tap for added_tap in self._taps if added_tap is not tap)
+
+    @property
+    def dsp_chain(self) -> DSPChain:
+        return self._dsp_chain
+
+    @property
+    def underruns(self) -> int:
+        # Times the output caught up with the decoder since the audio file was created
+        return self._underruns
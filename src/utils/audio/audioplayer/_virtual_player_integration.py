@@ -0,0 +1,201 @@
+"""
+Virtual audio backend for running `AudioPlayer` without a sound device (benchmarks, CI, replays).
+Register it before loading any virtual source:
+
+    from kivy.core.audio import SoundLoader
+    from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound
+
+    SoundLoader.register(VirtualSound)
+    player = AudioPlayer(["track-1.virtual?length_ms=180000", "track-2.virtual?length_ms=240000"])
+
+The length of each virtual audio file (and an optional decoding delay) are given in milliseconds
+in the query of its source, as `SoundLoader` picks providers from the text after the last dot. Nothing is ever played, positions are read from
+`VirtualSound.clock`, which only moves forward when advanced and dispatches `on_stop`
+on every virtual audio file reaching its end, like real providers do.
+"""
+
+import time
+from urllib.parse import parse_qsl
+from typing import Optional, Final
+from kivy.core.audio import Sound
+from src.type_aliases import Number
+
+__all__ = (
+    "VIRTUAL_SOUND_EXTENSION",
+    "VIRTUAL_SOUND_DEFAULT_LENGTH",
+    "VirtualClock",
+    "VirtualSound",
+    "virtual_source",
+)
+
+
+VIRTUAL_SOUND_EXTENSION: Final = "virtual"
+VIRTUAL_SOUND_DEFAULT_LENGTH: Final = 180
+
+
+def virtual_source(name: str, length: Number = VIRTUAL_SOUND_DEFAULT_LENGTH, load_delay: Number = 0) -> str:
+    """
+    Function to build the source of a virtual audio file
+    :param name: Name of the virtual audio file, without extension
+    :param length: Length of the virtual audio file in seconds
+    :param load_delay: Seconds spent (really sleeping) when the virtual audio file is loaded
+    :return: str
+    """
+    source = f"{name}.{VIRTUAL_SOUND_EXTENSION}?length_ms={round(length * 1000)}"
+    if load_delay:
+        source += f"&load_delay_ms={round(load_delay * 1000)}"
+    return source
+
+
+class VirtualClock:
+    """
+    Controllable clock of the virtual audio files.
+    Time only moves when `advance` is called, ending the virtual audio files in the order they end
+    """
+    __slots__ = (
+        "_time",
+        "_playing",
+    )
+
+    def __init__(self, start_time: Number = 0):
+        self._time = start_time
+        self._playing = []
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"time={self._time!r}, " \
+               f"playing={len(self._playing)!r})"
+
+    def time(self) -> Number:
+        """
+        Method to get the current virtual time in seconds
+        :return: Number
+        """
+        return self._time
+
+    def _start(self, sound_obj: "VirtualSound") -> None:
+        if sound_obj not in self._playing:
+            self._playing.append(sound_obj)
+
+    def _stop(self, sound_obj: "VirtualSound") -> None:
+        if sound_obj in self._playing:
+            self._playing.remove(sound_obj)
+
+    def advance(self, seconds: Number) -> None:
+        """
+        Method to move the virtual time forward.
+        Virtual audio files reaching their end on the way are ended one at a time,
+        so sounds started by their `on_stop` callbacks are advanced as well
+        :param seconds: Seconds to move forward
+        :return: None
+        """
+        if seconds < 0:
+            raise ValueError("virtual time cannot go backwards")
+        target_time = self._time + seconds
+        while self._playing:
+            sound_obj = min(self._playing, key=lambda playing_sound: playing_sound.end_time)
+            if sound_obj.end_time > target_time:
+                break
+            self._time = max(self._time, sound_obj.end_time)
+            sound_obj._reach_end()
+        self._time = target_time
+
+    def advance_to_end(self) -> None:
+        """
+        Method to move the virtual time to the end of the first virtual audio file to end, if any
+        :return: None
+        """
+        if self._playing:
+            end_time = min(playing_sound.end_time for playing_sound in self._playing)
+            self.advance(max(end_time - self._time, 0))
+
+
+class VirtualSound(Sound):
+    """
+    Sound provider simulating length, position, play and stop against `VirtualSound.clock`.
+    Sources are of the form `name.virtual?length_ms=180000&load_delay_ms=10`
+    """
+    clock = VirtualClock()
+    """
+    Clock shared by every virtual audio file, replace it to start from a fresh virtual time
+    """
+
+    def __init__(self, **kwargs):
+        self._length = VIRTUAL_SOUND_DEFAULT_LENGTH
+        self._load_delay = 0
+        self._loaded = False
+        self._position = 0
+        self._started_at = None
+        super(VirtualSound, self).__init__(**kwargs)
+
+    @staticmethod
+    def extensions():
+        return (VIRTUAL_SOUND_EXTENSION,)
+
+    def _parse_source(self) -> None:
+        """
+        Private method to read the length and loading delay from the query of the source
+        :return: None
+        """
+        _, _, query = self.source.partition("?")
+        options = dict(parse_qsl(query))
+        self._length = int(options.get("length_ms", VIRTUAL_SOUND_DEFAULT_LENGTH * 1000)) / 1000
+        self._load_delay = int(options.get("load_delay_ms", 0)) / 1000
+
+    def load(self):
+        self._parse_source()
+        if self._load_delay:
+            time.sleep(self._load_delay)
+        self._loaded = True
+
+    def unload(self):
+        # Like real providers, unloading stops the audio file (and dispatches `on_stop`)
+        self.stop()
+        self._loaded = False
+        self._position = 0
+
+    def play(self):
+        if not self._loaded:
+            self.load()
+        if self._started_at is None:
+            self._started_at = self.clock.time()
+            self.clock._start(self)
+        super(VirtualSound, self).play()
+
+    def stop(self):
+        self._position = self.get_pos()
+        self._started_at = None
+        self.clock._stop(self)
+        super(VirtualSound, self).stop()
+
+    def _reach_end(self) -> None:
+        """
+        Private method called by the clock when the virtual audio file reaches its end
+        :return: None
+        """
+        if self.loop:
+            self._position = 0
+            self._started_at = self.clock.time()
+            return
+        self.stop()
+        self._position = 0
+
+    def seek(self, position):
+        self._position = min(max(position, 0), self._length)
+        if self._started_at is not None:
+            self._started_at = self.clock.time()
+
+    def get_pos(self):
+        if self._started_at is None:
+            return self._position
+        return min(self._position + self.clock.time() - self._started_at, self._length)
+
+    def _get_length(self):
+        return self._length
+
+    @property
+    def end_time(self) -> Optional[Number]:
+        # Virtual time at which the audio file reaches its end, if playing
+        if self._started_at is None:
+            return None
+        return self._started_at + self._length - self._position
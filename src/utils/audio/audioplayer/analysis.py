@@ -0,0 +1,347 @@
+"""
+Spectrum and level analysis of the PCM frames played by `LinuxSoundPlayer`, for visualizers:
+
+    tap = AnalysisTap(bands=24, rate=30)
+    tap.follow(player)
+    tap.start()
+
+    frame = AnalysisFrame(tap.bands, tap.channels)   # allocated once by the widget
+
+    def update(dt):
+        if tap.read(frame):
+            spectrum_bar.levels = frame.bands
+            vu_meter.level = frame.rms.max()
+
+    Clock.schedule_interval(update, 1 / 30)
+
+The output thread only copies each block into a ring buffer (dropping it if the analysis fell behind),
+the FFT runs on the tap's own thread and the results are published through a `LatestValueSlot`
+"""
+
+import time
+import threading
+import numpy as np
+from typing import Final
+from src.type_aliases import Number
+from src.utils.audio.decoding import PCM_SAMPLE_RATE, PCM_CHANNELS, PCM_SAMPLE_WIDTH
+from src.utils.audio.audioplayer.ringbuffer import RingBuffer
+from src.utils.audio.audioplayer.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.playqueue import QueueEntry
+
+__all__ = (
+    "SILENCE_DB",
+    "AnalysisFrame",
+    "LatestValueSlot",
+    "AnalysisTap",
+)
+
+
+SILENCE_DB: Final = -120.0
+"""
+Level in decibels reported for silent bands
+"""
+_INT16_SCALE: Final = 32768
+
+
+class AnalysisFrame:
+    """
+    Result of one analysis, made of arrays allocated once and then overwritten in place:
+        bands: Peak level of each frequency band in dBFS, from `SILENCE_DB` to 0
+        rms: RMS amplitude of each channel since the previous analysis, from 0 to 1
+        peak: Peak amplitude of each channel since the previous analysis, from 0 to 1
+        timestamp: `time.monotonic` of the analysis
+        sequence: Sequence of the published results last copied into the frame, see `LatestValueSlot`
+    """
+    __slots__ = (
+        "bands",
+        "rms",
+        "peak",
+        "timestamp",
+        "sequence",
+    )
+
+    def __init__(self, bands: int, channels: int = PCM_CHANNELS):
+        self.bands = np.full(bands, SILENCE_DB, dtype=np.float32)
+        self.rms = np.zeros(channels, dtype=np.float32)
+        self.peak = np.zeros(channels, dtype=np.float32)
+        self.timestamp = 0.0
+        self.sequence = -1
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"bands={len(self.bands)!r}, " \
+               f"rms={self.rms.tolist()!r}, " \
+               f"peak={self.peak.tolist()!r})"
+
+    def copy_to(self, frame: "AnalysisFrame") -> None:
+        """
+        Method to copy the results into another frame of the same shape, without allocating
+        :param frame: Destination frame
+        :return: None
+        """
+        np.copyto(frame.bands, self.bands)
+        np.copyto(frame.rms, self.rms)
+        np.copyto(frame.peak, self.peak)
+        frame.timestamp = self.timestamp
+
+
+class LatestValueSlot:
+    """
+    Slot holding the latest analysis frame, written by one thread and read by any other.
+    It is a sequence lock: the sequence is odd while a write is in progress,
+    so readers copy out and retry if it changed meanwhile, and the writer never waits for them
+    """
+    __slots__ = (
+        "_frame",
+        "_sequence",
+    )
+
+    def __init__(self, bands: int, channels: int = PCM_CHANNELS):
+        self._frame = AnalysisFrame(bands, channels)
+        self._sequence = 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"sequence={self._sequence!r})"
+
+    def write(self, frame: AnalysisFrame) -> None:
+        """
+        Method to publish a frame, writer thread only
+        :param frame: Frame to be copied into the slot
+        :return: None
+        """
+        self._sequence += 1
+        frame.copy_to(self._frame)
+        self._sequence += 1
+
+    def read(self, frame: AnalysisFrame) -> bool:
+        """
+        Method to copy the latest frame out of the slot, unless the given frame already holds it
+        :param frame: Frame to be overwritten
+        :return: bool, whether a newer frame was copied
+        """
+        while True:
+            sequence = self._sequence
+            if sequence == frame.sequence:
+                return False
+            if sequence % 2:
+                # Mid-write, the writer is at most a few copies away from done
+                time.sleep(0)
+                continue
+            self._frame.copy_to(frame)
+            if self._sequence == sequence:
+                frame.sequence = sequence
+                return True
+
+    @property
+    def sequence(self) -> int:
+        return self._sequence
+
+
+class AnalysisTap:
+    """
+    Tap computing windowed FFT bands (log-spaced between `min_frequency` and `max_frequency`)
+    and RMS/peak levels of the PCM frames of the sound it is attached to, at most `rate` times per second.
+    It is attached to a single sound at a time, `follow` moves it along with the current track of a player
+    """
+
+    def __init__(
+            self,
+            bands: int = 32,
+            rate: Number = 30,
+            fft_size: int = 2048,
+            min_frequency: Number = 40,
+            max_frequency: Number = 16000,
+            sample_rate: int = PCM_SAMPLE_RATE,
+            channels: int = PCM_CHANNELS):
+        self._bands = bands
+        self._rate = rate
+        self._fft_size = fft_size
+        self._sample_rate = sample_rate
+        self._channels = channels
+        frame_size = channels * PCM_SAMPLE_WIDTH
+        self._ring_buffer = RingBuffer(max(sample_rate // 2, fft_size) * frame_size, frame_size)
+        self._window_function = np.hanning(fft_size).astype(np.float32)
+        self._samples = np.zeros((fft_size, channels), dtype=np.float32)
+        # Full-scale sine through a Hann window peaks at a quarter of the FFT size
+        self._reference_magnitude = fft_size / 4
+        bin_frequencies = np.fft.rfftfreq(fft_size, 1 / sample_rate)
+        edges = np.geomspace(min_frequency, min(max_frequency, sample_rate / 2), bands + 1)
+        self._band_end = int(np.searchsorted(bin_frequencies, edges[-1]))
+        # Bands narrower than a bin repeat the bin they fall in
+        self._band_starts = np.minimum(np.searchsorted(bin_frequencies, edges[:-1]), self._band_end - 1)
+        self._frame = AnalysisFrame(bands, channels)
+        self._slot = LatestValueSlot(bands, channels)
+        self._silent = True
+        self._dropped_blocks = 0
+        self._sound = None
+        self._player = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"bands={self._bands!r}, " \
+               f"rate={self._rate!r}, " \
+               f"fft_size={self._fft_size!r}, " \
+               f"running={self.running!r})"
+
+    def push(self, data: bytes) -> None:
+        """
+        Method called by the output thread with every block handed to the sink, never blocks.
+        Whole blocks are dropped while the ring buffer is full, so frames stay aligned
+        :param data: Interleaved signed 16-bit PCM frames
+        :return: None
+        """
+        if self._ring_buffer.free < len(data):
+            self._dropped_blocks += 1
+            return
+        self._ring_buffer.write(data)
+
+    def _analyze(self) -> None:
+        """
+        Private method to analyze the frames pushed since the previous analysis and publish the results
+        :return: None
+        """
+        data = self._ring_buffer.read(self._ring_buffer.available)
+        frame = self._frame
+        if not data:
+            if self._silent:
+                return
+            # Playback paused or stopped: the meters fall back to silence once
+            self._silent = True
+            self._samples.fill(0)
+            frame.bands.fill(SILENCE_DB)
+            frame.rms.fill(0)
+            frame.peak.fill(0)
+        else:
+            self._silent = False
+            new_samples = np.frombuffer(data, dtype=np.int16).reshape(-1, self._channels) / _INT16_SCALE
+            frame.rms[:] = np.sqrt(np.mean(np.square(new_samples), axis=0))
+            frame.peak[:] = np.max(np.abs(new_samples), axis=0)
+            new_count = min(len(new_samples), self._fft_size)
+            self._samples[:-new_count] = self._samples[new_count:]
+            self._samples[-new_count:] = new_samples[-new_count:]
+            magnitudes = np.abs(np.fft.rfft(self._samples.mean(axis=1) * self._window_function))
+            band_peaks = np.maximum.reduceat(magnitudes[:self._band_end], self._band_starts)
+            np.maximum(
+                20 * np.log10(band_peaks / self._reference_magnitude + 1e-12), SILENCE_DB, out=frame.bands
+            )
+        frame.timestamp = time.monotonic()
+        self._slot.write(frame)
+
+    def _run(self) -> None:
+        """
+        Private method run by the analysis thread
+        :return: None
+        """
+        period = 1 / self._rate
+        while not self._stop_event.wait(period):
+            self._analyze()
+
+    def start(self) -> None:
+        """
+        Method to start the analysis thread
+        :return: None
+        """
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Method to stop the analysis thread
+        :return: None
+        """
+        if not self.running:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def read(self, frame: AnalysisFrame) -> bool:
+        """
+        Method to copy the latest results into a frame allocated by the caller, never blocks the analysis
+        :param frame: Frame to be overwritten, see `AnalysisFrame`
+        :return: bool, whether results newer than the ones already in the frame were copied
+        """
+        return self._slot.read(frame)
+
+    def attach(self, sound) -> None:
+        """
+        Method to receive the frames of a sound supporting taps (e.g `LinuxSoundPlayer`), instead of the current one
+        :param sound: Sound object with `add_tap` & `remove_tap` methods
+        :return: None
+        """
+        self.detach()
+        if hasattr(sound, "add_tap"):
+            sound.add_tap(self)
+            self._sound = sound
+
+    def detach(self) -> None:
+        """
+        Method to stop receiving the frames of the current sound
+        :return: None
+        """
+        if self._sound is not None:
+            self._sound.remove_tap(self)
+            self._sound = None
+
+    def _on_player_track(self, dispatcher, queue_entry: QueueEntry) -> None:
+        """
+        Private method bound to the player events starting (or resuming) a track
+        :param dispatcher: Event dispatcher of the player
+        :param queue_entry: Queue entry of the track
+        :return: None
+        """
+        if queue_entry.sound is not self._sound:
+            self.attach(queue_entry.sound)
+
+    def follow(self, player: AudioPlayer) -> None:
+        """
+        Method to keep the tap attached to the current track of the given player
+        :param player: Player to be followed
+        :return: None
+        """
+        self.unfollow()
+        self._player = player
+        player.bind(on_track_started=self._on_player_track, on_resumed=self._on_player_track)
+        current_entry = player.current_entry
+        if current_entry is not None and current_entry.sound is not None:
+            self.attach(current_entry.sound)
+
+    def unfollow(self) -> None:
+        """
+        Method to stop following the player, detaching from its current track
+        :return: None
+        """
+        if self._player is not None:
+            self._player.unbind(on_track_started=self._on_player_track, on_resumed=self._on_player_track)
+            self._player = None
+        self.detach()
+
+    @property
+    def bands(self) -> int:
+        return self._bands
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def rate(self) -> Number:
+        return self._rate
+
+    @property
+    def fft_size(self) -> int:
+        return self._fft_size
+
+    @property
+    def dropped_blocks(self) -> int:
+        return self._dropped_blocks
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
@@ -0,0 +1,178 @@
+"""
+asyncio-facing API of `AudioPlayer`, for apps running Kivy on its asyncio event loop:
+
+    from kivy.app import async_runTouchApp
+
+    async def main():
+        player = AsyncAudioPlayer(AudioPlayer(["a.mp3", "b.mp3"]))
+        await player.play()
+        async for event_name, args in player.iter_events():
+            ...
+
+Events are dispatched by Kivy on the thread running the event loop,
+results are still handed over with `call_soon_threadsafe` so providers dispatching
+from their own threads are supported as well
+"""
+
+import asyncio
+from typing import Optional, AsyncIterator, Tuple
+from kivy.core.audio import Sound
+from src.type_aliases import Number, FilePath
+from src.utils.audio.metadata import AudioMetadata
+from src.utils.audio.audioplayer.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.playqueue import QueueEntry
+from src.utils.audio.audioplayer.events import PlayerEventDispatcher
+
+__all__ = (
+    "AsyncAudioPlayer",
+)
+
+
+def _resolve(future: asyncio.Future, result) -> None:
+    """
+    Private function to set the result of a future from any thread, unless it is already done
+    :param future: Future to be resolved
+    :param result: Result of the future
+    :return: None
+    """
+    def set_result():
+        if not future.done():
+            future.set_result(result)
+
+    future.get_loop().call_soon_threadsafe(set_result)
+
+
+class AsyncAudioPlayer:
+    """
+    Awaitable wrapper of an `AudioPlayer`.
+    Synchronous calls (queue editing, volume...) are still made on `player`,
+    everything waiting on playback or on the disk is awaitable here
+    """
+    __slots__ = (
+        "_player",
+    )
+
+    def __init__(self, player: AudioPlayer):
+        self._player = player
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"player={self._player!r})"
+
+    def _wait_event(self, *event_names: str) -> asyncio.Future:
+        """
+        Private method to get a future resolved with the arguments of the next of the given events
+        :param event_names: Names of the player events to wait for
+        :return: asyncio.Future
+        """
+        future = asyncio.get_running_loop().create_future()
+
+        def event_callback(dispatcher, *args):
+            _resolve(future, args)
+
+        callbacks = {event_name: event_callback for event_name in event_names}
+        self._player.bind(**callbacks)
+        future.add_done_callback(lambda done_future: self._player.unbind(**callbacks))
+        return future
+
+    async def play(self, timeout: Optional[Number] = None) -> Optional[QueueEntry]:
+        """
+        Method to start playing, resolving once the sound provider took the audio file
+        (its `on_play`, dispatched as playback is handed to it), after the prefetch of the audio file if pending.
+        It does not wait for the first samples to be audible, the output latency of the provider comes on top
+        :param timeout: Seconds to wait for playback to start, forever if `None`
+        :return: Optional[QueueEntry], `None` if there was nothing to play
+        """
+        future = self._wait_event("on_track_started", "on_resumed")
+        self._player.play()
+        if self._player.state != "play" and not self._player.play_pending:
+            future.cancel()
+            return None
+        args = await asyncio.wait_for(future, timeout)
+        return args[0]
+
+    async def wait_track_end(self, timeout: Optional[Number] = None) -> QueueEntry:
+        """
+        Method to wait for the current audio file to reach its end
+        :param timeout: Seconds to wait for, forever if `None`
+        :return: QueueEntry, the queue entry which ended
+        """
+        args = await asyncio.wait_for(self._wait_event("on_track_ended"), timeout)
+        return args[0]
+
+    async def wait_event(self, event_name: str, timeout: Optional[Number] = None) -> tuple:
+        """
+        Method to wait for the next dispatch of the given player event
+        :param event_name: Name of the event, see `PlayerEventDispatcher`
+        :param timeout: Seconds to wait for, forever if `None`
+        :return: tuple, the arguments of the event
+        """
+        return await asyncio.wait_for(self._wait_event(event_name), timeout)
+
+    async def iter_events(self, *event_names: str) -> AsyncIterator[Tuple[str, tuple]]:
+        """
+        Method to iterate over the player events as `(event_name, args)` pairs, as they are dispatched.
+        Events are buffered between iterations, every event is followed if none are given
+        :param event_names: Names of the events to follow
+        :return: AsyncIterator[Tuple[str, tuple]]
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+
+        def get_event_callback(event_name: str):
+            return lambda dispatcher, *args: loop.call_soon_threadsafe(queue.put_nowait, (event_name, args))
+
+        callbacks = {
+            event_name: get_event_callback(event_name)
+            for event_name in event_names or PlayerEventDispatcher.__events__
+        }
+        self._player.bind(**callbacks)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            self._player.unbind(**callbacks)
+
+    async def prefetch(self) -> None:
+        """
+        Method to wait until the audio files of the player's prefetch window are loaded,
+        without blocking the event loop
+        :return: None
+        """
+        futures = [asyncio.wrap_future(future) for future in self._player.get_prefetch_futures()]
+        if futures:
+            await asyncio.gather(*futures, return_exceptions=True)
+        # Attaching the loaded sound objects right away, instead of on the next clock tick
+        self._player.adopt_prefetches()
+
+    @staticmethod
+    async def read_metadata(source: FilePath, **default_values) -> AudioMetadata:
+        """
+        Static-method to read the tags of an audio file on the default executor
+        :param source: Path of the audio file
+        :param default_values: Default tag values, see `AudioMetadata`
+        :return: AudioMetadata
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            None, lambda: AudioMetadata(source, silent=True, **default_values)
+        )
+
+    async def current_metadata(self, **default_values) -> Optional[AudioMetadata]:
+        """
+        Method to read the tags of the current audio file on the default executor
+        :param default_values: Default tag values, see `AudioMetadata`
+        :return: Optional[AudioMetadata]
+        """
+        current_entry = self._player.current_entry
+        if current_entry is None:
+            return None
+        return await self.read_metadata(current_entry.source, **default_values)
+
+    @property
+    def player(self) -> AudioPlayer:
+        return self._player
+
+    @property
+    def sound(self) -> Optional[Sound]:
+        current_entry = self._player.current_entry
+        return None if current_entry is None else current_entry.sound
@@ -5,26 +5,38 @@ For now it is recommended NOT to use this module
 
 
 import os
+import time
+import math
+import random
+import asyncio
 from pathlib import Path
-from typing import Iterable, Union, Final
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Iterable, Iterator, AsyncIterator, Callable, Optional, Union, Final, Tuple
 from src.type_aliases import Number, FilePath
 from kivy.utils import platform
 from kivy.clock import Clock
+from kivy.logger import Logger
 from kivy.core.audio import SoundLoader, Sound
 from src.utils import human_readable_duration, convert_file_path_to_string
+from src.utils.audio.audioplayer.playqueue import QueueEntry, PlayQueue
+from src.utils.audio.audioplayer.soundpool import SoundPool
+from src.utils.audio.audioplayer.soundbank import SoundBank
+from src.utils.audio.audioplayer.events import PlayerEventDispatcher
+from src.utils.audio.audioplayer.telemetry import PlayerTelemetry
 
 __all__ = (
     "AudioPlayer",
 )
 
 
-# TODO: integrate player with windows and linux as well
+# TODO: integrate player with windows as well
 if platform in os.getenv("PLATFORM_AUDIO_PLAYER_INTEGRATION", '').split(','):
     if platform == "android":
         from _android_player_integration import AndroidSoundPlayer
         SoundLoader.register(AndroidSoundPlayer)
     elif platform == "linux":
-        from _linux_player_integration import LinuxSoundPlayer
+        from src.utils.audio.audioplayer._linux_player_integration import LinuxSoundPlayer
         SoundLoader.register(LinuxSoundPlayer)
     elif platform == "win":
         from _windows_player_integration import WindowsSoundPlayer
@@ -47,26 +59,27 @@ As an example, to integrate the player with android and windows:
 
 Currently supported platforms are:
     android: `android`
+    linux: `linux` (needs ffmpeg, plays through `pacat` or `aplay`)
 
 Soon to be integrated:
     windows: `win`
-    linux: `linux`
 """
 
 
-def _convert_registration_value_to_sound_objs(filepath_or_sound_obj: Union[FilePath, Sound]) -> Sound:
+def _convert_registration_value_to_queue_entry(filepath_or_sound_obj: Union[FilePath, Sound]) -> QueueEntry:
     """
-    Private function to check & convert registration value to sound objects
+    Private function to check & convert registration value to queue entries,
+    without loading the audio file
     :param filepath_or_sound_obj: Path or sound object at registration to be converted
-    :return: Sound
+    :return: QueueEntry
     """
     if isinstance(filepath_or_sound_obj, (str, Path)):
-        sound_obj = SoundLoader.load(convert_file_path_to_string(filepath_or_sound_obj))
+        queue_entry = QueueEntry(convert_file_path_to_string(filepath_or_sound_obj))
     elif isinstance(filepath_or_sound_obj, Sound):
-        sound_obj = filepath_or_sound_obj
+        queue_entry = QueueEntry(filepath_or_sound_obj.source, filepath_or_sound_obj)
     else:
         raise TypeError("can only accept types of str, Path and Sound")
-    return sound_obj
+    return queue_entry
 
 
 class AudioPlayer:
@@ -74,6 +87,30 @@ class AudioPlayer:
     Audio player class for extending standard `SoundLoader` functionalities including:
     queuing, fast forwarding, rewinding, global volume, extended states...
     This class has the most integration with ffmpeg & the `ffpyplayer` package.
+    Audio files are only loaded when needed: the current one and the next `prefetch` ones
+    are loaded ahead of time on a background worker. Other loaded audio files are kept in a
+    least recently used pool capped by `max_sounds` and `max_memory` (in bytes, estimated from
+    the file sizes), and are unloaded when evicted.
+    In gapless mode the next audio file is pre-rolled `preroll` seconds before the current one ends
+    and started on a timer, instead of waiting for the current one to dispatch `on_stop`.
+    With a `crossfade` duration, the next audio file is started that many seconds early and
+    both volumes are ramped with an equal-power curve.
+    Playback events are dispatched by `events`, a single `PlayerEventDispatcher` bound only to
+    the active sound object (`player.bind(on_track_ended=...)` is forwarded to it).
+    In radio mode (`radio`), sources are pulled lazily from a possibly infinite (async) iterator
+    to keep `radio_lookahead` upcoming audio files, and only `radio_history` played ones are kept.
+    `volume` is a master gain applied to the playing sound objects at most once per frame,
+    each audio file is played at the master gain scaled by its own gain offset in dB,
+    resolved once by `gain_function` (e.g reading ReplayGain tags) or set with `set_gain`.
+    With a `trim_function` (e.g `TrimPointCache.get_trim_points`), audio files are started at their
+    first audible frame and, if another one follows, switched away from at their last, skipping their silent edges.
+    With `shuffle`, upcoming audio files are played in a lazily drawn random order, previous ones
+    are still played back from the history and un-shuffling restores the original order.
+    The order is drawn from `random_generator`, seed it to reproduce a shuffled session.
+    Load, play dispatch, skip, seek and gap timings, underruns and errors are kept by `telemetry`,
+    see `stats`, and dumped to the Kivy logger every `telemetry_interval` seconds if given.
+    Sessions are saved with `snapshot` and restored lazily with `from_snapshot`,
+    see `src.utils.audio.audioplayer.session` for writing them to disk.
     In order to switch your audio provider, check out:
     https://kivy.org/doc/stable/guide/environment.html#restrict-core-to-specific-implementation
 
@@ -91,42 +128,110 @@ class AudioPlayer:
     """
     Private dictionary containing aliases
     """
+    _sound_bank = SoundBank()
+    """
+    Private sound bank holding the pre-loaded voices of aliases registered with `voices`
+    """
 
     def __init__(self,
                  queue: Iterable = (),
                  volume: Number = 1,
                  loop: bool = False,
                  estimate_position: bool = True,
-                 interval: Number = 1):
-        self._external_stop_call = False
-        self._queue_progress_index = -1
-        self._queue = []
+                 interval: Number = 1,
+                 prefetch: int = 2,
+                 gapless: bool = False,
+                 preroll: Number = 0.5,
+                 crossfade: Number = 0,
+                 max_sounds: int = 8,
+                 max_memory: Optional[int] = None,
+                 radio: Union[Iterator, AsyncIterator, None] = None,
+                 radio_lookahead: int = 3,
+                 radio_history: int = 20,
+                 gain_function: Optional[Callable[[str], Optional[Number]]] = None,
+                 trim_function: Optional[Callable[[str], Optional[Tuple[Number, Number]]]] = None,
+                 shuffle: bool = False,
+                 random_generator: Optional[random.Random] = None,
+                 telemetry_interval: Optional[Number] = None):
+        self._events = PlayerEventDispatcher(self._on_sound_play, self._on_sound_stop)
+        self._telemetry = PlayerTelemetry()
+        if telemetry_interval:
+            self._telemetry.start_logging(telemetry_interval)
+        self._play_requested_at = None
+        self._track_ended_at = None
+        self._queue = PlayQueue(random_generator=random_generator)
+        self._check_volume(volume)
         self._volume = volume
+        self._volume_trigger = Clock.create_trigger(lambda dt: self._apply_volume())
+        self._gain_function = gain_function
+        self._trim_function = trim_function
+        self._prefetch = prefetch
+        self._prefetch_executor = None
+        self._play_after_prefetch = None
+        self._preroll_after_prefetch = None
+        self._sound_pool = SoundPool(max_sounds, max_memory)
+        self._pool_current_entry = None
+        self._gapless = gapless
+        self._preroll = preroll
+        self._transition_event = None
+        self._transition_latencies = deque(maxlen=100)
+        self._crossfade = crossfade
+        self._fades = {}
+        self._fade_event = None
+        self._radio = None
+        self._radio_is_async = False
+        self._radio_lookahead = radio_lookahead
+        self._radio_task = None
+        self._radio_waiting = False
         self.load(*queue)
         self._loop = loop
         self._estimate_position = estimate_position
         self._interval = interval
-        self._pos_estimate = 0
+        self._pos_anchor = 0
+        self._pos_anchor_time = None
+        self._pos_callbacks = []
+        self._pos_notifier_event = None
+        self._resume_position = 0
         self._state = "queue empty"
-        self._clock_event = None
-        self._current_sound_obj = None
+        if shuffle:
+            self.shuffle = True
+        if radio is not None:
+            self.start_radio(radio, radio_lookahead, radio_history)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}(" \
                f"remaining_in_queue={self.__len__()!r}, " \
                f"loop={self._loop!r}, " \
                f"estimate_position={self._estimate_position!r}, " \
-               f"interval={self._interval!r})"
+               f"interval={self._interval!r}, " \
+               f"prefetch={self._prefetch!r}, " \
+               f"gapless={self._gapless!r}, " \
+               f"crossfade={self._crossfade!r})"
 
     def __iter__(self):
-        for sound_obj in self._queue[self._queue_progress_index + 1:]:
-            yield sound_obj
+        yield from self._queue.iter_upcoming()
 
     def __len__(self) -> int:
-        return len(self._queue[self._queue_progress_index + 1:])
+        return self._queue.upcoming_length
 
     def __contains__(self, item) -> bool:
-        return item in self._queue[self._queue_progress_index + 1:]
+        return self._queue.is_upcoming(item)
+
+    def bind(self, **kwargs) -> None:
+        """
+        Method to bind callbacks to the player's events, see `PlayerEventDispatcher`
+        :param kwargs: Keyword arguments of event names and callbacks
+        :return: None
+        """
+        self._events.bind(**kwargs)
+
+    def unbind(self, **kwargs) -> None:
+        """
+        Method to unbind callbacks from the player's events
+        :param kwargs: Keyword arguments of event names and callbacks
+        :return: None
+        """
+        self._events.unbind(**kwargs)
 
     @classmethod
     def aliases(cls) -> dict:
@@ -137,16 +242,102 @@ class AudioPlayer:
         return cls._aliases.copy()
 
     @classmethod
-    def register(cls, alias, value) -> None:
+    def register(cls, alias, value, voices: int = 0) -> None:
         """
-        Class-method to register a sound object or a string as an easily accessible alias
+        Class-method to register a sound object or a string as an easily accessible alias.
+        With `voices`, the audio file is also decoded once into the sound bank,
+        to be played with low latency (and polyphonically) through `trigger`
         :param alias: Alias to be used for the value
         :param value: The value to be registered with the given alias
+        :param voices: Number of pre-loaded voices in the sound bank, 0 to skip the sound bank
         :return: None
         """
         cls._check_obj_type(value)
+        if voices:
+            cls._sound_bank.register(alias, value, voices)
+            # The sound object now belongs to the sound bank, the queue only needs its source
+            value = value.source if isinstance(value, Sound) else value
+        else:
+            cls._sound_bank.unregister(alias)
         cls._aliases[alias] = value
 
+    @classmethod
+    def trigger(cls, alias, volume: Number = 1) -> Sound:
+        """
+        Class-method to play an alias registered with `voices` right away on the sound bank,
+        independently of the queue (e.g UI click or notification sounds)
+        :param alias: Alias registered with `voices`
+        :param volume: Volume to play the sound with, from 0-1
+        :return: Sound
+        """
+        return cls._sound_bank.trigger(alias, volume)
+
+    @classmethod
+    def sound_bank(cls) -> SoundBank:
+        """
+        Class-method to return the sound bank of the registered aliases
+        :return: SoundBank
+        """
+        return cls._sound_bank
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict, **kwargs) -> "AudioPlayer":
+        """
+        Class-method to restore a player from a `snapshot`. Restoring is lazy: queue entries only hold
+        their sources, so only the current audio file (and the prefetch window) get loaded,
+        and playback resumes from the saved position on the next `play`
+        :param snapshot: Dictionary returned by `snapshot`
+        :param kwargs: Keyword arguments of the player, other than the saved ones
+        :return: AudioPlayer
+        """
+        player = cls(volume=snapshot["volume"], loop=snapshot["loop"], **kwargs)
+        queue_entries = player._convert_values_to_queue_entries(snapshot["queue"], ignore_aliases=True)
+        for index, gain in snapshot.get("gains", ()):
+            queue_entries[index].gain = gain
+        player._queue.extend(queue_entries)
+        if queue_entries:
+            player._state = "queue loaded"
+        if snapshot["index"] >= 0:
+            player._queue.set_index(snapshot["index"])
+            player._resume_position = snapshot["position"]
+            player._update_pos_estimate(snapshot["position"])
+        shuffle = snapshot.get("shuffle")
+        if shuffle is not None:
+            player._queue.shuffle(keep_drawn=shuffle["drawn"], sequences=shuffle["sequences"])
+        player._update_prefetch_window()
+        player._events.dispatch("on_queue_changed")
+        return player
+
+    def snapshot(self) -> dict:
+        """
+        Method to get the session state of the player (queue sources, progress index, position,
+        volume, loop flag, gain offsets and shuffle state) as a JSON serializable dictionary.
+        Sound objects given by the user are saved by their source
+        :return: dict
+        """
+        queue_entries = tuple(self._queue)
+        current_entry = self._queue.current
+        if current_entry is None:
+            position = 0
+        elif self._estimate_position or not current_entry.loaded:
+            position = self.pos_estimate
+        else:
+            position = current_entry.sound.get_pos()
+        return {
+            "queue": [queue_entry.source for queue_entry in queue_entries],
+            "index": self._queue.index,
+            "position": round(position, 3),
+            "volume": self._volume,
+            "loop": self._loop,
+            "gains": [
+                [index, queue_entry.gain] for index, queue_entry in enumerate(queue_entries) if queue_entry.gain
+            ],
+            "shuffle": None if not self._queue.shuffled else {
+                "drawn": self._queue.drawn_length,
+                "sequences": self._queue.get_sequences(),
+            },
+        }
+
     @classmethod
     def _check_obj_type(cls, obj) -> None:
         """
@@ -167,105 +358,665 @@ class AudioPlayer:
         """
         return cls._aliases.get(alias, default_value)
 
-    def _normalize_index(self, index: int) -> int:
+    def _update_pos_estimate(self, position: Number) -> None:
         """
-        Private method to convert a reverse index to a standard one
-        :param index: Index to be checked then converted
-        :return: int
+        Private method to re-anchor the position estimate to the given position in seconds,
+        keeping it running if the audio file is playing
+        :param position: New position of the current audio file in seconds
+        :return: None
         """
-        return len(self._queue) + index if index < 0 else index
+        self._pos_anchor = position
+        if self._pos_anchor_time is not None:
+            self._pos_anchor_time = time.monotonic()
 
-    def _update_pos_estimate(self, position: Number) -> None:
+    def _cancel_pos_notifier(self) -> None:
         """
-        Private method to update the position estimate with the given position in seconds
-        :param position: New position of the current audio file in seconds
+        Private method to cancel `self._pos_notifier_event`
         :return: None
         """
-        self._pos_estimate = position
+        if self._pos_notifier_event is not None:
+            self._pos_notifier_event.cancel()
+            self._pos_notifier_event = None
 
-    def _cancel_clock(self) -> None:
+    def _start_pos_notifier(self) -> None:
         """
-        Method to cancel `self._clock_event`
+        Private method to start notifying the position estimate callbacks every `self._interval`.
+        The clock only runs while the audio file is playing and a callback is bound
         :return: None
         """
-        self._clock_event.cancel()
+        if self._pos_notifier_event is None and self._pos_callbacks and self._pos_anchor_time is not None:
+            self._pos_notifier_event = Clock.schedule_interval(
+                lambda dt: self._notify_pos_estimate(), self._interval
+            )
 
-    def _start_clock(self) -> None:
+    def _notify_pos_estimate(self) -> None:
         """
-        Method to start a clock for updating the position estimate
-        every `self._interval`
+        Private method to call every bound callback with the current position estimate
         :return: None
         """
-        self._clock_event = Clock.schedule_interval(
-            lambda dt: self._update_pos_estimate(self._pos_estimate + self._interval),
-            self._interval
-        )
+        pos_estimate = self.pos_estimate
+        for callback in self._pos_callbacks:
+            callback(self, pos_estimate)
 
-    def _initialize_estimation(self) -> None:
+    def _on_sound_play(self) -> None:
         """
-        Method to be bound to every sound object's `on_play` event
-        to initialize the clock for position estimation if enabled
+        Private method called by the event dispatcher when the active sound object starts playing,
+        to start the position estimate from the current time if enabled
         :return: None
         """
+        now = time.perf_counter()
+        if self._play_requested_at is not None:
+            self._telemetry.record("play_dispatch", now - self._play_requested_at)
+            self._play_requested_at = None
+        if self._track_ended_at is not None:
+            self._telemetry.record("gap", now - self._track_ended_at)
+            self._track_ended_at = None
         if self._estimate_position:
-            self._start_clock()
+            self._pos_anchor_time = time.monotonic()
+            self._start_pos_notifier()
 
-    def _cancel_estimation(self) -> None:
+    def _on_sound_stop(self, track_ended: bool) -> None:
         """
-        Method to be bound to every sound object's `on_stop` event
-        to cancel the clock to prevent inaccurate position estimation if enabled
+        Private method called by the event dispatcher when the active sound object stops,
+        to freeze the position estimate if enabled and advance the queue on natural track ends
+        :param track_ended: Whether the audio file reached its end, as opposed to being stopped
         :return: None
         """
         if self._estimate_position:
-            self._cancel_clock()
-        if not self._external_stop_call:
+            self._pos_anchor = self.pos_estimate
+            self._pos_anchor_time = None
+            self._cancel_pos_notifier()
+        if track_ended:
+            self._track_ended_at = time.perf_counter()
+            self._cancel_transition()
             self._update_pos_estimate(0)
             self.skip_to_next(stop_current_playback=False)
+            if self._state != "play":
+                # Playback did not go on (e.g the queue ended), there is no gap to measure
+                self._track_ended_at = None
+
+    def _cancel_transition(self) -> None:
+        """
+        Private method to cancel a scheduled gapless pre-roll or switch
+        :return: None
+        """
+        self._preroll_after_prefetch = None
+        if self._transition_event is not None:
+            self._transition_event.cancel()
+            self._transition_event = None
+
+    def _schedule_transition(self) -> None:
+        """
+        Private method to schedule the pre-roll of the next audio file
+        `self._preroll` seconds before the current one ends (or starts fading out),
+        if gapless mode or crossfading is enabled or the current one has trailing silence to skip,
+        and its length is known
+        :return: None
+        """
+        self._cancel_transition()
+        if self._state != "play" or not self._queue.upcoming_length:
+            return
+        length = self.length
+        if not length:
+            # Unknown length (e.g streams), the switch waits for the natural track end
+            return
+        end = self._get_end()
+        if not (self._gapless or self._crossfade or end < length):
+            return
+        remaining = end - self.get_pos() - self._crossfade
+        self._transition_event = Clock.schedule_once(
+            lambda dt: self._preroll_next(), max(remaining - self._preroll, 0)
+        )
 
-    def _set_current_sound_obj(self) -> None:
+    def _preroll_next(self) -> None:
         """
-        Method to set the current sound object to the queue progression element
-        retrieved using its index from the queue
+        Private method to make sure the next audio file is decoded and ready,
+        then schedule the switch for the exact moment the current one ends (or starts fading out)
         :return: None
         """
-        self._current_sound_obj = self._queue[self._queue_progress_index]
+        self._transition_event = None
+        if not self._queue.upcoming_length:
+            return
+        next_entry = self._queue.peek()
+        if self._is_prefetching(next_entry):
+            # Pre-rolled again once the prefetched sound object is adopted, instead of blocking the UI thread
+            self._preroll_after_prefetch = next_entry
+            return
+        if self._load_entry(next_entry) is None:
+            return
+        remaining = max(self._get_end() - self.get_pos() - self._crossfade, 0)
+        switch_time = time.perf_counter() + remaining
+        self._transition_event = Clock.schedule_once(
+            lambda dt: self._switch_to_next(switch_time), remaining
+        )
+
+    def _switch_to_next(self, switch_time: float) -> None:
+        """
+        Private method to start the pre-rolled next audio file and retire the current one,
+        recording how late the next audio file started compared to the end of the current one.
+        When crossfading, the current audio file is faded out instead of being stopped right away
+        :param switch_time: `time.perf_counter` value at which the current audio file ends
+        :return: None
+        """
+        self._transition_event = None
+        if not self._queue.upcoming_length:
+            return
+        next_sound_obj = self._load_entry(self._queue.peek())
+        if next_sound_obj is None:
+            return
+        previous_sound_obj = self._current_sound_obj
+        previous_entry = self._queue.current
+        self._queue.advance()
+        start = self._get_entry_trim(self._queue.current)[0]
+        self._update_pos_estimate(start)
+        if self._crossfade:
+            next_sound_obj.volume = 0
+            self._start_fade(previous_entry, fade_in=False)
+            self._start_fade(self._queue.current, fade_in=True)
+        if not self._crossfade:
+            self._activate_entry(self._queue.current)
+        # Dispatched before the next audio file starts, in the same order as on natural track ends
+        self._events.dispatch("on_track_ended", previous_entry)
+        # Following the next sound object first, so the previous one's `on_stop` is not observed
+        self._events.attach(self._queue.current)
+        next_sound_obj.play()
+        if start:
+            next_sound_obj.seek(start)
+        self._transition_latencies.append(max(time.perf_counter() - switch_time, 0))
+        self._telemetry.record("gap", self._transition_latencies[-1])
+        if not self._crossfade:
+            previous_sound_obj.stop()
+        self._update_prefetch_window()
+        self._schedule_transition()
+
+    def _start_fade(self, queue_entry: QueueEntry, fade_in: bool) -> None:
+        """
+        Private method to start ramping the volume of a queue entry over `self._crossfade` seconds.
+        Every running fade is driven by a single clock event
+        :param queue_entry: The queue entry whose sound object should be faded
+        :param fade_in: Whether to fade in (from silence) or out (to silence)
+        :return: None
+        """
+        self._fades[queue_entry] = (time.perf_counter(), fade_in)
+        if self._fade_event is None:
+            self._fade_event = Clock.schedule_interval(lambda dt: self._update_fades(), 0)
+
+    def _update_fades(self) -> Optional[bool]:
+        """
+        Private method to apply the equal-power volume curve to every fading sound object.
+        Faded out sound objects are stopped, and the clock event is cancelled once all are done
+        :return: Optional[bool]
+        """
+        now = time.perf_counter()
+        for queue_entry, (start_time, fade_in) in tuple(self._fades.items()):
+            progress = min((now - start_time) / self._crossfade, 1) if self._crossfade else 1
+            if queue_entry.sound is not None:
+                curve = math.sin if fade_in else math.cos
+                queue_entry.sound.volume = self._get_entry_volume(queue_entry) * curve(progress * math.pi / 2)
+            if progress >= 1:
+                self._finish_fade(queue_entry)
+        if not self._fades:
+            self._fade_event = None
+            return False
 
-    def _jump_to_index(self, index: int) -> None:
+    def _finish_fade(self, queue_entry: QueueEntry) -> None:
         """
-        Method to jump to the given index in the queue
-        :param index: Index of the queue to jump to
+        Private method to end the fade of a queue entry right away,
+        stopping it if it was fading out and unloading it if it left the prefetch window
+        :param queue_entry: The queue entry whose fade should end
         :return: None
         """
+        _, fade_in = self._fades.pop(queue_entry)
+        if queue_entry.sound is None:
+            return
+        if fade_in:
+            queue_entry.sound.volume = self._get_entry_volume(queue_entry)
+            return
+        queue_entry.sound.stop()
+        self._update_prefetch_window()
+
+    def _finish_fades(self) -> None:
+        """
+        Private method to end every running fade right away
+        :return: None
+        """
+        for queue_entry in tuple(self._fades):
+            self._finish_fade(queue_entry)
+        if self._fade_event is not None:
+            self._fade_event.cancel()
+            self._fade_event = None
+
+    def _load_entry(self, queue_entry: QueueEntry, underrun: bool = False) -> Optional[Sound]:
+        """
+        Private method to make sure the sound object of a queue entry is loaded.
+        Prefetches are never waited for: `None` is returned while the entry is prefetching
+        (see `_is_prefetching`), until `_on_prefetch_done` adopts its sound object.
+        Audio files which failed to load are not retried
+        :param queue_entry: The queue entry to be loaded
+        :param underrun: Whether loading it right away counts as an underrun (the current audio file was not prefetched in time)
+        :return: Optional[Sound]
+        """
+        if queue_entry.future is not None:
+            if not queue_entry.future.done():
+                return None
+            self._adopt_prefetched_sound(queue_entry, queue_entry.future)
+        if queue_entry.load_failed or queue_entry.loaded:
+            return queue_entry.sound if queue_entry.loaded else None
+        if underrun:
+            self._telemetry.count("underruns")
+        if queue_entry.sound is None:
+            self._adopt_sound_obj(queue_entry, self._load_sound(queue_entry.source))
+        else:
+            queue_entry.sound.load()
+            queue_entry.loaded = True
+            self._sound_pool.add(queue_entry)
+        return queue_entry.sound
+
+    def _load_sound(self, source: str) -> Optional[Sound]:
+        """
+        Private method to load an audio file with `SoundLoader`, timing it and counting failures.
+        Also called on the prefetch worker
+        :param source: Path to the audio file
+        :return: Optional[Sound]
+        """
+        start_time = time.perf_counter()
         try:
-            self._queue_progress_index = index
-            self._set_current_sound_obj()
-        except IndexError:
-            self._queue_progress_index = -1
-            self._current_sound_obj = None
-            if self._loop:
+            sound_obj = SoundLoader.load(source)
+        except Exception:
+            self._telemetry.count("errors")
+            raise
+        self._telemetry.record("load", time.perf_counter() - start_time)
+        if sound_obj is None:
+            self._telemetry.count("errors")
+        return sound_obj
+
+    def _adopt_sound_obj(self, queue_entry: QueueEntry, sound_obj: Optional[Sound]) -> None:
+        """
+        Private method to attach a freshly loaded sound object to its queue entry
+        :param queue_entry: The queue entry the sound object was loaded for
+        :param sound_obj: The loaded sound object, `None` if loading failed
+        :return: None
+        """
+        if sound_obj is None:
+            Logger.warning(f"AudioPlayer: Unable to load {queue_entry.source!r}")
+            queue_entry.load_failed = True
+            return
+        queue_entry.sound = sound_obj
+        queue_entry.loaded = True
+        self._sound_pool.add(queue_entry)
+        self._evict_sounds()
+
+    def _adopt_prefetched_sound(self, queue_entry: QueueEntry, future: Future) -> None:
+        """
+        Private method to attach the result of a finished prefetch to its queue entry.
+        Prefetches which were cancelled or superseded are ignored
+        :param queue_entry: The queue entry the prefetch was submitted for
+        :param future: The future of the prefetch
+        :return: None
+        """
+        if queue_entry.future is not future:
+            return
+        queue_entry.future = None
+        if future.cancelled():
+            return
+        try:
+            sound_obj = future.result()
+        except Exception as exception:
+            Logger.warning(f"AudioPlayer: Unable to prefetch {queue_entry.source!r}: {exception}")
+            queue_entry.load_failed = True
+            return
+        self._adopt_sound_obj(queue_entry, sound_obj)
+
+    def _on_prefetch_done(self, queue_entry: QueueEntry, future: Future) -> None:
+        """
+        Private method called on the main thread once a prefetch is done, to adopt its sound object
+        and resume the playback or pre-roll which was waiting for it
+        :param queue_entry: The queue entry the prefetch was submitted for
+        :param future: The future of the prefetch
+        :return: None
+        """
+        self._adopt_prefetched_sound(queue_entry, future)
+        if queue_entry.future is not None:
+            # Superseded by a newer prefetch, which resumes the waiting playback itself
+            return
+        if self._play_after_prefetch is queue_entry:
+            self._play_after_prefetch = None
+            if queue_entry is self._queue.current and queue_entry.sound is not None:
                 self.play()
+        if self._preroll_after_prefetch is queue_entry:
+            self._preroll_after_prefetch = None
+            if self._state == "play":
+                self._preroll_next()
 
-    def _configure_sound_obj(self, sound_obj: Sound) -> None:
+    @staticmethod
+    def _is_prefetching(queue_entry: Optional[QueueEntry]) -> bool:
         """
-        Private method to configure a sound object to match player behavior.
-        (Set its volume to globally declared volume, Bind `on_play` & `on_stop` methods...)
-        :param sound_obj: The sound object to be configured
-        :return:
+        Static-method to check whether the sound object of a queue entry is still being loaded by the prefetch worker
+        :param queue_entry: The queue entry to be checked
+        :return: bool
         """
-        sound_obj.volume = self._volume
-        sound_obj.bind(
-            on_play=lambda sound: self._initialize_estimation()
-        )
-        sound_obj.bind(
-            on_stop=lambda sound: self._cancel_estimation()
+        return queue_entry is not None and queue_entry.future is not None and not queue_entry.future.done()
+
+    def _unload_entry(self, queue_entry: QueueEntry) -> None:
+        """
+        Private method to free the sound object of a queue entry.
+        Sound objects created by the player are dropped entirely,
+        while the ones given by the user are only unloaded to be reloaded later
+        :param queue_entry: The queue entry to be unloaded
+        :return: None
+        """
+        if queue_entry.future is not None:
+            queue_entry.future.cancel()
+            queue_entry.future = None
+        self._events.detach(queue_entry)
+        self._sound_pool.discard(queue_entry)
+        if queue_entry.sound is None or not queue_entry.loaded:
+            return
+        queue_entry.sound.unload()
+        queue_entry.loaded = False
+        if queue_entry.owned:
+            queue_entry.sound = None
+
+    def _prefetch_entry(self, queue_entry: QueueEntry) -> None:
+        """
+        Private method to load the sound object of a queue entry on the background worker.
+        The sound object is attached to the entry on the main thread once loaded
+        :param queue_entry: The queue entry to be prefetched
+        :return: None
+        """
+        if queue_entry.loaded or queue_entry.future is not None or queue_entry.load_failed:
+            return
+        if queue_entry.sound is not None:
+            self._load_entry(queue_entry)
+            return
+        if self._prefetch_executor is None:
+            self._prefetch_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="AudioPlayerPrefetch"
+            )
+        future = queue_entry.future = self._prefetch_executor.submit(self._load_sound, queue_entry.source)
+        future.add_done_callback(
+            lambda done_future: Clock.schedule_once(
+                lambda dt: self._on_prefetch_done(queue_entry, done_future)
+            )
         )
 
+    def _get_prefetch_window(self) -> list:
+        """
+        Private method to get the current and the next `self._prefetch` queue entries
+        :return: list
+        """
+        window = []
+        if self._queue.current is not None:
+            window.append(self._queue.current)
+        for offset in range(min(self._prefetch + (not window), self._queue.upcoming_length)):
+            window.append(self._queue.peek(offset))
+        return window
+
+    def _evict_sounds(self) -> None:
+        """
+        Private method to unload the least recently used queue entries exceeding the pool's caps,
+        keeping the prefetch window and fading entries loaded
+        :return: None
+        """
+        protected = self._get_prefetch_window()
+        protected.extend(self._fades)
+        for queue_entry in self._sound_pool.evict(protected):
+            self._unload_entry(queue_entry)
+
+    def _update_prefetch_window(self) -> None:
+        """
+        Private method to prefetch the current and the next `self._prefetch` queue entries,
+        then evict sounds exceeding the pool's caps.
+        A change of the current entry counts as a pool access (a hit if it was already loaded)
+        :return: None
+        """
+        self._fill_radio()
+        window = self._get_prefetch_window()
+        if self._queue.current is not self._pool_current_entry:
+            self._pool_current_entry = self._queue.current
+            if self._pool_current_entry is not None:
+                self._sound_pool.access(self._pool_current_entry)
+        for queue_entry in window:
+            self._sound_pool.touch(queue_entry)
+            self._prefetch_entry(queue_entry)
+        self._evict_sounds()
+
+    def _unload_removed_entries(self) -> None:
+        """
+        Private method to unload the loaded queue entries which are no longer in the queue
+        :return: None
+        """
+        for queue_entry in tuple(self._sound_pool):
+            if queue_entry not in self._queue and queue_entry not in self._fades:
+                self._unload_entry(queue_entry)
+
+    def _enqueue_radio_source(self, source) -> None:
+        """
+        Private method to add a source pulled from the radio iterator at the end of the queue
+        :param source: Path, alias or sound object pulled from the radio iterator
+        :return: None
+        """
+        self._queue.extend(self._convert_values_to_queue_entries((source,), ignore_aliases=False))
+        if self._state == "queue empty":
+            self._state = "queue loaded"
+
+    def _fill_radio(self) -> None:
+        """
+        Private method to pull sources from the radio iterator until `self._radio_lookahead`
+        audio files are upcoming. Async iterators are pulled in a task of the running event loop
+        :return: None
+        """
+        if self._radio is None or self._queue.upcoming_length >= self._radio_lookahead:
+            return
+        if self._radio_is_async:
+            if self._radio_task is None:
+                self._radio_task = asyncio.ensure_future(self._fill_radio_async())
+            return
+        while self._queue.upcoming_length < self._radio_lookahead:
+            try:
+                source = next(self._radio)
+            except StopIteration:
+                self._radio = None
+                return
+            self._enqueue_radio_source(source)
+
+    async def _fill_radio_async(self) -> None:
+        """
+        Private coroutine pulling sources from an async radio iterator until the look-ahead is filled,
+        resuming playback if the player ran out of upcoming audio files meanwhile
+        :return: None
+        """
+        radio = self._radio
+        try:
+            while self._radio is radio and self._queue.upcoming_length < self._radio_lookahead:
+                try:
+                    source = await radio.__anext__()
+                except StopAsyncIteration:
+                    self._radio = None
+                    break
+                if self._radio is not radio:
+                    break
+                self._enqueue_radio_source(source)
+                if self._radio_waiting:
+                    self._radio_waiting = False
+                    self.skip_to_next(stop_current_playback=False)
+                else:
+                    self._update_prefetch_window()
+                self._events.dispatch("on_queue_changed")
+        finally:
+            if self._radio_task is asyncio.current_task():
+                self._radio_task = None
+
+    def start_radio(self,
+                    sources: Union[Iterator, AsyncIterator, Iterable],
+                    lookahead: int = 3,
+                    history: int = 20) -> None:
+        """
+        Method to switch to radio mode, pulling audio files lazily from the given (possibly infinite)
+        iterator or async iterator, so auto-generated stations run in constant memory.
+        Async iterators require a running asyncio event loop (e.g Kivy's async support)
+        :param sources: Iterator or async iterator of paths, aliases or sound objects
+        :param lookahead: Number of upcoming audio files to keep pulled
+        :param history: Number of played audio files to keep for `skip_to_previous`
+        :return: None
+        """
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1")
+        self.stop_radio()
+        if hasattr(sources, "__aiter__"):
+            # Raises `RuntimeError` right away if there is no running event loop to pull from
+            asyncio.get_running_loop()
+            self._radio = sources.__aiter__()
+            self._radio_is_async = True
+        else:
+            self._radio = iter(sources)
+            self._radio_is_async = False
+        self._radio_lookahead = lookahead
+        self._queue.max_history = history
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    def stop_radio(self) -> None:
+        """
+        Method to stop pulling from the radio iterator, keeping the already pulled audio files queued
+        :return: None
+        """
+        self._radio = None
+        self._radio_waiting = False
+        if self._radio_task is not None:
+            self._radio_task.cancel()
+            self._radio_task = None
+        self._queue.max_history = None
+
+    def _advance(self) -> bool:
+        """
+        Method to move the queue cursor to the next sound object.
+        When the end of the queue is reached, the queue is rewound and started over if looping.
+        In radio mode, the cursor waits for the async radio iterator instead of rewinding
+        :return: bool, whether the cursor moved
+        """
+        if self._radio is not None and not self._queue.upcoming_length:
+            self._fill_radio()
+            if not self._queue.upcoming_length:
+                self._radio_waiting = True
+                return False
+        if self._queue.advance() is None and self._loop:
+            self._queue.advance()
+        if self._queue.current is None:
+            # The end of the queue, playback is over without a gap or a play dispatch left to time
+            self._state = "queue loaded" if len(self._queue) else "queue empty"
+            self._track_ended_at = None
+            self._play_requested_at = None
+        self._update_prefetch_window()
+        return True
+
+    def _retreat(self) -> None:
+        """
+        Method to move the queue cursor to the previous sound object
+        :return: None
+        """
+        self._queue.retreat()
+        self._update_prefetch_window()
+
+    def _convert_values_to_queue_entries(self, values: tuple, ignore_aliases: bool) -> list:
+        """
+        Private method to resolve aliases of the given values and convert them to
+        queue entries, without loading them
+        :param values: Tuple of paths, aliases or sound objects
+        :param ignore_aliases: Whether to avoid fetching given values from registered aliases
+        :return: list
+        """
+        queue_entries = []
+        for audio_file in values:
+            if not ignore_aliases:
+                found_alias = self.get_alias(audio_file)
+                if found_alias:
+                    audio_file = found_alias
+            queue_entry = _convert_registration_value_to_queue_entry(audio_file)
+            if queue_entry.sound is not None:
+                self._sound_pool.add(queue_entry)
+            queue_entries.append(queue_entry)
+        return queue_entries
+
+    @staticmethod
+    def _check_volume(volume: Number) -> None:
+        """
+        Private static-method to check if a volume is a number from 0-1
+        :param volume: Volume to be checked
+        :return: None
+        """
+        if not isinstance(volume, (int, float)):
+            raise TypeError("volume can only be an instance of int or float")
+        if not 0 <= volume <= 1:
+            raise ValueError("volume can only be from 0-1")
+
+    def _get_entry_volume(self, queue_entry: QueueEntry) -> Number:
+        """
+        Private method to get the volume of a queue entry: the master gain scaled by the entry's gain offset.
+        The offset is resolved with `self._gain_function` the first time it is needed
+        :param queue_entry: The queue entry to get the volume of
+        :return: Number
+        """
+        if queue_entry.gain is None:
+            gain = self._gain_function(queue_entry.source) if self._gain_function is not None else None
+            queue_entry.gain = gain or 0
+        if not queue_entry.gain:
+            return self._volume
+        return min(self._volume * 10 ** (queue_entry.gain / 20), 1)
+
+    def _get_entry_trim(self, queue_entry: QueueEntry) -> Tuple[Number, Optional[Number]]:
+        """
+        Private method to get the trim points of a queue entry.
+        They are resolved with `self._trim_function` the first time they are needed
+        :param queue_entry: The queue entry to get the trim points of
+        :return: Tuple[Number, Optional[Number]], start & end in seconds, the end is `None` if not trimmed
+        """
+        if queue_entry.trim is None:
+            trim = self._trim_function(queue_entry.source) if self._trim_function is not None else None
+            # Trim points of a silent (or unreadable) audio file would skip all of it
+            queue_entry.trim = tuple(trim) if trim and 0 <= trim[0] < trim[1] else ()
+        if not queue_entry.trim:
+            return 0, None
+        return queue_entry.trim
+
+    def _get_end(self) -> Number:
+        """
+        Private method to get the position at which the current audio file ends, its trim end if it has one
+        :return: Number
+        """
+        end = self._get_entry_trim(self._queue.current)[1]
+        length = self.length
+        return length if end is None or not length else min(end, length)
+
+    def _activate_entry(self, queue_entry: QueueEntry) -> None:
+        """
+        Private method to apply the volume of a queue entry right before its sound object starts playing.
+        Sound objects which are not playing are never updated
+        :param queue_entry: The queue entry about to be played
+        :return: None
+        """
+        if queue_entry not in self._fades:
+            queue_entry.sound.volume = self._get_entry_volume(queue_entry)
+
+    def _apply_volume(self) -> None:
+        """
+        Private method to apply the master gain to the current sound object,
+        fading sound objects pick it up on their next fade step
+        :return: None
+        """
+        current_entry = self._queue.current
+        if current_entry is not None and current_entry.sound is not None:
+            self._activate_entry(current_entry)
+
     def clear_queue(self) -> None:
         """
-        Method to clear what is in the queue
+        Method to clear what is in the queue, except for the current audio file
         :return: None
         """
-        self._queue.clear()
+        self._queue.clear(keep_current=True)
+        self._unload_removed_entries()
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
 
     def load(self,
              *args: Union[str, Sound],
@@ -281,26 +1032,130 @@ class AudioPlayer:
         """
         if clear_previous_queue:
             self.clear_queue()
-        for audio_file in args:
-            if not ignore_aliases:
-                found_alias = self.get_alias(audio_file)
-                if found_alias:
-                    audio_file = found_alias
-            sound_obj = _convert_registration_value_to_sound_objs(audio_file)
-            self._configure_sound_obj(sound_obj)
-            self._queue.append(sound_obj)
+        self._queue.extend(self._convert_values_to_queue_entries(args, ignore_aliases))
+        if self._queue:
+            self._state = "queue loaded"
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    def insert_next(self, *args: Union[str, Sound], ignore_aliases: bool = False) -> None:
+        """
+        Method to add audio files to be played right after the current one, keeping their order
+        :param args: List of strings representing individual paths to audio files
+        or pre-initialized sound objects
+        :param ignore_aliases: Whether to avoid fetching given values from registered aliases
+        :return: None
+        """
+        self._queue.extendleft(self._convert_values_to_queue_entries(args, ignore_aliases))
         if self._queue:
             self._state = "queue loaded"
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    def _get_kept_drawn_length(self) -> int:
+        """
+        Private method to get the number of upcoming audio files to keep in place when shuffling:
+        the prefetched ones while an audio file is current, none before playback started
+        :return: int
+        """
+        return self._prefetch if self._queue.current is not None else 0
+
+    def reshuffle(self) -> None:
+        """
+        Method to re-shuffle the upcoming audio files (shuffling them if not shuffled yet).
+        While an audio file is current, the prefetched ones are kept in place, so their loading is not wasted
+        :return: None
+        """
+        self._queue.shuffle(keep_drawn=self._get_kept_drawn_length())
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    def set_gain(self, item, gain: Optional[Number]) -> None:
+        """
+        Method to set the gain offset of the queued audio files matching the given item
+        :param item: Path, source or sound object of the audio file
+        :param gain: Gain offset in dB (e.g ReplayGain track gain), `None` to resolve it with `gain_function`
+        :return: None
+        """
+        for queue_entry in self._queue:
+            if queue_entry == item:
+                queue_entry.gain = gain
+        self._volume_trigger()
+
+    def move(self, index: int, target_index: int) -> None:
+        """
+        Method to move an upcoming audio file to another position in the queue
+        :param index: Index of the upcoming audio file to be moved, 0 being the next one
+        :param target_index: Index among the upcoming audio files to move it to
+        :return: None
+        """
+        self._queue.move(index, target_index)
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    def remove_upcoming(self, index: int = 0) -> QueueEntry:
+        """
+        Method to remove an upcoming audio file from the queue
+        :param index: Index of the upcoming audio file to be removed, 0 being the next one
+        :return: QueueEntry
+        """
+        queue_entry = self._queue.remove_upcoming(index)
+        self._unload_entry(queue_entry)
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+        return queue_entry
+
+    def adopt_prefetches(self) -> None:
+        """
+        Method to attach the sound objects of the finished prefetches right away, instead of on the next clock tick,
+        starting the playback (or pre-roll) which was waiting for them. To be called on the main thread
+        :return: None
+        """
+        for queue_entry in self._get_prefetch_window():
+            if queue_entry.future is not None and queue_entry.future.done():
+                self._on_prefetch_done(queue_entry, queue_entry.future)
+
+    def get_prefetch_futures(self) -> list:
+        """
+        Method to get the futures of the prefetches of the prefetch window which are still running,
+        e.g to wait for them without blocking (see `AsyncAudioPlayer.prefetch`)
+        :return: list
+        """
+        return [
+            queue_entry.future for queue_entry in self._get_prefetch_window() if self._is_prefetching(queue_entry)
+        ]
+
+    def wait_prefetches(self, timeout: Optional[Number] = None) -> bool:
+        """
+        Method to block until the audio files of the prefetch window are loaded, then adopt them (see `adopt_prefetches`).
+        Meant for tests and replays, an app should rather let the prefetches finish in the background
+        :param timeout: Seconds to wait for, forever if `None`
+        :return: bool, whether every prefetch finished in time
+        """
+        futures = self.get_prefetch_futures()
+        not_done = wait(futures, timeout).not_done if futures else ()
+        self.adopt_prefetches()
+        return not not_done
 
     def unload(self) -> None:
         """
         Method to de-activate and shutdown the audio player
         :return: None
         """
-        if self._current_sound_obj:
-            self._current_sound_obj.unload()
+        self._cancel_transition()
+        self._finish_fades()
+        self.stop_radio()
+        self._events.detach()
         self._queue.clear()
+        self._unload_removed_entries()
+        self._update_prefetch_window()
+        self._play_after_prefetch = None
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+            self._prefetch_executor = None
+        self._telemetry.stop_logging()
         self._state = "queue empty"
+        self._events.dispatch("on_queue_changed")
 
     def play(self) -> None:
         """
@@ -308,29 +1163,62 @@ class AudioPlayer:
         If none, then advance in queue to load the next
         :return: None
         """
-        if not self._current_sound_obj:
-            self._jump_to_index(0)
+        self._play_requested_at = time.perf_counter()
+        if not self._has_current_sound():
+            self._queue.rewind()
+            self._queue.advance()
+            self._update_prefetch_window()
+            if not self._has_current_sound():
+                self._play_requested_at = None
+                return
+            self._resume_position = self._get_entry_trim(self._queue.current)[0]
+        if self._is_prefetching(self._queue.current):
+            # Started by `_on_prefetch_done`, instead of blocking the UI thread on the prefetch
+            if self._play_after_prefetch is not self._queue.current:
+                self._telemetry.count("underruns")
+                self._play_after_prefetch = self._queue.current
+            return
+        self._activate_entry(self._queue.current)
+        self._events.attach(self._queue.current)
         self._current_sound_obj.play()
+        if self._resume_position:
+            # Most providers cannot seek a stopped audio file, the restored position is applied once playing
+            self._current_sound_obj.seek(self._resume_position)
+            self._update_pos_estimate(self._resume_position)
+            self._resume_position = 0
         self._state = "play"
+        self._schedule_transition()
 
-    def stop(self) -> None:
+    def _stop_current(self, pause: bool) -> None:
         """
-        Method to pause the current audio file.
-        This method will set `self._external_stop_call` to `True`
-        when called to indicate that the stopping was from the wrapper class
+        Private method to stop the current audio file through the event dispatcher,
+        so the stop is not taken as a natural track end
+        :param pause: Whether to dispatch `on_paused` (as opposed to a stop for skipping)
         :return: None
         """
-        self._external_stop_call = True
-        self._current_sound_obj.stop()
+        self._cancel_transition()
+        self._finish_fades()
+        self._play_after_prefetch = None
+        self._events.stop_active(pause=pause)
         self._state = "stop"
-        self._external_stop_call = False
+
+    def stop(self) -> None:
+        """
+        Method to pause the current audio file
+        :return: None
+        """
+        self._stop_current(pause=True)
 
     def get_pos(self) -> Number:
         """
-        Method to get the position of the current audio file
+        Method to get the position of the current audio file.
+        While it is still being prefetched, the position `play` will start it from
         :return: Number
         """
-        return self._current_sound_obj.get_pos()
+        sound_obj = self._current_sound_obj
+        if sound_obj is None:
+            return self._resume_position
+        return sound_obj.get_pos()
 
     def seek(self, position: Number) -> None:
         """
@@ -338,7 +1226,33 @@ class AudioPlayer:
         :param position: Position to jump to in seconds
         :return: None
         """
-        self._current_sound_obj.seek(position)
+        start_time = time.perf_counter()
+        sound_obj = self._current_sound_obj
+        if sound_obj is None:
+            # Still being prefetched, applied by `play` once adopted
+            self._resume_position = position
+        else:
+            sound_obj.seek(position)
+            self._resume_position = 0
+        self._update_pos_estimate(position)
+        self._schedule_transition()
+        self._telemetry.record("seek", time.perf_counter() - start_time)
+        self._events.dispatch("on_seeked", self._queue.current, position)
+
+    def _restart_position(self) -> None:
+        """
+        Private method to move the current audio file back to its beginning (its trim start) when skipping,
+        without dispatching `on_seeked`
+        :return: None
+        """
+        start = self._get_entry_trim(self._queue.current)[0]
+        sound_obj = self._current_sound_obj
+        if sound_obj is not None:
+            # A sound object still being prefetched is adopted at its beginning anyway
+            sound_obj.seek(0)
+        self._update_pos_estimate(start)
+        # Applied by `play`, most providers cannot seek a stopped audio file
+        self._resume_position = start
 
     def fast_forward(self, seconds: Number = 10) -> None:
         """
@@ -348,13 +1262,11 @@ class AudioPlayer:
         """
         current_song_position = self.get_pos()
         current_song_length = self.length
-        if current_song_length - current_song_position > seconds:
+        if current_song_length is None or current_song_length - current_song_position > seconds:
             new_position = current_song_position + seconds
         else:
             new_position = current_song_length
         self.seek(new_position)
-        if self._estimate_position:
-            self._update_pos_estimate(new_position)
 
     def rewind(self, seconds: Number = 10) -> None:
         """
@@ -368,8 +1280,6 @@ class AudioPlayer:
         else:
             new_position = 0
         self.seek(new_position)
-        if self._estimate_position:
-            self._update_pos_estimate(new_position)
 
     def skip_to_next(self,
                      play_immediately: bool = True,
@@ -382,13 +1292,16 @@ class AudioPlayer:
         :param restart_audio_position: Whether to reset the position of the current audio file
         :return: None
         """
+        start_time = time.perf_counter()
         if stop_current_playback:
-            self.stop()
-        self._jump_to_index(self._queue_progress_index + 1)
+            self._stop_current(pause=False)
+        if not self._advance() or not self._has_current_sound():
+            return
         if restart_audio_position:
-            self.seek(0)
+            self._restart_position()
         if play_immediately:
             self.play()
+        self._telemetry.record("skip", time.perf_counter() - start_time)
 
     def skip_to_previous(self,
                          play_immediately: bool = True,
@@ -401,35 +1314,66 @@ class AudioPlayer:
         :param restart_audio_position: Whether to reset the position of the current audio file
         :return: None
         """
+        start_time = time.perf_counter()
         if stop_current_playback:
-            self.stop()
-        self._jump_to_index(
-            self._normalize_index(self._queue_progress_index - 1)
-        )
+            self._stop_current(pause=False)
+        self._retreat()
+        if not self._has_current_sound():
+            return
         if restart_audio_position:
-            self.seek(0)
+            self._restart_position()
         if play_immediately:
             self.play()
+        self._telemetry.record("skip", time.perf_counter() - start_time)
+
+    def _has_current_sound(self) -> bool:
+        """
+        Private method to check whether there is a current audio file to be played,
+        without waiting for it if it is still being prefetched
+        :return: bool
+        """
+        return self._is_prefetching(self._queue.current) or self._current_sound_obj is not None
+
+    @property
+    def _current_sound_obj(self) -> Optional[Sound]:
+        # The current audio file is loaded right away if it was not prefetched in time (an underrun),
+        # `None` while it is still being prefetched or if it failed to load
+        current_entry = self._queue.current
+        if current_entry is None:
+            return None
+        return self._load_entry(current_entry, underrun=True)
 
     @property
     def queue_progress_index(self) -> int:
-        return self._queue_progress_index
+        return self._queue.index
 
     @property
     def state(self) -> str:
         return self._state
 
     @property
-    def source(self) -> str:
-        return self._current_sound_obj.source
+    def current_entry(self) -> Optional[QueueEntry]:
+        return self._queue.current
 
     @property
-    def length(self) -> float:
-        return self._current_sound_obj.length
+    def play_pending(self) -> bool:
+        # Whether `play` is waiting for the current audio file to be prefetched, it starts once adopted
+        return self._play_after_prefetch is not None
+
+    @property
+    def source(self) -> Optional[str]:
+        current_entry = self._queue.current
+        return None if current_entry is None else current_entry.source
+
+    @property
+    def length(self) -> Optional[float]:
+        # Unknown while the current audio file is still being prefetched
+        sound_obj = self._current_sound_obj
+        return None if sound_obj is None else sound_obj.length
 
     @property
     def human_readable_length(self) -> str:
-        return human_readable_duration(self.length)
+        return human_readable_duration(self.length or 0)
 
     @property
     def volume(self) -> Number:
@@ -437,18 +1381,183 @@ class AudioPlayer:
 
     @volume.setter
     def volume(self, new_volume: Number) -> None:
-        if not isinstance(new_volume, (int, float)):
-            raise TypeError("volume can only be an instance of int or float")
-        if 0 > new_volume > 1:
-            raise ValueError("volume can only be from 0-1")
+        self._check_volume(new_volume)
         self._volume = new_volume
-        for sound_obj in self._queue:
-            sound_obj.volume = self._volume
+        # Coalescing slider drags, the master gain is applied at most once per frame
+        self._volume_trigger()
+
+    @property
+    def gain_function(self) -> Optional[Callable[[str], Optional[Number]]]:
+        return self._gain_function
+
+    @gain_function.setter
+    def gain_function(self, new_gain_function: Optional[Callable[[str], Optional[Number]]]) -> None:
+        # Already resolved gain offsets are kept, only new queue entries use the new function
+        self._gain_function = new_gain_function
+
+    @property
+    def trim_function(self) -> Optional[Callable[[str], Optional[Tuple[Number, Number]]]]:
+        return self._trim_function
+
+    @trim_function.setter
+    def trim_function(self, new_trim_function: Optional[Callable[[str], Optional[Tuple[Number, Number]]]]) -> None:
+        # Already resolved trim points are kept, only new queue entries use the new function
+        self._trim_function = new_trim_function
+        self._schedule_transition()
+
+    @property
+    def shuffle(self) -> bool:
+        return self._queue.shuffled
+
+    @shuffle.setter
+    def shuffle(self, new_shuffle: bool) -> None:
+        if new_shuffle == self._queue.shuffled:
+            return
+        if new_shuffle:
+            self._queue.shuffle(keep_drawn=self._get_kept_drawn_length())
+        else:
+            self._queue.unshuffle()
+        self._update_prefetch_window()
+        self._events.dispatch("on_queue_changed")
+
+    @property
+    def random_generator(self) -> random.Random:
+        return self._queue.random_generator
+
+    @property
+    def radio(self) -> bool:
+        # Whether sources are still being pulled from a radio iterator
+        return self._radio is not None
+
+    @property
+    def radio_lookahead(self) -> int:
+        return self._radio_lookahead
+
+    @radio_lookahead.setter
+    def radio_lookahead(self, new_radio_lookahead: int) -> None:
+        if new_radio_lookahead < 1:
+            raise ValueError("radio_lookahead must be at least 1")
+        self._radio_lookahead = new_radio_lookahead
+        self._update_prefetch_window()
+
+    def stats(self) -> dict:
+        """
+        Method to get a snapshot of the player's latency histograms, health counters and pool usage
+        :return: dict
+        """
+        stats = self._telemetry.stats()
+        stats["sound_pool"] = self._sound_pool.stats()
+        return stats
+
+    @property
+    def telemetry(self) -> PlayerTelemetry:
+        return self._telemetry
+
+    @property
+    def events(self) -> PlayerEventDispatcher:
+        return self._events
+
+    @property
+    def sound_pool(self) -> SoundPool:
+        return self._sound_pool
+
+    @property
+    def max_sounds(self) -> int:
+        return self._sound_pool.max_sounds
+
+    @max_sounds.setter
+    def max_sounds(self, new_max_sounds: int) -> None:
+        self._sound_pool.max_sounds = new_max_sounds
+        self._evict_sounds()
+
+    @property
+    def max_memory(self) -> Optional[int]:
+        return self._sound_pool.max_memory
+
+    @max_memory.setter
+    def max_memory(self, new_max_memory: Optional[int]) -> None:
+        self._sound_pool.max_memory = new_max_memory
+        self._evict_sounds()
+
+    @property
+    def prefetch(self) -> int:
+        return self._prefetch
+
+    @prefetch.setter
+    def prefetch(self, new_prefetch: int) -> None:
+        if new_prefetch < 0:
+            raise ValueError("prefetch cannot be negative")
+        self._prefetch = new_prefetch
+        self._update_prefetch_window()
+
+    @property
+    def gapless(self) -> bool:
+        return self._gapless
+
+    @gapless.setter
+    def gapless(self, new_gapless: bool) -> None:
+        self._gapless = new_gapless
+        self._schedule_transition()
+
+    @property
+    def preroll(self) -> Number:
+        return self._preroll
+
+    @preroll.setter
+    def preroll(self, new_preroll: Number) -> None:
+        if new_preroll < 0:
+            raise ValueError("preroll cannot be negative")
+        self._preroll = new_preroll
+        self._schedule_transition()
+
+    @property
+    def crossfade(self) -> Number:
+        return self._crossfade
+
+    @crossfade.setter
+    def crossfade(self, new_crossfade: Number) -> None:
+        if new_crossfade < 0:
+            raise ValueError("crossfade cannot be negative")
+        self._crossfade = new_crossfade
+        self._schedule_transition()
+
+    @property
+    def last_transition_latency(self) -> Optional[float]:
+        # Seconds between the end of the previous audio file and the start of the next one
+        return self._transition_latencies[-1] if self._transition_latencies else None
+
+    @property
+    def transition_latencies(self) -> tuple:
+        return tuple(self._transition_latencies)
+
+    def bind_pos_estimate(self, callback) -> None:
+        """
+        Method to bind a callback receiving `(player, pos_estimate)` every `interval` seconds
+        while an audio file is playing. This is the only use of the clock for position estimation,
+        so nothing is scheduled when no callback is bound
+        :param callback: Callable to be called with the player and the position estimate
+        :return: None
+        """
+        self._pos_callbacks.append(callback)
+        self._start_pos_notifier()
+
+    def unbind_pos_estimate(self, callback) -> None:
+        """
+        Method to unbind a callback bound with `bind_pos_estimate`
+        :param callback: Callable to be unbound
+        :return: None
+        """
+        self._pos_callbacks.remove(callback)
+        if not self._pos_callbacks:
+            self._cancel_pos_notifier()
 
     @property
     def pos_estimate(self) -> Number:
-        return self._pos_estimate
+        # Computed on read from the monotonic clock, so it never drifts with frame hitches
+        if self._pos_anchor_time is None:
+            return self._pos_anchor
+        return self._pos_anchor + time.monotonic() - self._pos_anchor_time
 
     @property
     def human_readable_pos_estimate(self) -> str:
-        return human_readable_duration(self._pos_estimate)
+        return human_readable_duration(self.pos_estimate)
@@ -0,0 +1,226 @@
+"""
+Headless benchmarks of `AudioPlayer` on the virtual audio backend, no sound device needed:
+
+    python -m src.utils.audio.audioplayer.benchmark
+
+Measures skip and seek latency, the cost of enqueueing 10k tracks, the memory per queued track
+and the realtime factor of the DSP stages (run it on the target device to know its headroom)
+"""
+
+import os
+import math
+import time
+import tempfile
+import tracemalloc
+import statistics
+import numpy as np
+from typing import Callable, Dict, List, Final
+from kivy.core.audio import SoundLoader
+from src.utils.audio.decoding import PCM_SAMPLE_RATE, PCM_CHANNELS, PCM_FRAME_SIZE
+from src.utils.audio.audioplayer.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.dsp import ParametricEQ, ReplayGain, SoftLimiter, DSPChain
+from src.utils.audio.audioplayer.sinks import FileSink
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualClock, VirtualSound, virtual_source
+
+__all__ = (
+    "register_virtual_backend",
+    "virtual_sources",
+    "benchmark_skip_latency",
+    "benchmark_seek_latency",
+    "benchmark_enqueue",
+    "benchmark_memory_per_track",
+    "benchmark_dsp_realtime_factor",
+    "run_benchmarks",
+)
+
+
+_BENCHMARK_EQ_BANDS: Final = (
+    ("lowshelf", 80, 3),
+    ("peaking", 250, -2, 1.0),
+    ("peaking", 1000, 1.5, 1.0),
+    ("peaking", 4000, -1, 1.0),
+    ("highshelf", 10000, 2),
+)
+
+
+def register_virtual_backend() -> None:
+    """
+    Function to register the virtual sound provider with `SoundLoader` (once)
+    and reset its clock
+    :return: None
+    """
+    if VirtualSound not in SoundLoader._classes:
+        SoundLoader.register(VirtualSound)
+    VirtualSound.clock = VirtualClock()
+
+
+def virtual_sources(count: int, length: float = 180, load_delay: float = 0) -> List[str]:
+    """
+    Function to build the sources of the given number of virtual audio files
+    :param count: Number of sources
+    :param length: Length of each virtual audio file in seconds
+    :param load_delay: Seconds spent loading each virtual audio file
+    :return: List[str]
+    """
+    return [virtual_source(f"track-{index}", length, load_delay) for index in range(count)]
+
+
+def _summarize(durations: List[float]) -> Dict[str, float]:
+    """
+    Private function to summarize durations in seconds as milliseconds
+    :param durations: List of durations in seconds
+    :return: Dict[str, float]
+    """
+    durations = sorted(durations)
+    # Nearest-rank percentile, the smallest duration at least 95% of the durations are under
+    p95_index = min(math.ceil(0.95 * len(durations)) - 1, len(durations) - 1)
+    return {
+        "count": len(durations),
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "median_ms": statistics.median(durations) * 1000,
+        "p95_ms": durations[p95_index] * 1000,
+        "max_ms": durations[-1] * 1000,
+    }
+
+
+def _time_calls(function: Callable[[], None], repeat: int) -> List[float]:
+    """
+    Private function to time every call of the given function
+    :param function: Callable to be timed
+    :param repeat: Number of calls
+    :return: List[float]
+    """
+    durations = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return durations
+
+
+def benchmark_skip_latency(tracks: int = 1000, skips: int = 500, load_delay: float = 0.002) -> Dict[str, float]:
+    """
+    Function to measure how long `skip_to_next` takes while playing, with a simulated decoding delay
+    :param tracks: Number of tracks in the queue
+    :param skips: Number of skips to be timed
+    :param load_delay: Seconds spent loading each virtual audio file
+    :return: Dict[str, float]
+    """
+    register_virtual_backend()
+    player = AudioPlayer(virtual_sources(tracks, load_delay=load_delay), loop=True)
+    player.play()
+    durations = _time_calls(player.skip_to_next, skips)
+    player.unload()
+    return _summarize(durations)
+
+
+def benchmark_seek_latency(seeks: int = 1000) -> Dict[str, float]:
+    """
+    Function to measure how long `seek` takes while playing
+    :param seeks: Number of seeks to be timed
+    :return: Dict[str, float]
+    """
+    register_virtual_backend()
+    player = AudioPlayer(virtual_sources(3))
+    player.play()
+    positions = iter(range(seeks))
+    durations = _time_calls(lambda: player.seek(next(positions) % 170), seeks)
+    player.unload()
+    return _summarize(durations)
+
+
+def benchmark_enqueue(tracks: int = 10000, repeat: int = 5) -> Dict[str, float]:
+    """
+    Function to measure how long enqueueing the given number of tracks takes
+    :param tracks: Number of tracks enqueued at once
+    :param repeat: Number of timed enqueues, each on a new player
+    :return: Dict[str, float]
+    """
+    register_virtual_backend()
+    sources = virtual_sources(tracks)
+    durations = []
+    for _ in range(repeat):
+        player = AudioPlayer()
+        start_time = time.perf_counter()
+        player.load(*sources)
+        durations.append(time.perf_counter() - start_time)
+        player.unload()
+    return _summarize(durations)
+
+
+def benchmark_memory_per_track(tracks: int = 10000) -> Dict[str, float]:
+    """
+    Function to measure the memory allocated per queued track (not counting the source strings)
+    :param tracks: Number of tracks enqueued
+    :return: Dict[str, float]
+    """
+    register_virtual_backend()
+    sources = virtual_sources(tracks)
+    player = AudioPlayer(prefetch=0)
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        player.load(*sources)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    player.unload()
+    return {
+        "tracks": tracks,
+        "bytes_per_track": (after - before) / tracks,
+        "peak_bytes": peak - before,
+    }
+
+
+def benchmark_dsp_realtime_factor(duration: float = 30, block_frames: int = 1024) -> Dict[str, float]:
+    """
+    Function to measure how many times faster than realtime each DSP stage, and the whole chain,
+    processes a synthetic signal block by block into a WAV file sink.
+    "none" is the cost of the PCM conversions and of the sink alone
+    :param duration: Seconds of audio to be processed
+    :param block_frames: Frames per block, like `LinuxSoundPlayer.block_frames`
+    :return: Dict[str, float]
+    """
+    stage_factories = {
+        "none": lambda: (),
+        "eq": lambda: (ParametricEQ(_BENCHMARK_EQ_BANDS),),
+        "replaygain": lambda: (ReplayGain(-6, peak=0.9),),
+        "limiter": lambda: (SoftLimiter(),),
+        "chain": lambda: (ParametricEQ(_BENCHMARK_EQ_BANDS), ReplayGain(-6, peak=0.9), SoftLimiter()),
+    }
+    samples = np.random.default_rng(0).uniform(-0.9, 0.9, (int(duration * PCM_SAMPLE_RATE), PCM_CHANNELS))
+    data = (samples * 32767).astype(np.int16).tobytes()
+    block_size = block_frames * PCM_FRAME_SIZE
+    results = {}
+    with tempfile.TemporaryDirectory() as directory_path:
+        for stage_name, stage_factory in stage_factories.items():
+            chain = DSPChain(stage_factory())
+            sink = FileSink(os.path.join(directory_path, f"{stage_name}.wav"))
+            sink.open(PCM_SAMPLE_RATE, PCM_CHANNELS)
+            start_time = time.perf_counter()
+            for offset in range(0, len(data), block_size):
+                sink.write(chain.process_pcm(data[offset:offset + block_size]))
+            results[f"{stage_name}_realtime_factor"] = duration / (time.perf_counter() - start_time)
+            sink.close()
+    return results
+
+
+def run_benchmarks() -> Dict[str, Dict[str, float]]:
+    """
+    Function to run every benchmark with its default parameters
+    :return: Dict[str, Dict[str, float]]
+    """
+    return {
+        "skip_latency": benchmark_skip_latency(),
+        "seek_latency": benchmark_seek_latency(),
+        "enqueue_10k": benchmark_enqueue(),
+        "memory_per_track": benchmark_memory_per_track(),
+        "dsp_realtime_factor": benchmark_dsp_realtime_factor(),
+    }
+
+
+if __name__ == "__main__":
+    for benchmark_name, results in run_benchmarks().items():
+        print(benchmark_name)
+        for result_name, value in results.items():
+            print(f"    {result_name:<16}{value:.3f}" if isinstance(value, float) else f"    {result_name:<16}{value}")
@@ -0,0 +1,549 @@
+"""
+NumPy processing chain applied per block to the decoded PCM frames of `LinuxSoundPlayer`:
+
+    sound.dsp_chain.add(ParametricEQ([("lowshelf", 100, 4), ("peaking", 3000, -2, 1.4)]))
+    sound.dsp_chain.add(ReplayGain(-6.5, peak=0.98))
+    sound.dsp_chain.add(SoftLimiter())
+
+Blocks are float32 arrays of shape (frames, channels) with samples in [-1, 1].
+Stages are added and removed from any thread while the output thread is processing:
+the chain is swapped as a whole and a stage is faded in (or out) over one block, so edits never click
+"""
+
+import math
+import numpy as np
+from typing import Iterable, Optional, Final, Tuple
+from src.type_aliases import Number
+from src.utils.audio.decoding import PCM_SAMPLE_RATE, PCM_CHANNELS
+
+__all__ = (
+    "BIQUAD_KINDS",
+    "DSPStage",
+    "Biquad",
+    "ParametricEQ",
+    "ReplayGain",
+    "SoftLimiter",
+    "DSPChain",
+)
+
+
+BIQUAD_KINDS: Final = (
+    "peaking",
+    "lowshelf",
+    "highshelf",
+    "lowpass",
+    "highpass",
+)
+"""
+Kinds of biquad sections, after the Audio EQ Cookbook by Robert Bristow-Johnson
+"""
+_BIQUAD_CHUNK_FRAMES: Final = 256
+_INT16_SCALE: Final = 32768
+
+
+def _db_to_amplitude(gain: Number) -> float:
+    """
+    Private function to convert a gain in decibels to an amplitude factor
+    :param gain: Gain in decibels
+    :return: float
+    """
+    return 10 ** (gain / 20)
+
+
+class DSPStage:
+    """
+    Base class of the processing stages, passing blocks through unchanged
+    """
+    __slots__ = (
+        "_sample_rate",
+        "_channels",
+    )
+
+    def __init__(self):
+        self._sample_rate = PCM_SAMPLE_RATE
+        self._channels = PCM_CHANNELS
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}()"
+
+    def prepare(self, sample_rate: int, channels: int) -> None:
+        """
+        Method to configure the stage for blocks of the given format, resetting its state
+        :param sample_rate: Frames per second
+        :param channels: Samples per frame
+        :return: None
+        """
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Method to forget the state carried from block to block (e.g after a seek)
+        :return: None
+        """
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Method to process a block, the given block may be modified in place
+        :param block: float32 array of shape (frames, channels)
+        :return: np.ndarray, processed block of the same shape
+        """
+        return block
+
+
+class Biquad(DSPStage):
+    """
+    Second order IIR section. The recursion is evaluated per chunk of frames as matrix products:
+    the zero-state responses of every chunk of a block are computed at once with the Toeplitz matrix
+    of the impulse response, only the state left by each chunk is carried over sequentially.
+    The matrices and the carried state are float64, only the output block is cast to float32:
+    the poles of low frequency sections are too close to 1 for float32 round-off not to build up
+    """
+    __slots__ = (
+        "_kind",
+        "_frequency",
+        "_gain",
+        "_q",
+        "_coefficients",
+        "_impulse_matrix",
+        "_state_matrix",
+        "_state",
+    )
+
+    def __init__(self, kind: str, frequency: Number, gain: Number = 0, q: Number = 0.7071):
+        if kind not in BIQUAD_KINDS:
+            raise ValueError(f"kind must be one of {BIQUAD_KINDS!r}")
+        super().__init__()
+        self._kind = kind
+        self._frequency = frequency
+        self._gain = gain
+        self._q = q
+        self._coefficients = None
+        self._impulse_matrix = None
+        self._state_matrix = None
+        self._state = None
+        self.prepare(self._sample_rate, self._channels)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"kind={self._kind!r}, " \
+               f"frequency={self._frequency!r}, " \
+               f"gain={self._gain!r}, " \
+               f"q={self._q!r})"
+
+    def _compute_coefficients(self) -> Tuple[float, float, float, float, float]:
+        """
+        Private method to compute the normalized coefficients (b0, b1, b2, a1, a2) of the section
+        :return: Tuple[float, float, float, float, float]
+        """
+        amplitude = 10 ** (self._gain / 40)
+        omega = 2 * math.pi * min(self._frequency, self._sample_rate * 0.49) / self._sample_rate
+        cos_omega = math.cos(omega)
+        alpha = math.sin(omega) / (2 * self._q)
+        if self._kind == "peaking":
+            b = (1 + alpha * amplitude, -2 * cos_omega, 1 - alpha * amplitude)
+            a = (1 + alpha / amplitude, -2 * cos_omega, 1 - alpha / amplitude)
+        elif self._kind in ("lowshelf", "highshelf"):
+            sign = 1 if self._kind == "lowshelf" else -1
+            root = 2 * math.sqrt(amplitude) * alpha
+            b = (
+                amplitude * ((amplitude + 1) - sign * (amplitude - 1) * cos_omega + root),
+                sign * 2 * amplitude * ((amplitude - 1) - sign * (amplitude + 1) * cos_omega),
+                amplitude * ((amplitude + 1) - sign * (amplitude - 1) * cos_omega - root),
+            )
+            a = (
+                (amplitude + 1) + sign * (amplitude - 1) * cos_omega + root,
+                -sign * 2 * ((amplitude - 1) + sign * (amplitude + 1) * cos_omega),
+                (amplitude + 1) + sign * (amplitude - 1) * cos_omega - root,
+            )
+        elif self._kind == "lowpass":
+            b = ((1 - cos_omega) / 2, 1 - cos_omega, (1 - cos_omega) / 2)
+            a = (1 + alpha, -2 * cos_omega, 1 - alpha)
+        else:
+            b = ((1 + cos_omega) / 2, -(1 + cos_omega), (1 + cos_omega) / 2)
+            a = (1 + alpha, -2 * cos_omega, 1 - alpha)
+        return b[0] / a[0], b[1] / a[0], b[2] / a[0], a[1] / a[0], a[2] / a[0]
+
+    def _run_recursion(self, inputs: np.ndarray, state: Tuple[float, float, float, float]) -> np.ndarray:
+        """
+        Private method to run the recursion sample by sample, only used to build the chunk matrices
+        :param inputs: Input samples
+        :param state: Previous (input, input before, output, output before)
+        :return: np.ndarray
+        """
+        b0, b1, b2, a1, a2 = self._coefficients
+        x1, x2, y1, y2 = state
+        outputs = np.empty(len(inputs))
+        for index, x in enumerate(inputs):
+            y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+            outputs[index] = y
+            x2, x1, y2, y1 = x1, x, y1, y
+        return outputs
+
+    def prepare(self, sample_rate: int, channels: int) -> None:
+        super().prepare(sample_rate, channels)
+        self._coefficients = self._compute_coefficients()
+        impulse = np.zeros(_BIQUAD_CHUNK_FRAMES)
+        impulse[0] = 1
+        impulse_response = self._run_recursion(impulse, (0, 0, 0, 0))
+        indices = np.arange(_BIQUAD_CHUNK_FRAMES)
+        lags = indices[:, np.newaxis] - indices[np.newaxis, :]
+        self._impulse_matrix = np.where(lags >= 0, impulse_response[np.clip(lags, 0, None)], 0)
+        silence = np.zeros(_BIQUAD_CHUNK_FRAMES)
+        self._state_matrix = np.stack([
+            self._run_recursion(silence, state) for state in np.eye(4)
+        ], axis=1)
+
+    def reset(self) -> None:
+        self._state = np.zeros((4, self._channels))
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        size = len(block)
+        if not size:
+            return block
+        chunk_count = -(-size // _BIQUAD_CHUNK_FRAMES)
+        # Zero padding the last chunk does not change the outputs before it, the filter is causal
+        chunks = np.zeros((chunk_count * _BIQUAD_CHUNK_FRAMES, block.shape[1]))
+        chunks[:size] = block
+        chunks = chunks.reshape(chunk_count, _BIQUAD_CHUNK_FRAMES, block.shape[1])
+        zero_state_responses = self._impulse_matrix @ chunks
+        # State before each chunk: (input, input before, output, output before)
+        states = np.empty((chunk_count, 4, block.shape[1]))
+        states[0] = self._state
+        states[1:, 0] = chunks[:-1, -1]
+        states[1:, 1] = chunks[:-1, -2]
+        tail_state_matrix = self._state_matrix[:-3:-1]
+        for index in range(1, chunk_count):
+            states[index, 2:] = zero_state_responses[index - 1, :-3:-1] + tail_state_matrix @ states[index - 1]
+        output = (zero_state_responses + self._state_matrix @ states).reshape(-1, block.shape[1])[:size]
+        if size >= 2:
+            self._state = np.stack((block[-1], block[-2], output[-1], output[-2]))
+        else:
+            self._state = np.stack((block[-1], self._state[0], output[-1], self._state[2]))
+        return output.astype(np.float32)
+
+    @property
+    def kind(self) -> str:
+        return self._kind
+
+    @property
+    def frequency(self) -> Number:
+        return self._frequency
+
+    @property
+    def gain(self) -> Number:
+        return self._gain
+
+    @property
+    def q(self) -> Number:
+        return self._q
+
+    @property
+    def coefficients(self) -> Tuple[float, float, float, float, float]:
+        return self._coefficients
+
+
+class ParametricEQ(DSPStage):
+    """
+    Equalizer made of biquad sections in series, each given as `(kind, frequency, gain, q)`
+    (the gain and q are optional, see `Biquad`)
+    """
+    __slots__ = (
+        "_sections",
+    )
+
+    def __init__(self, bands: Iterable[tuple]):
+        super().__init__()
+        self._sections = tuple(Biquad(*band) for band in bands)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"sections={self._sections!r})"
+
+    def prepare(self, sample_rate: int, channels: int) -> None:
+        super().prepare(sample_rate, channels)
+        for section in self._sections:
+            section.prepare(sample_rate, channels)
+
+    def reset(self) -> None:
+        for section in getattr(self, "_sections", ()):
+            section.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        for section in self._sections:
+            block = section.process(block)
+        return block
+
+    @property
+    def sections(self) -> Tuple[Biquad, ...]:
+        return self._sections
+
+
+class ReplayGain(DSPStage):
+    """
+    ReplayGain scaling of a track (or album): the gain in decibels plus a preamp,
+    limited by the peak when `prevent_clipping` so the scaled peak stays below full scale.
+    Changes of the gain are ramped over the next block
+    """
+    __slots__ = (
+        "_gain",
+        "_peak",
+        "_preamp",
+        "_prevent_clipping",
+        "_scale",
+        "_applied_scale",
+    )
+
+    def __init__(self, gain: Number = 0, peak: Optional[Number] = None, preamp: Number = 0, prevent_clipping: bool = True):
+        super().__init__()
+        self._gain = gain
+        self._peak = peak
+        self._preamp = preamp
+        self._prevent_clipping = prevent_clipping
+        self._scale = self._compute_scale()
+        self._applied_scale = self._scale
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"gain={self._gain!r}, " \
+               f"peak={self._peak!r}, " \
+               f"preamp={self._preamp!r})"
+
+    def _compute_scale(self) -> float:
+        """
+        Private method to compute the amplitude factor applied to the samples
+        :return: float
+        """
+        scale = _db_to_amplitude(self._gain + self._preamp)
+        if self._prevent_clipping and self._peak:
+            scale = min(scale, 1 / self._peak)
+        return scale
+
+    def set_gain(self, gain: Number, peak: Optional[Number] = None) -> None:
+        """
+        Method to change the gain (e.g when the next track starts), ramped over the next block
+        :param gain: Gain in decibels
+        :param peak: Peak amplitude of the track, from 0 to 1
+        :return: None
+        """
+        self._gain = gain
+        self._peak = peak
+        self._scale = self._compute_scale()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        scale = self._scale
+        if scale != self._applied_scale:
+            ramp = np.linspace(self._applied_scale, scale, len(block), dtype=np.float32)
+            self._applied_scale = scale
+            block *= ramp[:, np.newaxis]
+        elif scale != 1:
+            block *= scale
+        return block
+
+    @property
+    def gain(self) -> Number:
+        return self._gain
+
+    @property
+    def peak(self) -> Optional[Number]:
+        return self._peak
+
+    @property
+    def scale(self) -> float:
+        return self._scale
+
+
+class SoftLimiter(DSPStage):
+    """
+    Memoryless soft limiter: samples below the threshold pass through,
+    louder ones are bent with a tanh curve so the output never exceeds full scale
+    """
+    __slots__ = (
+        "_threshold",
+        "_knee",
+    )
+
+    def __init__(self, threshold: Number = -1.0):
+        super().__init__()
+        self._threshold = threshold
+        self._knee = _db_to_amplitude(threshold)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"threshold={self._threshold!r})"
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        knee = self._knee
+        magnitudes = np.abs(block)
+        over = magnitudes > knee
+        if over.any():
+            headroom = 1 - knee
+            limited = knee + headroom * np.tanh((magnitudes[over] - knee) / headroom)
+            block[over] = np.copysign(limited, block[over])
+        return block
+
+    @property
+    def threshold(self) -> Number:
+        return self._threshold
+
+
+class _StageSlot:
+    """
+    Private class of a stage in a chain, with its fade state.
+    `target` is only written by the thread editing the chain, `mix` only by the processing thread
+    """
+    __slots__ = (
+        "stage",
+        "target",
+        "mix",
+    )
+
+    def __init__(self, stage: DSPStage):
+        self.stage = stage
+        self.target = 1.0
+        self.mix = 0.0
+
+    @property
+    def finished(self) -> bool:
+        # Faded out for good, the processing thread will not touch it anymore
+        return self.target == 0 and self.mix == 0
+
+
+class DSPChain:
+    """
+    Ordered chain of stages processing the blocks of a playback.
+    Edits build a new tuple of slots which replaces the old one in a single assignment,
+    the processing thread picks it up on its next block without any lock
+    """
+    __slots__ = (
+        "_slots",
+        "_sample_rate",
+        "_channels",
+    )
+
+    def __init__(self, stages: Iterable[DSPStage] = ()):
+        self._sample_rate = PCM_SAMPLE_RATE
+        self._channels = PCM_CHANNELS
+        self._slots = ()
+        for stage in stages:
+            self.add(stage, fade=False)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"stages={self.stages!r})"
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def __bool__(self) -> bool:
+        return any(not slot.finished for slot in self._slots)
+
+    def _get_live_slots(self) -> tuple:
+        """
+        Private method to get the slots which are not faded out yet
+        :return: tuple
+        """
+        return tuple(slot for slot in self._slots if not slot.finished)
+
+    def prepare(self, sample_rate: int, channels: int) -> None:
+        """
+        Method to configure every stage for blocks of the given format
+        :param sample_rate: Frames per second
+        :param channels: Samples per frame
+        :return: None
+        """
+        self._sample_rate = sample_rate
+        self._channels = channels
+        for slot in self._slots:
+            slot.stage.prepare(sample_rate, channels)
+
+    def reset(self) -> None:
+        """
+        Method to reset the state of every stage (e.g after a seek)
+        :return: None
+        """
+        for slot in self._slots:
+            slot.stage.reset()
+
+    def add(self, stage: DSPStage, index: Optional[int] = None, fade: bool = True) -> None:
+        """
+        Method to insert a stage, faded in over the next block
+        :param stage: Stage to be inserted
+        :param index: Position among the stages, at the end if `None`
+        :param fade: Whether to fade the stage in, instead of applying it fully right away
+        :return: None
+        """
+        stage.prepare(self._sample_rate, self._channels)
+        stage_slot = _StageSlot(stage)
+        if not fade:
+            stage_slot.mix = 1.0
+        slots = list(self._get_live_slots())
+        position = len(slots)
+        if index is not None:
+            # Slots fading out are skipped, `index` counts the stages only
+            stage_positions = [position for position, slot in enumerate(slots) if slot.target]
+            if index < len(stage_positions):
+                position = stage_positions[index]
+        slots.insert(position, stage_slot)
+        self._slots = tuple(slots)
+
+    def remove(self, stage: DSPStage) -> None:
+        """
+        Method to remove a stage, faded out over the next block
+        :param stage: Stage to be removed
+        :return: None
+        """
+        for slot in self._slots:
+            if slot.stage is stage and slot.target:
+                slot.target = 0.0
+                self._slots = self._get_live_slots()
+                return
+        raise ValueError(f"{stage!r} is not in the chain")
+
+    def clear(self) -> None:
+        """
+        Method to remove every stage, faded out over the next block
+        :return: None
+        """
+        for slot in self._slots:
+            slot.target = 0.0
+        self._slots = self._get_live_slots()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Method to run a block through every stage, only from a single processing thread
+        :param block: float32 array of shape (frames, channels)
+        :return: np.ndarray
+        """
+        for slot in self._slots:
+            target = slot.target
+            mix = slot.mix
+            if mix == target == 0:
+                continue
+            if mix == target:
+                block = slot.stage.process(block)
+                continue
+            dry = block.copy()
+            wet = slot.stage.process(block)
+            ramp = np.linspace(mix, target, len(block), dtype=np.float32)[:, np.newaxis]
+            block = dry + (wet - dry) * ramp
+            slot.mix = target
+        return block
+
+    def process_pcm(self, data: bytes, gain: Number = 1) -> bytes:
+        """
+        Method to run signed 16-bit PCM frames through the chain
+        :param data: Interleaved signed 16-bit PCM frames
+        :param gain: Amplitude factor applied before the stages (e.g the volume)
+        :return: bytes
+        """
+        block = np.frombuffer(data, dtype=np.int16).reshape(-1, self._channels).astype(np.float32)
+        block *= gain / _INT16_SCALE
+        block = self.process(block)
+        block *= _INT16_SCALE
+        return np.clip(block, -_INT16_SCALE, _INT16_SCALE - 1).astype(np.int16).tobytes()
+
+    @property
+    def stages(self) -> Tuple[DSPStage, ...]:
+        return tuple(slot.stage for slot in self._slots if slot.target)
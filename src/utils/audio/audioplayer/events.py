@@ -0,0 +1,136 @@
+from typing import Callable, Optional
+from kivy.event import EventDispatcher
+from kivy.core.audio import Sound
+
+__all__ = (
+    "PlayerEventDispatcher",
+)
+
+
+class PlayerEventDispatcher(EventDispatcher):
+    """
+    Single event dispatcher of `AudioPlayer`, bound only to the active sound object.
+    It tells the player's own stops apart from natural track ends
+    and re-emits the sound object's events as typed player events:
+
+        on_track_started(dispatcher, queue_entry)
+        on_resumed(dispatcher, queue_entry)
+        on_track_ended(dispatcher, queue_entry)
+        on_paused(dispatcher, queue_entry)
+        on_seeked(dispatcher, queue_entry, position)
+        on_queue_changed(dispatcher)
+
+    `on_track_ended` of an audio file is always dispatched before `on_track_started` of the next one,
+    whether it reached its end or was switched away from by a gapless or crossfade transition
+    (it is then still fading out)
+    """
+    __events__ = (
+        "on_track_started",
+        "on_resumed",
+        "on_track_ended",
+        "on_paused",
+        "on_seeked",
+        "on_queue_changed",
+    )
+
+    def __init__(self,
+                 on_sound_play: Callable[[], None],
+                 on_sound_stop: Callable[[bool], None],
+                 **kwargs):
+        super(PlayerEventDispatcher, self).__init__(**kwargs)
+        self._on_sound_play_callback = on_sound_play
+        self._on_sound_stop_callback = on_sound_stop
+        self._active_entry = None
+        self._active_sound = None
+        self._started_entry = None
+        self._expected_stop = False
+
+    def attach(self, queue_entry) -> None:
+        """
+        Method to follow the sound object of the given queue entry, unbinding the previous one
+        :param queue_entry: The queue entry about to be played
+        :return: None
+        """
+        if queue_entry is self._active_entry and queue_entry.sound is self._active_sound:
+            return
+        self.detach()
+        self._active_entry = queue_entry
+        self._active_sound = queue_entry.sound
+        self._active_sound.fbind("on_play", self._on_sound_play)
+        self._active_sound.fbind("on_stop", self._on_sound_stop)
+
+    def detach(self, queue_entry=None) -> None:
+        """
+        Method to unbind the active sound object
+        :param queue_entry: Only detach if this queue entry is the active one
+        :return: None
+        """
+        if self._active_sound is None or queue_entry not in (None, self._active_entry):
+            return
+        self._active_sound.funbind("on_play", self._on_sound_play)
+        self._active_sound.funbind("on_stop", self._on_sound_stop)
+        self._active_entry = None
+        self._active_sound = None
+
+    def stop_active(self, pause: bool = True) -> None:
+        """
+        Method to stop the active sound object without it being taken as a natural track end
+        :param pause: Whether to dispatch `on_paused` (as opposed to a stop for skipping)
+        :return: None
+        """
+        if self._active_sound is None:
+            return
+        queue_entry = self._active_entry
+        self._expected_stop = True
+        try:
+            self._active_sound.stop()
+        finally:
+            self._expected_stop = False
+        if pause:
+            self.dispatch("on_paused", queue_entry)
+        else:
+            self._started_entry = None
+
+    def _on_sound_play(self, sound_obj: Sound) -> None:
+        queue_entry = self._active_entry
+        self._on_sound_play_callback()
+        if queue_entry is self._started_entry:
+            self.dispatch("on_resumed", queue_entry)
+        else:
+            self._started_entry = queue_entry
+            self.dispatch("on_track_started", queue_entry)
+
+    def _on_sound_stop(self, sound_obj: Sound) -> None:
+        if self._expected_stop:
+            self._on_sound_stop_callback(False)
+            return
+        queue_entry = self._active_entry
+        self._started_entry = None
+        self.dispatch("on_track_ended", queue_entry)
+        self._on_sound_stop_callback(True)
+
+    def on_track_started(self, queue_entry) -> None:
+        pass
+
+    def on_resumed(self, queue_entry) -> None:
+        pass
+
+    def on_track_ended(self, queue_entry) -> None:
+        pass
+
+    def on_paused(self, queue_entry) -> None:
+        pass
+
+    def on_seeked(self, queue_entry, position) -> None:
+        pass
+
+    def on_queue_changed(self) -> None:
+        pass
+
+    @property
+    def active_entry(self):
+        return self._active_entry
+
+    @property
+    def active_sound(self) -> Optional[Sound]:
+        return self._active_sound
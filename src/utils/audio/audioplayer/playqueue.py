@@ -0,0 +1,430 @@
+import random
+from collections import deque
+from pathlib import Path
+from typing import Iterable, Optional
+from kivy.core.audio import Sound
+
+__all__ = (
+    "QueueEntry",
+    "PlayQueue",
+)
+
+
+class QueueEntry:
+    """
+    Class representing an audio file in the queue of `AudioPlayer`.
+    Only the source is kept until the sound object is needed, the sound object is then
+    loaded lazily and unloaded again once the entry leaves the player's prefetch window.
+    `gain` is the entry's gain offset in dB (e.g ReplayGain), `None` until resolved by the player.
+    `trim` is the entry's (start, end) trim points in seconds, `()` without any, `None` until resolved by the player.
+    `load_failed` is set once loading the audio file failed, so it is not retried on every access
+    """
+    __slots__ = (
+        "_source",
+        "_owned",
+        "sound",
+        "loaded",
+        "future",
+        "gain",
+        "trim",
+        "load_failed",
+    )
+
+    def __init__(self, source: str, sound: Optional[Sound] = None, gain: Optional[float] = None):
+        self._source = source
+        self._owned = sound is None
+        self.sound = sound
+        self.loaded = sound is not None
+        self.future = None
+        self.gain = gain
+        self.trim = None
+        self.load_failed = False
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"source={self._source!r}, " \
+               f"loaded={self.loaded!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, QueueEntry):
+            return other is self
+        if isinstance(other, Sound):
+            return other is self.sound or other.source == self._source
+        if isinstance(other, (str, Path)):
+            return str(other) == self._source
+        return NotImplemented
+
+    __hash__ = object.__hash__
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def owned(self) -> bool:
+        # Whether the sound object was created by the player, rather than given by the user
+        return self._owned
+
+
+class PlayQueue:
+    """
+    Cursor based queue used by `AudioPlayer`.
+    The queue is split into the played history, the current item and the upcoming items,
+    so length, next, previous and enqueueing at both ends are all O(1) and never copy the queue.
+    With `max_history`, only the last played items are kept (e.g for endless radio queues).
+    When shuffled, the upcoming items are a lazily drawn permutation: items are only drawn
+    (swap & pop from a pool) when they are about to be played or peeked at, so next, previous,
+    enqueueing and re-shuffling stay O(1) amortized. The original order of the remaining items is
+    kept as sequence numbers, to be restored when un-shuffling
+    """
+    __slots__ = (
+        "_history",
+        "_current",
+        "_upcoming",
+        "_pool",
+        "_sequences",
+        "_first_sequence",
+        "_last_sequence",
+        "_random",
+    )
+
+    def __init__(self,
+                 items: Iterable = (),
+                 max_history: Optional[int] = None,
+                 random_generator: Optional[random.Random] = None):
+        self._history = deque(maxlen=max_history)
+        self._current = None
+        self._upcoming = deque(items)
+        self._pool = []
+        self._sequences = None
+        self._first_sequence = 0
+        self._last_sequence = -1
+        self._random = random.Random() if random_generator is None else random_generator
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"index={self.index!r}, " \
+               f"length={self.__len__()!r}, " \
+               f"shuffled={self.shuffled!r})"
+
+    def __len__(self) -> int:
+        return len(self._history) + (self._current is not None) + self.upcoming_length
+
+    def __iter__(self):
+        yield from self._history
+        if self._current is not None:
+            yield self._current
+        yield from self.iter_upcoming()
+
+    def __contains__(self, item) -> bool:
+        return (self._current is not None and item == self._current) or self.is_upcoming(item) \
+            or item in self._history
+
+    def _check_upcoming_index(self, index: int) -> int:
+        """
+        Private method to validate and normalize an index of the upcoming items,
+        drawing shuffled items up to it
+        :param index: Index of the upcoming items, negative indexes count from the end
+        :return: int
+        """
+        upcoming_length = self.upcoming_length
+        if not -upcoming_length <= index < upcoming_length:
+            raise IndexError("upcoming index out of range")
+        index = index + upcoming_length if index < 0 else index
+        self._draw(index + 1)
+        return index
+
+    def _draw(self, count: int) -> None:
+        """
+        Private method to draw random items from the shuffle pool until `count` upcoming items are drawn.
+        Each draw swaps a random item with the last one of the pool and pops it, in O(1)
+        :param count: Number of upcoming items needed
+        :return: None
+        """
+        pool = self._pool
+        while len(self._upcoming) < count and pool:
+            index = self._random.randrange(len(pool))
+            pool[index], pool[-1] = pool[-1], pool[index]
+            self._upcoming.append(pool.pop())
+
+    def _register(self, item, left: bool = False) -> None:
+        """
+        Private method to give a sequence number to an item becoming upcoming while shuffled
+        :param item: The upcoming item
+        :param left: Whether the item comes before the other upcoming items in the original order
+        :return: None
+        """
+        if self._sequences is None:
+            return
+        if left:
+            self._first_sequence -= 1
+            self._sequences[id(item)] = self._first_sequence
+        else:
+            self._last_sequence += 1
+            self._sequences[id(item)] = self._last_sequence
+
+    def _unregister(self, item) -> None:
+        """
+        Private method to forget the sequence number of an item which is no longer upcoming
+        :param item: The item which left the upcoming items
+        :return: None
+        """
+        if self._sequences is not None:
+            self._sequences.pop(id(item), None)
+
+    def iter_upcoming(self):
+        """
+        Method to yield the upcoming items, without copying them.
+        When shuffled, the items which are not drawn yet come last in no particular order
+        :return: Generator
+        """
+        yield from self._upcoming
+        yield from self._pool
+
+    def is_upcoming(self, item) -> bool:
+        """
+        Method to check whether the given item is waiting to be played
+        :param item: Item to be checked
+        :return: bool
+        """
+        return item in self._upcoming or item in self._pool
+
+    def peek(self, offset: int = 0):
+        """
+        Method to get an upcoming item without advancing the queue
+        :param offset: Index of the upcoming item, 0 being the next one
+        :return: Any
+        """
+        return self._upcoming[self._check_upcoming_index(offset)]
+
+    def append(self, item) -> None:
+        """
+        Method to add an item at the end of the queue (at a random upcoming position when shuffled)
+        :param item: Item to be enqueued
+        :return: None
+        """
+        if self._sequences is None:
+            self._upcoming.append(item)
+            return
+        self._pool.append(item)
+        self._register(item)
+
+    def appendleft(self, item) -> None:
+        """
+        Method to add an item to be played right after the current one
+        :param item: Item to be enqueued
+        :return: None
+        """
+        self._upcoming.appendleft(item)
+        self._register(item, left=True)
+
+    def extend(self, items: Iterable) -> None:
+        """
+        Method to add the given items at the end of the queue (at random upcoming positions when shuffled)
+        :param items: Iterable of items to be enqueued
+        :return: None
+        """
+        if self._sequences is None:
+            self._upcoming.extend(items)
+            return
+        for item in items:
+            self.append(item)
+
+    def extendleft(self, items: Iterable) -> None:
+        """
+        Method to add the given items right after the current one, keeping their order
+        :param items: Iterable of items to be enqueued
+        :return: None
+        """
+        for item in reversed(tuple(items)):
+            self.appendleft(item)
+
+    def move(self, index: int, target_index: int) -> None:
+        """
+        Method to move an upcoming item to another position among the upcoming items
+        :param index: Index of the upcoming item to be moved
+        :param target_index: Index of the upcoming items to move the item to
+        :return: None
+        """
+        index = self._check_upcoming_index(index)
+        target_index = self._check_upcoming_index(target_index)
+        item = self._upcoming[index]
+        del self._upcoming[index]
+        self._upcoming.insert(target_index, item)
+
+    def remove_upcoming(self, index: int = 0):
+        """
+        Method to remove an upcoming item from the queue
+        :param index: Index of the upcoming item to be removed
+        :return: Any
+        """
+        index = self._check_upcoming_index(index)
+        item = self._upcoming[index]
+        del self._upcoming[index]
+        self._unregister(item)
+        return item
+
+    def advance(self):
+        """
+        Method to move the cursor to the next item.
+        When there are no upcoming items, the queue is rewound and `None` is returned
+        :return: Any
+        """
+        self._draw(1)
+        if not self._upcoming:
+            self.rewind()
+            return None
+        if self._current is not None:
+            self._history.append(self._current)
+        self._current = self._upcoming.popleft()
+        self._unregister(self._current)
+        return self._current
+
+    def retreat(self):
+        """
+        Method to move the cursor to the previous item.
+        When there is no history, the cursor wraps around to the last item of the queue
+        :return: Any
+        """
+        if self._current is not None:
+            self.appendleft(self._current)
+            self._current = None
+        if self._history:
+            self._current = self._history.pop()
+        elif self._upcoming or self._pool:
+            self._draw(self.upcoming_length)
+            for item in self._upcoming:
+                self._unregister(item)
+            self._history.extend(self._upcoming)
+            self._upcoming.clear()
+            self._current = self._history.pop()
+        return self._current
+
+    def set_index(self, index: int) -> None:
+        """
+        Method to move the cursor straight to the given index of the queue (e.g when restoring a session)
+        :param index: Index of the queue to become the current item
+        :return: None
+        """
+        self.rewind()
+        if not 0 <= index < self.upcoming_length:
+            raise IndexError("queue index out of range")
+        self._draw(index + 1)
+        for _ in range(index):
+            self._history.append(self._upcoming.popleft())
+            self._unregister(self._history[-1])
+        self._current = self._upcoming.popleft()
+        self._unregister(self._current)
+
+    def rewind(self) -> None:
+        """
+        Method to move every played item back to the upcoming items,
+        leaving the queue with no current item. When shuffled, they are shuffled back in
+        :return: None
+        """
+        if self._sequences is not None:
+            self.extend(self._history)
+            if self._current is not None:
+                self.append(self._current)
+        else:
+            if self._current is not None:
+                self._upcoming.appendleft(self._current)
+            self._upcoming.extendleft(reversed(self._history))
+        self._current = None
+        self._history.clear()
+
+    def clear(self, keep_current: bool = False) -> None:
+        """
+        Method to remove every item from the queue
+        :param keep_current: Whether to keep the current item
+        :return: None
+        """
+        self._history.clear()
+        self._upcoming.clear()
+        self._pool.clear()
+        if self._sequences is not None:
+            self._sequences.clear()
+        if not keep_current:
+            self._current = None
+
+    def shuffle(self, keep_drawn: int = 0, sequences: Optional[Iterable[int]] = None) -> None:
+        """
+        Method to shuffle the upcoming items, or re-shuffle them if already shuffled.
+        Only the already drawn items are put back in the pool, so re-shuffling is O(1) amortized
+        :param keep_drawn: Number of next upcoming items to keep in place (e.g the pre-loaded ones)
+        :param sequences: Original order of the upcoming items (see `get_sequences`), when restoring
+        :return: None
+        """
+        if self._sequences is None:
+            self._sequences = {id(item): sequence for sequence, item in enumerate(self._upcoming)}
+            self._first_sequence = 0
+            self._last_sequence = len(self._upcoming) - 1
+        kept_items = [self._upcoming.popleft() for _ in range(min(keep_drawn, len(self._upcoming)))]
+        self._pool.extend(self._upcoming)
+        self._upcoming.clear()
+        self._upcoming.extend(kept_items)
+        if sequences is not None:
+            self._sequences = {id(item): sequence for item, sequence in zip(self.iter_upcoming(), sequences)}
+            self._first_sequence = min(self._sequences.values(), default=0)
+            self._last_sequence = max(self._sequences.values(), default=-1)
+
+    def unshuffle(self) -> None:
+        """
+        Method to put the upcoming items back in their original order
+        :return: None
+        """
+        if self._sequences is None:
+            return
+        sequences = self._sequences
+        upcoming_items = sorted(self.iter_upcoming(), key=lambda item: sequences.get(id(item), 0))
+        self._upcoming = deque(upcoming_items)
+        self._pool.clear()
+        self._sequences = None
+
+    def get_sequences(self) -> Optional[list]:
+        """
+        Method to get the original order of the upcoming items (in `iter_upcoming` order) when shuffled
+        :return: Optional[list]
+        """
+        if self._sequences is None:
+            return None
+        return [self._sequences.get(id(item), 0) for item in self.iter_upcoming()]
+
+    @property
+    def current(self):
+        return self._current
+
+    @property
+    def index(self) -> int:
+        return len(self._history) if self._current is not None else -1
+
+    @property
+    def shuffled(self) -> bool:
+        return self._sequences is not None
+
+    @property
+    def drawn_length(self) -> int:
+        # Number of upcoming items whose play order is already decided
+        return len(self._upcoming)
+
+    @property
+    def max_history(self) -> Optional[int]:
+        return self._history.maxlen
+
+    @max_history.setter
+    def max_history(self, new_max_history: Optional[int]) -> None:
+        if new_max_history is not None and new_max_history < 0:
+            raise ValueError("max_history cannot be negative")
+        self._history = deque(self._history, maxlen=new_max_history)
+
+    @property
+    def history_length(self) -> int:
+        return len(self._history)
+
+    @property
+    def upcoming_length(self) -> int:
+        return len(self._upcoming) + len(self._pool)
+
+    @property
+    def random_generator(self) -> random.Random:
+        return self._random
@@ -0,0 +1,562 @@
+"""
+Record-and-replay harness of `AudioPlayer` sessions.
+`SessionRecorder` appends every public call and every playback event of a player, with timestamps,
+to a JSON lines file. `SessionReplayer` drives the same calls against the virtual audio backend,
+advancing its clock instead of waiting, so hours of real use are reproduced (and profiled) in seconds:
+
+    recorder = SessionRecorder(player, "session.jsonl")
+    player = recorder.player
+    ...
+    recorder.close()
+
+    SessionReplayer("session.jsonl").replay()
+"""
+
+import json
+import time
+import random
+import weakref
+from pathlib import Path
+from typing import Callable, Optional, Union, Final, Dict, Any
+from kivy.clock import Clock
+from kivy.config import Config
+from kivy.core.audio import Sound
+from src.type_aliases import FilePath
+from src.utils import convert_file_path_to_string
+from src.utils.audio.audioplayer.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.playqueue import QueueEntry
+from src.utils.audio.audioplayer.events import PlayerEventDispatcher
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound, virtual_source
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend
+
+__all__ = (
+    "RECORDED_METHODS",
+    "RECORDED_PROPERTIES",
+    "RECORDED_SETTINGS",
+    "RecordedPlayer",
+    "SessionRecorder",
+    "SessionReplayer",
+)
+
+
+RECORDED_METHODS: Final = (
+    "load",
+    "insert_next",
+    "move",
+    "remove_upcoming",
+    "clear_queue",
+    "unload",
+    "play",
+    "stop",
+    "seek",
+    "fast_forward",
+    "rewind",
+    "skip_to_next",
+    "skip_to_previous",
+    "reshuffle",
+    "set_gain",
+)
+"""
+Public methods of `AudioPlayer` recorded when called through a `RecordedPlayer`
+"""
+RECORDED_PROPERTIES: Final = (
+    "volume",
+    "prefetch",
+    "gapless",
+    "preroll",
+    "crossfade",
+    "max_sounds",
+    "max_memory",
+    "shuffle",
+)
+"""
+Public properties of `AudioPlayer` recorded when set through a `RecordedPlayer`
+"""
+RECORDED_SETTINGS: Final = RECORDED_PROPERTIES + (
+    "loop",
+    "estimate_position",
+    "interval",
+)
+_RECORDED_SETTINGS_PROPERTIES: Final = ("max_sounds", "max_memory", "shuffle")
+"""
+Constructor arguments of `AudioPlayer` recorded at the start of a session
+"""
+_RECORDED_EVENTS: Final = PlayerEventDispatcher.__events__
+_SOURCE_METHODS: Final = ("load", "insert_next")
+_JSON_SEPARATORS: Final = (",", ":")
+_DEFAULT_REPLAY_FPS: Final = 60
+"""
+Ticks of the Kivy clock per virtual second while replaying, if its frame rate is not capped
+(a capped Kivy clock waits for a whole frame of its time source at every tick, the replay follows the cap)
+"""
+_recorders = weakref.WeakKeyDictionary()
+"""
+Private dictionary mapping the recorded players to their recorders
+"""
+
+
+def _serialize(value):
+    """
+    Private function to convert call arguments and event arguments to JSON values
+    :param value: Value to be converted
+    :return: Any
+    """
+    if isinstance(value, (QueueEntry, Sound)):
+        return value.source
+    if isinstance(value, Path):
+        return convert_file_path_to_string(value)
+    if isinstance(value, (tuple, list)):
+        return [_serialize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _serialize(item) for key, item in value.items()}
+    return value
+
+
+def _record(player: AudioPlayer, kind: str, *values) -> None:
+    """
+    Private function to append a record to every recorder of a player
+    :param player: Recorded player
+    :param kind: Kind of the record, see `SessionRecorder.record`
+    :param values: JSON serializable values of the record
+    :return: None
+    """
+    for recorder in _recorders.get(player, ()):
+        recorder.record(kind, *values)
+
+
+def _get_random_state(random_generator: random.Random) -> list:
+    """
+    Private function to get the state of a random generator as JSON values, without changing it
+    :param random_generator: Random generator (e.g of a player's shuffle)
+    :return: list
+    """
+    version, internal_state, gauss_next = random_generator.getstate()
+    return [version, list(internal_state), gauss_next]
+
+
+def _set_random_state(random_generator: random.Random, state: list) -> None:
+    """
+    Private function to restore the state of a random generator from JSON values (see `_get_random_state`)
+    :param random_generator: Random generator (e.g of a player's shuffle)
+    :param state: Recorded state of a random generator
+    :return: None
+    """
+    version, internal_state, gauss_next = state
+    random_generator.setstate((version, tuple(internal_state), gauss_next))
+
+
+class RecordedPlayer:
+    """
+    Explicit wrapper of a recorded player, used in its place while recording (see `SessionRecorder.player`).
+    Everything is forwarded to the player, the calls of `RECORDED_METHODS` and the assignments of `RECORDED_PROPERTIES`
+    made through the wrapper are recorded by every recorder of the player.
+    The player itself is left untouched: the calls it makes on its own (e.g skipping on natural track ends,
+    or `fast_forward` seeking) never go through the wrapper and are not recorded
+    """
+    __slots__ = (
+        "_player",
+    )
+
+    def __init__(self, player: AudioPlayer):
+        object.__setattr__(self, "_player", player)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"player={self._player!r})"
+
+    def __iter__(self):
+        return iter(self._player)
+
+    def __len__(self) -> int:
+        return len(self._player)
+
+    def __contains__(self, item) -> bool:
+        return item in self._player
+
+    def __getattr__(self, name: str):
+        value = getattr(self._player, name)
+        if name in RECORDED_METHODS:
+            return self._get_method_wrapper(name, value)
+        return value
+
+    def __setattr__(self, name: str, value) -> None:
+        setattr(self._player, name, value)
+        if name in RECORDED_PROPERTIES:
+            _record(self._player, "set", name, value)
+
+    def _get_method_wrapper(self, method_name: str, method: Callable) -> Callable:
+        """
+        Private method to wrap a public method of the player, recording its calls before running them
+        :param method_name: Name of the method to be wrapped
+        :param method: Bound method of the player
+        :return: Callable
+        """
+        player = self._player
+
+        def method_wrapper(*args, **kwargs):
+            if method_name == "reshuffle":
+                # The order drawn from then on is drawn again when replaying
+                _record(player, "random_state", _get_random_state(player.random_generator))
+            _record(player, "call", method_name, _serialize(args), _serialize(kwargs))
+            return method(*args, **kwargs)
+
+        return method_wrapper
+
+    @property
+    def wrapped_player(self) -> AudioPlayer:
+        return self._player
+
+
+class SessionRecorder:
+    """
+    Optional recorder appending every public call and playback event of a player to a file.
+    Each line is a compact JSON array starting with the seconds elapsed since the recording started:
+
+        [t, "start", {settings...}]
+        [t, "call", name, [args...], {kwargs...}]
+        [t, "set", name, value]
+        [t, "random_state", state]
+        [t, "event", name, [args...]]
+
+    Events are recorded from the player, calls and property assignments only when made through `player`,
+    a `RecordedPlayer` to be used in place of the recorded player while recording:
+
+        recorder = SessionRecorder(player, "session.jsonl")
+        player = recorder.player
+
+    so calls made by the player itself (e.g skipping on natural track ends) are not replayed twice.
+    The state of the random generator of the player's shuffle is recorded at the start and before every `reshuffle`
+    (it is never reseeded, a seed given by the user is kept), so shuffled sessions are replayed in the same order.
+    A player can be recorded by several recorders at once, each of them records the calls made through any wrapper
+    """
+
+    def __init__(self, player: Union[AudioPlayer, RecordedPlayer], file_path: FilePath):
+        if isinstance(player, RecordedPlayer):
+            player = player.wrapped_player
+        self._player = player
+        self._recorded_player = RecordedPlayer(player)
+        self._file = open(file_path, "a", encoding="utf-8", buffering=1)
+        self._start_time = time.monotonic()
+        self._event_callbacks = {
+            event_name: self._get_event_callback(event_name) for event_name in _RECORDED_EVENTS
+        }
+        self._write_start()
+        player.bind(**self._event_callbacks)
+        _recorders[player] = _recorders.get(player, ()) + (self,)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"player={self._player!r}, " \
+               f"file={self._file.name!r}, " \
+               f"closed={self.closed!r})"
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def record(self, kind: str, *values) -> None:
+        """
+        Method to append a record to the file, timestamped with the seconds since the recording started
+        :param kind: Kind of the record, one of "start", "call", "set", "random_state" or "event"
+        :param values: JSON serializable values of the record
+        :return: None
+        """
+        if self.closed:
+            return
+        elapsed = round(time.monotonic() - self._start_time, 3)
+        self._file.write(json.dumps([elapsed, kind, *values], separators=_JSON_SEPARATORS) + "\n")
+
+    def _write_start(self) -> None:
+        """
+        Private method to record the player's settings, queue, cursor and shuffle state at the start of the recording
+        :return: None
+        """
+        player = self._player
+        settings = {
+            setting: getattr(player, setting if setting in _RECORDED_SETTINGS_PROPERTIES else f"_{setting}")
+            for setting in RECORDED_SETTINGS
+        }
+        snapshot = player.snapshot()
+        current_entry = player.current_entry
+        self.record("start", {
+            "settings": settings,
+            "queue": snapshot["queue"],
+            "index": snapshot["index"],
+            "shuffle": snapshot["shuffle"],
+            "random_state": _get_random_state(player.random_generator),
+            "state": player.state,
+            "length": current_entry.sound.length if current_entry is not None and current_entry.loaded else None,
+        })
+
+    def _get_event_callback(self, event_name: str):
+        """
+        Private method to get the callback recording the given player event
+        :param event_name: Name of the event to be recorded
+        :return: Callable
+        """
+        def event_callback(dispatcher, *args):
+            values = [_serialize(arg) for arg in args]
+            if event_name == "on_track_started" and args and args[0].sound is not None:
+                values.append(args[0].sound.length)
+            self.record("event", event_name, values)
+
+        return event_callback
+
+    def close(self) -> None:
+        """
+        Method to stop recording and close the file
+        :return: None
+        """
+        if self.closed:
+            return
+        self._player.unbind(**self._event_callbacks)
+        recorders = tuple(recorder for recorder in _recorders.get(self._player, ()) if recorder is not self)
+        if recorders:
+            _recorders[self._player] = recorders
+        else:
+            _recorders.pop(self._player, None)
+        self._file.close()
+
+    @property
+    def player(self) -> RecordedPlayer:
+        return self._recorded_player
+
+    @property
+    def closed(self) -> bool:
+        return self._file.closed
+
+
+class SessionReplayer:
+    """
+    Replayer driving a recorded session against the virtual audio backend at full speed.
+    Every recorded source is replaced by a virtual audio file of the recorded length
+    and the virtual clock is advanced by the recorded time between records,
+    so natural track ends happen at the same points of the session.
+    The Kivy clock follows the virtual time while replaying and is ticked every virtual frame,
+    so the player's scheduled callbacks (gapless & crossfade transitions, prefetches...) fire on time as well.
+    The Kivy clock gets its own time source back once replayed
+    """
+
+    def __init__(self, file_path: FilePath):
+        self._file_path = file_path
+        self._records = []
+        self._lengths = {}
+        self._virtual_sources = {}
+        self._original_sources = {}
+        self._player = None
+        self._replayed_events = []
+        self._last_tick_time = 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"file_path={self._file_path!r}, " \
+               f"records={len(self._records)!r})"
+
+    def _read_records(self) -> None:
+        """
+        Private method to read the recorded session and the recorded length of each source
+        :return: None
+        """
+        self._records.clear()
+        with open(self._file_path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    self._records.append(json.loads(line))
+        for record in self._records:
+            if record[1] == "start" and record[2]["length"] is not None and record[2]["index"] >= 0:
+                self._lengths[record[2]["queue"][record[2]["index"]]] = record[2]["length"]
+            elif record[1] == "event" and record[2] == "on_track_started" and len(record[3]) > 1:
+                self._lengths[record[3][0]] = record[3][1]
+
+    def _to_virtual_source(self, source) -> str:
+        """
+        Private method to map a recorded source to a virtual audio file of the recorded length
+        :param source: Recorded source (path or alias)
+        :return: str
+        """
+        if source not in self._virtual_sources:
+            virtual_name = f"track-{len(self._virtual_sources)}"
+            if source in self._lengths:
+                virtual_name = virtual_source(virtual_name, self._lengths[source])
+            else:
+                virtual_name = virtual_source(virtual_name)
+            self._virtual_sources[source] = virtual_name
+            self._original_sources[virtual_name] = source
+        return self._virtual_sources[source]
+
+    def _start(self, start: Dict[str, Any]) -> None:
+        """
+        Private method to create the replayed player in the recorded starting state
+        :param start: Recorded start of the session
+        :return: None
+        """
+        settings = start["settings"]
+        snapshot = {
+            "queue": [self._to_virtual_source(source) for source in start["queue"]],
+            "index": start["index"],
+            "position": 0,
+            "volume": settings["volume"],
+            "loop": settings["loop"],
+            "shuffle": start.get("shuffle"),
+        }
+        # Drawing the same shuffled order as the recorded player, from the same state
+        random_generator = random.Random()
+        _set_random_state(random_generator, start["random_state"])
+        self._player = AudioPlayer.from_snapshot(
+            snapshot,
+            random_generator=random_generator,
+            **{setting: value for setting, value in settings.items() if setting not in snapshot}
+        )
+        self._player.bind(**{
+            event_name: self._get_event_callback(event_name) for event_name in _RECORDED_EVENTS
+        })
+        if start["state"] == "play":
+            self._player.play()
+        self._wait_prefetches()
+        # Events of rebuilding the starting state (including the deferred start of playback) were not recorded
+        self._replayed_events.clear()
+
+    def _get_event_callback(self, event_name: str):
+        """
+        Private method to get the callback collecting a replayed player event, with its original sources
+        :param event_name: Name of the replayed event
+        :return: Callable
+        """
+        def event_callback(dispatcher, *args):
+            values = [self._original_sources.get(value, value) for value in map(_serialize, args)]
+            self._replayed_events.append([event_name, values])
+
+        return event_callback
+
+    def _replay_record(self, record: list) -> None:
+        """
+        Private method to apply a single recorded call or property assignment to the replayed player
+        :param record: Recorded line
+        :return: None
+        """
+        kind = record[1]
+        if kind == "start":
+            self._start(record[2])
+        elif kind == "call":
+            method_name, args, kwargs = record[2:]
+            if method_name in _SOURCE_METHODS:
+                args = map(self._to_virtual_source, args)
+                kwargs["ignore_aliases"] = True
+            elif method_name == "set_gain":
+                # Matched against the replayed queue, made of virtual sources
+                if args:
+                    args = [self._to_virtual_source(args[0]), *args[1:]]
+                if "item" in kwargs:
+                    kwargs["item"] = self._to_virtual_source(kwargs["item"])
+            getattr(self._player, method_name)(*args, **kwargs)
+        elif kind == "set":
+            setattr(self._player, record[2], record[3])
+        elif kind == "random_state":
+            _set_random_state(self._player.random_generator, record[2])
+
+    def _wait_prefetches(self) -> None:
+        """
+        Private method to let the prefetch worker of the replayed player catch up,
+        virtual audio files load instantly so only the worker thread could lag behind the virtual time
+        :return: None
+        """
+        if self._player is not None:
+            self._player.wait_prefetches()
+
+    def _advance(self, seconds: float) -> None:
+        """
+        Private method to move the virtual time forward, ticking the Kivy clock at every virtual frame on the way
+        :param seconds: Seconds to move forward
+        :return: None
+        """
+        clock = VirtualSound.clock
+        target_time = clock.time() + seconds
+        frame_duration = 1 / (Config.getint("graphics", "maxfps") or _DEFAULT_REPLAY_FPS)
+        next_tick_time = self._last_tick_time + frame_duration
+        while next_tick_time <= target_time:
+            clock.advance(max(next_tick_time - clock.time(), 0))
+            self._wait_prefetches()
+            Clock.tick()
+            self._last_tick_time = next_tick_time
+            next_tick_time += frame_duration
+        clock.advance(max(target_time - clock.time(), 0))
+
+    @staticmethod
+    def _restore_kivy_time(own_kivy_time: Optional[Callable[[], float]]) -> None:
+        """
+        Static-method to give the Kivy clock its original time source back after replaying.
+        The virtual time usually got ahead of it: the last tick and the scheduled events are moved back
+        by the same amount, so the Kivy clock neither waits for its time source to catch up nor runs its events early
+        :param own_kivy_time: Time source set on the Kivy clock itself before replaying, `None` if it used its class' one
+        :return: None
+        """
+        virtual_time = Clock.time()
+        if own_kivy_time is None:
+            del Clock.time
+        else:
+            Clock.time = own_kivy_time
+        shift = virtual_time - Clock.time()
+        if shift <= 0:
+            return
+        Clock._last_tick -= shift
+        event = Clock._root_event
+        while event is not None:
+            event._last_dt -= shift
+            event = event.next
+
+    def replay(self) -> Dict[str, Any]:
+        """
+        Method to replay the recorded session, returning how it went
+        (including whether the replayed events matched the recorded ones)
+        :return: Dict[str, Any]
+        """
+        register_virtual_backend()
+        self._read_records()
+        self._replayed_events.clear()
+        clock = VirtualSound.clock
+        self._last_tick_time = clock.time()
+        kivy_time = Clock.time
+        own_kivy_time = Clock.__dict__.get("time")
+        # From the last tick of the Kivy clock if its time source is behind (e.g after a previous replay)
+        kivy_time_offset = max(kivy_time(), Clock.get_time()) - clock.time()
+        # Shadowing the Kivy clock's time source, its scheduled events are due in virtual time
+        Clock.time = lambda: kivy_time_offset + clock.time()
+        last_time = 0
+        start_time = time.perf_counter()
+        try:
+            for record in self._records:
+                if record[0] > last_time:
+                    self._advance(record[0] - last_time)
+                    last_time = record[0]
+                self._wait_prefetches()
+                self._replay_record(record)
+        finally:
+            self._restore_kivy_time(own_kivy_time)
+        duration = time.perf_counter() - start_time
+        recorded_events = [record[2:4] for record in self._records if record[1] == "event"]
+        replayed_events = [
+            [event_name, values[:1] if event_name == "on_track_started" else values]
+            for event_name, values in self._replayed_events
+        ]
+        recorded_events = [
+            [event_name, values[:1] if event_name == "on_track_started" else values]
+            for event_name, values in recorded_events
+        ]
+        return {
+            "records": len(self._records),
+            "session_duration": last_time,
+            "replay_duration": duration,
+            "recorded_events": len(recorded_events),
+            "replayed_events": len(replayed_events),
+            "events_match": recorded_events == replayed_events,
+        }
+
+    @property
+    def player(self) -> Optional[AudioPlayer]:
+        return self._player
+
+    @property
+    def replayed_events(self) -> list:
+        return list(self._replayed_events)
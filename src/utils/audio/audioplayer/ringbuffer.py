@@ -0,0 +1,101 @@
+from typing import Union
+
+__all__ = (
+    "RingBuffer",
+)
+
+
+class RingBuffer:
+    """
+    Single-producer/single-consumer ring buffer of PCM bytes.
+    It is lock-free: the write counter is only advanced by the producer thread and the read counter
+    only by the consumer thread, each after its copy is done, so neither side ever waits on the other.
+    Reads are rounded down to whole frames of `alignment` bytes
+    """
+    __slots__ = (
+        "_buffer",
+        "_capacity",
+        "_alignment",
+        "_read_count",
+        "_write_count",
+    )
+
+    def __init__(self, capacity: int, alignment: int = 1):
+        if capacity < alignment or capacity % alignment:
+            raise ValueError("capacity must be a positive multiple of alignment")
+        self._buffer = bytearray(capacity)
+        self._capacity = capacity
+        self._alignment = alignment
+        # Total bytes ever read & written, the positions in the buffer are taken modulo the capacity
+        self._read_count = 0
+        self._write_count = 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"capacity={self._capacity!r}, " \
+               f"available={self.available!r})"
+
+    def __len__(self) -> int:
+        return self.available
+
+    def write(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """
+        Method to copy as much of the given data as fits, producer side only
+        :param data: PCM bytes to be written
+        :return: int, number of bytes written
+        """
+        write_count = self._write_count
+        size = min(len(data), self._capacity - (write_count - self._read_count))
+        if size <= 0:
+            return 0
+        start = write_count % self._capacity
+        first_size = min(size, self._capacity - start)
+        self._buffer[start:start + first_size] = data[:first_size]
+        if size > first_size:
+            self._buffer[:size - first_size] = data[first_size:size]
+        # Publishing the bytes only once they are in place
+        self._write_count = write_count + size
+        return size
+
+    def read(self, size: int) -> bytes:
+        """
+        Method to take up to the given number of bytes (whole frames only), consumer side only
+        :param size: Maximum number of bytes to be read
+        :return: bytes, empty if nothing is available
+        """
+        read_count = self._read_count
+        size = min(size, self._write_count - read_count)
+        size -= size % self._alignment
+        if size <= 0:
+            return b""
+        start = read_count % self._capacity
+        first_size = min(size, self._capacity - start)
+        data = bytes(self._buffer[start:start + first_size])
+        if size > first_size:
+            data += self._buffer[:size - first_size]
+        # Releasing the space only once the bytes are copied out
+        self._read_count = read_count + size
+        return data
+
+    def clear(self) -> None:
+        """
+        Method to drop every buffered byte, only while neither side is running
+        :return: None
+        """
+        self._read_count = self._write_count = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def alignment(self) -> int:
+        return self._alignment
+
+    @property
+    def available(self) -> int:
+        return self._write_count - self._read_count
+
+    @property
+    def free(self) -> int:
+        return self._capacity - self.available
@@ -0,0 +1,128 @@
+"""
+Persistence of `AudioPlayer` sessions, so a restart resumes playing right where it stopped:
+
+    player = restore_session("session.json", prefetch=2) or AudioPlayer()
+    autosaver = SessionAutosaver(player, "session.json")
+"""
+
+import os
+import json
+from typing import Optional, Final
+from kivy.clock import Clock
+from kivy.logger import Logger
+from src.type_aliases import Number, FilePath
+from src.utils import convert_file_path_to_string
+from src.utils.audio.audioplayer.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.events import PlayerEventDispatcher
+
+__all__ = (
+    "write_snapshot",
+    "read_snapshot",
+    "restore_session",
+    "SessionAutosaver",
+)
+
+
+_JSON_SEPARATORS: Final = (",", ":")
+
+
+def write_snapshot(snapshot: dict, file_path: FilePath) -> None:
+    """
+    Function to write a player snapshot to a compact JSON file atomically:
+    the snapshot is written next to the file first, then moved over it,
+    so an interrupted write never leaves a corrupted session behind
+    :param snapshot: Dictionary returned by `AudioPlayer.snapshot`
+    :param file_path: Path of the session file
+    :return: None
+    """
+    file_path = convert_file_path_to_string(file_path)
+    temporary_file_path = f"{file_path}.tmp"
+    with open(temporary_file_path, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, separators=_JSON_SEPARATORS)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_file_path, file_path)
+
+
+def read_snapshot(file_path: FilePath) -> Optional[dict]:
+    """
+    Function to read a player snapshot, `None` if the session file is missing or unreadable
+    :param file_path: Path of the session file
+    :return: Optional[dict]
+    """
+    try:
+        with open(file_path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exception:
+        Logger.warning(f"AudioPlayer: Unable to read session {str(file_path)!r}: {exception}")
+        return None
+
+
+def restore_session(file_path: FilePath, **kwargs) -> Optional[AudioPlayer]:
+    """
+    Function to restore a player from a session file, see `AudioPlayer.from_snapshot`
+    :param file_path: Path of the session file
+    :param kwargs: Keyword arguments of the player, other than the saved ones
+    :return: Optional[AudioPlayer], `None` if there is no session to restore
+    """
+    snapshot = read_snapshot(file_path)
+    return None if snapshot is None else AudioPlayer.from_snapshot(snapshot, **kwargs)
+
+
+class SessionAutosaver:
+    """
+    Utility class saving the session of a player whenever it changes (queue edits, track changes,
+    pauses, seeks...), debounced to one write per `delay` seconds.
+    With `interval`, the session is also saved periodically (e.g to keep the position up to date)
+    """
+
+    def __init__(self, player: AudioPlayer, file_path: FilePath, delay: Number = 2, interval: Optional[Number] = 30):
+        self._player = player
+        self._file_path = file_path
+        self._save_trigger = Clock.create_trigger(lambda dt: self.save(), delay)
+        self._interval_event = None
+        if interval:
+            self._interval_event = Clock.schedule_interval(lambda dt: self.save(), interval)
+        self._event_callbacks = {
+            event_name: self._on_player_event for event_name in PlayerEventDispatcher.__events__
+        }
+        player.bind(**self._event_callbacks)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"player={self._player!r}, " \
+               f"file_path={self._file_path!r})"
+
+    def _on_player_event(self, *args) -> None:
+        """
+        Private method bound to every player event to schedule a (debounced) save
+        :return: None
+        """
+        self._save_trigger()
+
+    def save(self) -> None:
+        """
+        Method to save the session right away
+        :return: None
+        """
+        self._save_trigger.cancel()
+        try:
+            write_snapshot(self._player.snapshot(), self._file_path)
+        except OSError as exception:
+            Logger.warning(f"AudioPlayer: Unable to save session {str(self._file_path)!r}: {exception}")
+
+    def close(self, save: bool = True) -> None:
+        """
+        Method to stop saving the session of the player
+        :param save: Whether to save the session one last time
+        :return: None
+        """
+        self._player.unbind(**self._event_callbacks)
+        self._save_trigger.cancel()
+        if self._interval_event is not None:
+            self._interval_event.cancel()
+            self._interval_event = None
+        if save:
+            self.save()
@@ -0,0 +1,292 @@
+"""
+Outputs of the PCM frames decoded by `LinuxSoundPlayer`.
+A sink is opened for the decoded format, then written whole blocks of frames by the output thread.
+`write` paces the output thread: it blocks until the device (or the wall clock) has room for the block.
+Frames written are only audible `latency` seconds later: at the end of an audio file the sink is `finish`ed
+and plays out what it buffered (see `drained`), while `close` drops it right away (e.g stopping or seeking)
+"""
+
+import time
+import wave
+import shutil
+import subprocess
+from typing import Optional, Final, Tuple
+from src.type_aliases import FilePath
+from src.utils import convert_file_path_to_string
+from src.utils.audio.decoding import PCM_SAMPLE_WIDTH
+
+__all__ = (
+    "DEVICE_SINK_COMMANDS",
+    "AudioSink",
+    "DeviceSink",
+    "NullSink",
+    "FileSink",
+)
+
+
+DEVICE_SINK_COMMANDS: Final = (
+    (
+        "pacat",
+        "--playback",
+        "--raw",
+        "--format=s16le",
+        "--rate={sample_rate}",
+        "--channels={channels}",
+        "--latency-msec=50",
+    ),
+    (
+        "aplay",
+        "-q",
+        "-t", "raw",
+        "-f", "S16_LE",
+        "-r", "{sample_rate}",
+        "-c", "{channels}",
+    ),
+)
+"""
+Commands of the playback tools tried by `DeviceSink`, PulseAudio (or PipeWire) first then ALSA
+"""
+
+
+class AudioSink:
+    """
+    Base class of the sinks, discarding everything written to it
+    """
+    __slots__ = (
+        "_sample_rate",
+        "_channels",
+    )
+
+    def __init__(self):
+        self._sample_rate = None
+        self._channels = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"sample_rate={self._sample_rate!r}, " \
+               f"channels={self._channels!r})"
+
+    def open(self, sample_rate: int, channels: int) -> None:
+        """
+        Method to prepare the sink for frames of the given format
+        :param sample_rate: Frames per second
+        :param channels: Samples per frame
+        :return: None
+        """
+        self._sample_rate = sample_rate
+        self._channels = channels
+
+    def write(self, data: bytes) -> None:
+        """
+        Method to output a block of frames, blocking until the sink accepted it
+        :param data: Interleaved signed 16-bit PCM frames
+        :return: None
+        """
+
+    def finish(self) -> None:
+        """
+        Method to tell the sink no more frames will be written, it keeps playing the buffered ones (see `drained`)
+        :return: None
+        """
+
+    def close(self) -> None:
+        """
+        Method to release the sink, frames still buffered by it may be dropped
+        :return: None
+        """
+
+    @property
+    def latency(self) -> float:
+        # Seconds until the last frame written is played, frames are played as soon as they are written by default
+        return 0.0
+
+    @property
+    def drained(self) -> bool:
+        # Whether every frame written was played
+        return self.latency <= 0
+
+    @property
+    def sample_rate(self) -> Optional[int]:
+        return self._sample_rate
+
+    @property
+    def channels(self) -> Optional[int]:
+        return self._channels
+
+
+class DeviceSink(AudioSink):
+    """
+    Sink playing the frames on the default sound device by piping them to `pacat` or `aplay`.
+    The playback tool cannot be asked what it played, the latency is estimated from the wall clock:
+    frames are played at the sample rate, the first ones `device_latency` seconds after being written
+    """
+    __slots__ = (
+        "_commands",
+        "_device_latency",
+        "_process",
+        "_deadline",
+    )
+
+    def __init__(self, commands: Tuple[Tuple[str, ...], ...] = DEVICE_SINK_COMMANDS, device_latency: float = 0.05):
+        super().__init__()
+        self._commands = commands
+        self._device_latency = device_latency
+        self._process = None
+        self._deadline = None
+
+    def open(self, sample_rate: int, channels: int) -> None:
+        super().open(sample_rate, channels)
+        self._deadline = None
+        for command in self._commands:
+            executable_path = shutil.which(command[0])
+            if executable_path is None:
+                continue
+            self._process = subprocess.Popen(
+                (
+                    executable_path,
+                    *(argument.format(sample_rate=sample_rate, channels=channels) for argument in command[1:]),
+                ),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            return
+        raise FileNotFoundError(f"none of {[command[0] for command in self._commands]!r} was found")
+
+    def write(self, data: bytes) -> None:
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.write(data)
+        except (BrokenPipeError, ValueError):
+            # The playback tool exited (e.g the sound server went away), the frames are dropped
+            self._process = None
+            return
+        now = time.monotonic()
+        if self._deadline is None or self._deadline < now:
+            # Starting (or starting over after running dry), the device buffers before playing
+            self._deadline = now + self._device_latency
+        self._deadline += len(data) // (self._channels * PCM_SAMPLE_WIDTH) / self._sample_rate
+
+    def finish(self) -> None:
+        if self._process is None:
+            return
+        # The playback tool exits once it played every frame before the end of its input
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    def close(self) -> None:
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        process.kill()
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        process.wait()
+
+    @property
+    def latency(self) -> float:
+        if self._deadline is None or self.drained:
+            return 0.0
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    @property
+    def drained(self) -> bool:
+        return self._process is None or self._process.poll() is not None
+
+    @property
+    def device_latency(self) -> float:
+        return self._device_latency
+
+
+class NullSink(AudioSink):
+    """
+    Sink discarding the frames, for testing and benchmarking.
+    With `realtime`, writes are paced by the wall clock like a sound device would,
+    otherwise frames are consumed as fast as they are decoded
+    """
+    __slots__ = (
+        "_realtime",
+        "_deadline",
+        "_frames_written",
+    )
+
+    def __init__(self, realtime: bool = True):
+        super().__init__()
+        self._realtime = realtime
+        self._deadline = None
+        self._frames_written = 0
+
+    def open(self, sample_rate: int, channels: int) -> None:
+        super().open(sample_rate, channels)
+        self._deadline = None
+
+    def write(self, data: bytes) -> None:
+        frames = len(data) // (self._channels * PCM_SAMPLE_WIDTH)
+        self._frames_written += frames
+        if not self._realtime:
+            return
+        now = time.monotonic()
+        if self._deadline is None or self._deadline < now:
+            self._deadline = now
+        # Sleeping until the previous block would have been played, so one block stays queued
+        if self._deadline > now:
+            time.sleep(self._deadline - now)
+        self._deadline += frames / self._sample_rate
+
+    @property
+    def latency(self) -> float:
+        if self._deadline is None:
+            return 0.0
+        return max(self._deadline - time.monotonic(), 0.0)
+
+    @property
+    def realtime(self) -> bool:
+        return self._realtime
+
+    @property
+    def frames_written(self) -> int:
+        return self._frames_written
+
+
+class FileSink(AudioSink):
+    """
+    Sink writing the frames to a WAV file as fast as they are decoded, for testing and benchmarking
+    """
+    __slots__ = (
+        "_file_path",
+        "_wave_file",
+    )
+
+    def __init__(self, file_path: FilePath):
+        super().__init__()
+        self._file_path = convert_file_path_to_string(file_path)
+        self._wave_file = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"file_path={self._file_path!r})"
+
+    def open(self, sample_rate: int, channels: int) -> None:
+        super().open(sample_rate, channels)
+        self._wave_file = wave.open(self._file_path, "wb")
+        self._wave_file.setnchannels(channels)
+        self._wave_file.setsampwidth(PCM_SAMPLE_WIDTH)
+        self._wave_file.setframerate(sample_rate)
+
+    def write(self, data: bytes) -> None:
+        if self._wave_file is not None:
+            self._wave_file.writeframesraw(data)
+
+    def close(self) -> None:
+        if self._wave_file is not None:
+            self._wave_file.close()
+            self._wave_file = None
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
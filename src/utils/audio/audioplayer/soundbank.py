@@ -0,0 +1,162 @@
+import time
+from pathlib import Path
+from collections import deque
+from typing import Union, Optional, Final
+from kivy.logger import Logger
+from kivy.core.audio import SoundLoader, Sound
+from src.type_aliases import Number, FilePath
+from src.utils import convert_file_path_to_string
+
+__all__ = (
+    "FRAME_DURATION",
+    "SoundBank",
+)
+
+
+FRAME_DURATION: Final = 1 / 60
+"""
+Duration of a single frame at 60 FPS, used as the trigger-to-play latency budget
+"""
+
+
+class _Voice:
+    """
+    Private class representing one pre-loaded sound object of a sound bank alias
+    """
+    __slots__ = (
+        "sound",
+        "started_at",
+    )
+
+    def __init__(self, sound: Sound):
+        self.sound = sound
+        self.started_at = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.sound.state == "play"
+
+
+class SoundBank:
+    """
+    Bank of short sounds (UI clicks, notifications...) decoded once at registration and kept warm.
+    Each alias owns a small pool of voices so it can be played polyphonically,
+    when every voice is busy the one that started first is stolen
+    """
+
+    def __init__(self, voices: int = 4):
+        self._default_voices = voices
+        self._voices = {}
+        self._latencies = deque(maxlen=100)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"aliases={tuple(self._voices)!r}, " \
+               f"voices={self._default_voices!r})"
+
+    def __contains__(self, item) -> bool:
+        return item in self._voices
+
+    @staticmethod
+    def _load_voice(source: str) -> Sound:
+        """
+        Private static-method to load a single voice, raising if the audio file cannot be loaded
+        :param source: Path to the audio file
+        :return: Sound
+        """
+        sound_obj = SoundLoader.load(source)
+        if sound_obj is None:
+            raise ValueError(f"unable to load {source!r}")
+        return sound_obj
+
+    def register(self, alias, value: Union[FilePath, Sound], voices: Optional[int] = None) -> None:
+        """
+        Method to decode the given audio file into a pool of voices for the given alias
+        :param alias: Alias to trigger the sound with
+        :param value: Path or sound object of the audio file
+        :param voices: Number of voices (simultaneous plays), defaults to the bank's default
+        :return: None
+        """
+        voices = self._default_voices if voices is None else voices
+        if voices < 1:
+            raise ValueError("voices must be at least 1")
+        if isinstance(value, Sound):
+            voice_sounds = [value]
+            source = value.source
+        elif isinstance(value, (str, Path)):
+            voice_sounds = []
+            source = convert_file_path_to_string(value)
+        else:
+            raise TypeError("can only accept types of str, Path and Sound")
+        while len(voice_sounds) < voices:
+            voice_sounds.append(self._load_voice(source))
+        self.unregister(alias)
+        self._voices[alias] = [_Voice(sound_obj) for sound_obj in voice_sounds]
+
+    def unregister(self, alias) -> None:
+        """
+        Method to unload the voices of the given alias, if registered
+        :param alias: Alias to be unregistered
+        :return: None
+        """
+        for voice in self._voices.pop(alias, ()):
+            voice.sound.unload()
+
+    def _pick_voice(self, alias) -> _Voice:
+        """
+        Private method to pick an idle voice of the given alias,
+        or steal the one which started first if every voice is busy
+        :param alias: Registered alias to pick a voice of
+        :return: _Voice
+        """
+        voices = self._voices[alias]
+        for voice in voices:
+            if not voice.busy:
+                return voice
+        stolen_voice = min(voices, key=lambda voice: voice.started_at)
+        stolen_voice.sound.stop()
+        return stolen_voice
+
+    def trigger(self, alias, volume: Number = 1) -> Sound:
+        """
+        Method to play the sound of the given alias on one of its voices.
+        The trigger-to-play latency is measured and logged when it exceeds a frame
+        :param alias: Registered alias to be played
+        :param volume: Volume to play the sound with, from 0-1
+        :return: Sound
+        """
+        trigger_time = time.perf_counter()
+        voice = self._pick_voice(alias)
+        voice.sound.volume = volume
+        voice.sound.play()
+        if voice.sound.get_pos():
+            # Stolen (or stopped) voices keep their position with some providers, which cannot seek before playing
+            voice.sound.seek(0)
+        voice.started_at = time.perf_counter()
+        latency = voice.started_at - trigger_time
+        self._latencies.append(latency)
+        if latency > FRAME_DURATION:
+            Logger.debug(f"SoundBank: Triggering {alias!r} took {latency * 1000:.2f}ms")
+        return voice.sound
+
+    def stop_all(self) -> None:
+        """
+        Method to stop every busy voice of every alias
+        :return: None
+        """
+        for voices in self._voices.values():
+            for voice in voices:
+                if voice.busy:
+                    voice.sound.stop()
+
+    @property
+    def aliases(self) -> tuple:
+        return tuple(self._voices)
+
+    @property
+    def latencies(self) -> tuple:
+        return tuple(self._latencies)
+
+    @property
+    def max_latency(self) -> Optional[float]:
+        return max(self._latencies) if self._latencies else None
@@ -0,0 +1,195 @@
+import os
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+__all__ = (
+    "estimate_file_size",
+    "SoundPool",
+)
+
+
+def estimate_file_size(source: str) -> int:
+    """
+    Function to estimate the memory used by a loaded audio file from its size on disk
+    :param source: Path to the audio file
+    :return: int
+    """
+    try:
+        return os.path.getsize(source)
+    except OSError:
+        return 0
+
+
+class SoundPool:
+    """
+    Least recently used pool of the loaded queue entries of `AudioPlayer`.
+    The pool only keeps the bookkeeping, the player unloads the entries it evicts
+    and loads them again transparently when they are accessed later on
+    """
+    __slots__ = (
+        "_max_sounds",
+        "_max_memory",
+        "_size_function",
+        "_entries",
+        "_memory",
+        "_hits",
+        "_misses",
+        "_evictions",
+    )
+
+    def __init__(self,
+                 max_sounds: int = 8,
+                 max_memory: Optional[int] = None,
+                 size_function: Callable[[str], int] = estimate_file_size):
+        self._max_sounds = max_sounds
+        self._max_memory = max_memory
+        self._size_function = size_function
+        self._entries = OrderedDict()
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"max_sounds={self._max_sounds!r}, " \
+               f"max_memory={self._max_memory!r}, " \
+               f"length={self.__len__()!r})"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self):
+        yield from self._entries
+
+    def __contains__(self, item) -> bool:
+        return item in self._entries
+
+    def access(self, queue_entry) -> bool:
+        """
+        Method to record an access to a queue entry, marking it as the most recently used.
+        Counted as a hit if the entry is loaded, as a miss otherwise
+        :param queue_entry: The queue entry being accessed
+        :return: bool
+        """
+        if queue_entry in self._entries:
+            self._entries.move_to_end(queue_entry)
+            self._hits += 1
+            return True
+        self._misses += 1
+        return False
+
+    def touch(self, queue_entry) -> None:
+        """
+        Method to mark a loaded queue entry as the most recently used, without counting an access
+        :param queue_entry: The queue entry to be marked
+        :return: None
+        """
+        if queue_entry in self._entries:
+            self._entries.move_to_end(queue_entry)
+
+    def add(self, queue_entry) -> None:
+        """
+        Method to add a freshly loaded queue entry to the pool
+        :param queue_entry: The loaded queue entry
+        :return: None
+        """
+        if queue_entry in self._entries:
+            self._entries.move_to_end(queue_entry)
+            return
+        size = self._entries[queue_entry] = self._size_function(queue_entry.source)
+        self._memory += size
+
+    def discard(self, queue_entry) -> None:
+        """
+        Method to remove a queue entry from the pool if present
+        :param queue_entry: The queue entry to be removed
+        :return: None
+        """
+        size = self._entries.pop(queue_entry, None)
+        if size is not None:
+            self._memory -= size
+
+    def _over_capacity(self) -> bool:
+        """
+        Private method to check whether the pool holds more entries or memory than allowed
+        :return: bool
+        """
+        if len(self._entries) > self._max_sounds:
+            return True
+        return self._max_memory is not None and self._memory > self._max_memory
+
+    def evict(self, protected: Iterable = ()) -> list:
+        """
+        Method to remove the least recently used entries until the pool is within its caps.
+        Protected entries (e.g the ones being played or prefetched) are never evicted
+        :param protected: Collection of queue entries which must be kept loaded
+        :return: list
+        """
+        evicted_entries = []
+        if not self._over_capacity():
+            return evicted_entries
+        protected = set(protected)
+        for queue_entry in tuple(self._entries):
+            if not self._over_capacity():
+                break
+            if queue_entry in protected:
+                continue
+            self.discard(queue_entry)
+            evicted_entries.append(queue_entry)
+        self._evictions += len(evicted_entries)
+        return evicted_entries
+
+    def reset_stats(self) -> None:
+        """
+        Method to reset the hit, miss and eviction counters
+        :return: None
+        """
+        self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> dict:
+        """
+        Method to get a snapshot of the pool's counters and usage
+        :return: dict
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "sounds": len(self._entries),
+            "memory": self._memory,
+        }
+
+    @property
+    def max_sounds(self) -> int:
+        return self._max_sounds
+
+    @max_sounds.setter
+    def max_sounds(self, new_max_sounds: int) -> None:
+        if new_max_sounds < 1:
+            raise ValueError("max_sounds must be at least 1")
+        self._max_sounds = new_max_sounds
+
+    @property
+    def max_memory(self) -> Optional[int]:
+        return self._max_memory
+
+    @max_memory.setter
+    def max_memory(self, new_max_memory: Optional[int]) -> None:
+        self._max_memory = new_max_memory
+
+    @property
+    def memory(self) -> int:
+        return self._memory
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
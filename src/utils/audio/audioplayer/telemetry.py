@@ -0,0 +1,249 @@
+import time
+import threading
+from bisect import bisect_left
+from typing import Optional, Final, Dict
+from kivy.clock import Clock
+from kivy.logger import Logger
+from src.type_aliases import Number
+
+__all__ = (
+    "HISTOGRAM_BOUNDS",
+    "TIMINGS",
+    "COUNTERS",
+    "Histogram",
+    "PlayerTelemetry",
+)
+
+
+HISTOGRAM_BOUNDS: Final = tuple(0.000125 * 2 ** exponent for exponent in range(18))
+"""
+Upper bounds in seconds of the histogram buckets, doubling from 0.125ms to ~16s
+"""
+TIMINGS: Final = (
+    "load",
+    "play_dispatch",
+    "skip",
+    "seek",
+    "gap",
+)
+"""
+Names of the timings recorded by `AudioPlayer`:
+    load: Duration of `SoundLoader.load` per audio file
+    play_dispatch: Time from `play` to the sound object dispatching `on_play`,
+        the output latency of the sound provider (until the first samples are audible) is not included
+    skip: Duration of `skip_to_next` & `skip_to_previous`
+    seek: Duration of `seek`
+    gap: Time between the end of an audio file and the start of the next one
+"""
+COUNTERS: Final = (
+    "underruns",
+    "errors",
+)
+"""
+Names of the counters of `AudioPlayer`:
+    underruns: Audio files which had not been prefetched in time, `play` waited for them or loaded them on the spot
+    errors: Audio files which could not be loaded
+"""
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram of durations in seconds, cheap enough to be recorded into on every call.
+    Percentiles are approximated by the upper bound of their bucket
+    """
+    __slots__ = (
+        "_buckets",
+        "_count",
+        "_total",
+        "_min",
+        "_max",
+        "_lock",
+    )
+
+    def __init__(self):
+        self._buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._min = None
+        self._max = None
+        # Loads are recorded from the prefetch worker as well
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"count={self._count!r}, " \
+               f"mean={self.mean!r})"
+
+    def __len__(self) -> int:
+        return self._count
+
+    def record(self, duration: Number) -> None:
+        """
+        Method to add a duration to the histogram
+        :param duration: Duration in seconds
+        :return: None
+        """
+        with self._lock:
+            self._buckets[bisect_left(HISTOGRAM_BOUNDS, duration)] += 1
+            self._count += 1
+            self._total += duration
+            if self._min is None or duration < self._min:
+                self._min = duration
+            if self._max is None or duration > self._max:
+                self._max = duration
+
+    def percentile(self, percent: Number) -> Optional[float]:
+        """
+        Method to approximate a percentile of the recorded durations
+        :param percent: Percentile from 0-100
+        :return: Optional[float], `None` if nothing was recorded
+        """
+        if not self._count:
+            return None
+        rank = percent / 100 * self._count
+        cumulative_count = 0
+        for index, bucket_count in enumerate(self._buckets):
+            cumulative_count += bucket_count
+            if cumulative_count >= rank and bucket_count:
+                return min(HISTOGRAM_BOUNDS[index], self._max) if index < len(HISTOGRAM_BOUNDS) else self._max
+        return self._max
+
+    def reset(self) -> None:
+        """
+        Method to forget every recorded duration
+        :return: None
+        """
+        with self._lock:
+            self._buckets = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+            self._count = 0
+            self._total = 0.0
+            self._min = self._max = None
+
+    def snapshot(self) -> dict:
+        """
+        Method to get a summary of the histogram, durations in milliseconds
+        :return: dict
+        """
+        def to_milliseconds(duration: Optional[float]) -> Optional[float]:
+            return None if duration is None else round(duration * 1000, 3)
+
+        return {
+            "count": self._count,
+            "mean_ms": to_milliseconds(self.mean),
+            "min_ms": to_milliseconds(self._min),
+            "p50_ms": to_milliseconds(self.percentile(50)),
+            "p95_ms": to_milliseconds(self.percentile(95)),
+            "p99_ms": to_milliseconds(self.percentile(99)),
+            "max_ms": to_milliseconds(self._max),
+        }
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self._total / self._count if self._count else None
+
+    @property
+    def buckets(self) -> tuple:
+        return tuple(self._buckets)
+
+
+class PlayerTelemetry:
+    """
+    In-process latency histograms and health counters of an `AudioPlayer`,
+    with an optional periodic dump to the Kivy logger
+    """
+
+    def __init__(self):
+        self._histograms = {timing: Histogram() for timing in TIMINGS}
+        self._counters = dict.fromkeys(COUNTERS, 0)
+        self._counters_lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._logging_event = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"counters={self._counters!r}, " \
+               f"logging={self._logging_event is not None!r})"
+
+    def record(self, timing: str, duration: Number) -> None:
+        """
+        Method to record a duration of the given timing
+        :param timing: Name of the timing, see `TIMINGS`
+        :param duration: Duration in seconds
+        :return: None
+        """
+        self._histograms[timing].record(duration)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """
+        Method to increment the given counter
+        :param counter: Name of the counter, see `COUNTERS`
+        :param amount: Amount to be added
+        :return: None
+        """
+        with self._counters_lock:
+            self._counters[counter] += amount
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        Method to get a snapshot of every histogram and counter
+        :return: Dict[str, dict]
+        """
+        return {
+            "uptime": round(time.monotonic() - self._started_at, 3),
+            "timings": {timing: histogram.snapshot() for timing, histogram in self._histograms.items()},
+            "counters": self._counters.copy(),
+        }
+
+    def reset(self) -> None:
+        """
+        Method to reset every histogram and counter
+        :return: None
+        """
+        for histogram in self._histograms.values():
+            histogram.reset()
+        with self._counters_lock:
+            self._counters = dict.fromkeys(COUNTERS, 0)
+        self._started_at = time.monotonic()
+
+    def log_stats(self) -> None:
+        """
+        Method to dump a compact summary of the stats to the Kivy logger
+        :return: None
+        """
+        summaries = {timing: histogram.snapshot() for timing, histogram in self._histograms.items() if len(histogram)}
+        timings = ", ".join(
+            f"{timing}={summary['p50_ms']}/{summary['p95_ms']}ms(n={summary['count']})"
+            for timing, summary in summaries.items()
+        )
+        counters = ", ".join(f"{counter}={value}" for counter, value in self._counters.items())
+        Logger.info(f"AudioPlayer: p50/p95 {timings or 'no timings'}; {counters}")
+
+    def start_logging(self, interval: Number = 60) -> None:
+        """
+        Method to dump the stats to the Kivy logger every `interval` seconds
+        :param interval: Seconds between dumps
+        :return: None
+        """
+        self.stop_logging()
+        self._logging_event = Clock.schedule_interval(lambda dt: self.log_stats(), interval)
+
+    def stop_logging(self) -> None:
+        """
+        Method to stop dumping the stats to the Kivy logger
+        :return: None
+        """
+        if self._logging_event is not None:
+            self._logging_event.cancel()
+            self._logging_event = None
+
+    def get_histogram(self, timing: str) -> Histogram:
+        """
+        Method to get the histogram of the given timing
+        :param timing: Name of the timing, see `TIMINGS`
+        :return: Histogram
+        """
+        return self._histograms[timing]
+
+    @property
+    def counters(self) -> dict:
+        return self._counters.copy()
@@ -0,0 +1,223 @@
+"""
+Decoding of audio files to raw PCM through the ffmpeg command line tools.
+`ffpyplayer` plays audio files through SDL and never hands out the decoded samples,
+so whatever needs the PCM frames themselves (ring-buffered playback, analysis, scanners...)
+goes through an `ffmpeg` subprocess instead:
+
+    with PCMDecoder("song.mp3", start=30) as decoder:
+        block = decoder.read(1024)
+        while block:
+            ...
+            block = decoder.read(1024)
+"""
+
+import json
+import shutil
+import subprocess
+from typing import Optional, Final
+from src.type_aliases import Number, FilePath
+from src.utils import convert_file_path_to_string
+
+__all__ = (
+    "PCM_SAMPLE_RATE",
+    "PCM_CHANNELS",
+    "PCM_SAMPLE_WIDTH",
+    "PCM_FRAME_SIZE",
+    "FFMPEG_EXECUTABLE",
+    "FFPROBE_EXECUTABLE",
+    "probe_duration",
+    "PCMDecoder",
+    "decode_file",
+)
+
+
+PCM_SAMPLE_RATE: Final = 44100
+PCM_CHANNELS: Final = 2
+PCM_SAMPLE_WIDTH: Final = 2
+"""
+Bytes per sample, the decoded samples are signed 16-bit little-endian integers
+"""
+PCM_FRAME_SIZE: Final = PCM_CHANNELS * PCM_SAMPLE_WIDTH
+"""
+Bytes per frame, i.e a sample of every channel
+"""
+FFMPEG_EXECUTABLE: Final = "ffmpeg"
+FFPROBE_EXECUTABLE: Final = "ffprobe"
+
+
+def _find_executable(executable: str) -> str:
+    """
+    Private function to get the full path of an ffmpeg tool
+    :param executable: Name of the executable
+    :return: str
+    """
+    executable_path = shutil.which(executable)
+    if executable_path is None:
+        raise FileNotFoundError(f"{executable!r} is required to decode audio files but was not found")
+    return executable_path
+
+
+def probe_duration(source: FilePath) -> Optional[float]:
+    """
+    Function to get the duration of an audio file in seconds, without decoding it
+    :param source: Path of the audio file
+    :return: Optional[float], `None` if the duration is unknown (e.g live streams)
+    """
+    completed_process = subprocess.run(
+        (
+            _find_executable(FFPROBE_EXECUTABLE),
+            "-v", "error",
+            "-show_entries", "format=duration",
+            "-of", "json",
+            convert_file_path_to_string(source),
+        ),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    if completed_process.returncode:
+        raise ValueError(f"unable to probe {source!r}: {completed_process.stderr.decode(errors='replace').strip()}")
+    duration = json.loads(completed_process.stdout).get("format", {}).get("duration")
+    return None if duration in (None, "N/A") else float(duration)
+
+
+class PCMDecoder:
+    """
+    Streaming decoder of an audio file to interleaved signed 16-bit PCM frames,
+    resampled to `sample_rate` and mixed to `channels`
+    """
+    __slots__ = (
+        "_source",
+        "_start",
+        "_sample_rate",
+        "_channels",
+        "_frame_size",
+        "_process",
+    )
+
+    def __init__(
+            self,
+            source: FilePath,
+            start: Number = 0,
+            sample_rate: int = PCM_SAMPLE_RATE,
+            channels: int = PCM_CHANNELS):
+        self._source = convert_file_path_to_string(source)
+        self._start = max(start, 0)
+        self._sample_rate = sample_rate
+        self._channels = channels
+        self._frame_size = channels * PCM_SAMPLE_WIDTH
+        self._process = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"source={self._source!r}, " \
+               f"start={self._start!r}, " \
+               f"sample_rate={self._sample_rate!r}, " \
+               f"channels={self._channels!r})"
+
+    def __enter__(self) -> "PCMDecoder":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """
+        Method to start decoding, seeking to `start` first
+        :return: None
+        """
+        if self._process is not None:
+            return
+        self._process = subprocess.Popen(
+            (
+                _find_executable(FFMPEG_EXECUTABLE),
+                "-nostdin",
+                "-v", "error",
+                "-ss", f"{self._start:.6f}",
+                "-i", self._source,
+                "-vn",
+                "-f", "s16le",
+                "-acodec", "pcm_s16le",
+                "-ac", str(self._channels),
+                "-ar", str(self._sample_rate),
+                "-",
+            ),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, frames: int) -> bytes:
+        """
+        Method to read up to the given number of frames, blocking until they are decoded.
+        Fewer frames are returned only at the end of the audio file, nothing past it
+        :param frames: Number of frames to be read
+        :return: bytes
+        """
+        self.open()
+        size = frames * self._frame_size
+        data = self._process.stdout.read(size)
+        if len(data) < size and self._process.wait() != 0:
+            raise ValueError(f"unable to decode {self._source!r}")
+        # Never handing out a partial frame
+        return data[:len(data) - len(data) % self._frame_size]
+
+    def close(self) -> None:
+        """
+        Method to stop decoding and release the decoder process
+        :return: None
+        """
+        if self._process is None:
+            return
+        if self._process.poll() is None:
+            self._process.kill()
+        self._process.stdout.close()
+        self._process.wait()
+        self._process = None
+
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def start(self) -> float:
+        return self._start
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def channels(self) -> int:
+        return self._channels
+
+    @property
+    def frame_size(self) -> int:
+        return self._frame_size
+
+    @property
+    def closed(self) -> bool:
+        return self._process is None
+
+
+def decode_file(
+        source: FilePath,
+        sample_rate: int = PCM_SAMPLE_RATE,
+        channels: int = PCM_CHANNELS,
+        block_frames: int = 65536) -> bytes:
+    """
+    Function to decode a whole audio file to PCM frames at once
+    :param source: Path of the audio file
+    :param sample_rate: Sample rate of the decoded frames
+    :param channels: Number of channels of the decoded frames
+    :param block_frames: Frames read per block
+    :return: bytes
+    """
+    blocks = []
+    with PCMDecoder(source, sample_rate=sample_rate, channels=channels) as decoder:
+        block = decoder.read(block_frames)
+        while block:
+            blocks.append(block)
+            block = decoder.read(block_frames)
+    return b"".join(blocks)
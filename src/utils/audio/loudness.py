@@ -0,0 +1,421 @@
+"""
+Library-wide loudness scanner computing EBU R128 loudness and ReplayGain 2.0 track & album gains.
+Audio files are measured on a process pool (one worker per core by default) and every result is appended
+to a sidecar cache right away, so an interrupted scan resumes where it stopped:
+
+    scanner = LoudnessScanner("/music")
+    scanner.scan()
+    player = AudioPlayer(gain_function=scanner.get_track_gain)
+
+or from the command line:
+
+    python -m src.utils.audio.loudness /music
+
+Measurements follow ITU-R BS.1770-4 (K-weighting, 400ms blocks, absolute & relative gating)
+on the stereo downmix decoded by ffmpeg; peaks are sample peaks.
+Every audio file of a directory is considered part of the same album
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterator, Optional, Final, Dict, Any
+from kivy.logger import Logger
+from src.type_aliases import FilePath
+from src.utils import convert_file_path_to_string
+from src.constants.supported_file_extensions import LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS
+from src.utils.audio.decoding import PCMDecoder
+from src.utils.audio.audioplayer.dsp import Biquad
+
+__all__ = (
+    "REPLAYGAIN_REFERENCE_LOUDNESS",
+    "LOUDNESS_SAMPLE_RATE",
+    "measure_loudness",
+    "LoudnessScanner",
+)
+
+
+REPLAYGAIN_REFERENCE_LOUDNESS: Final = -18.0
+"""
+Loudness in LUFS the ReplayGain 2.0 gains bring audio files to
+"""
+LOUDNESS_SAMPLE_RATE: Final = 48000
+_ABSOLUTE_GATE: Final = -70.0
+_RELATIVE_GATE: Final = -10.0
+_SEGMENT_DURATION: Final = 0.1
+_SEGMENTS_PER_BLOCK: Final = 4
+_HISTOGRAM_RESOLUTION: Final = 0.1
+"""
+Width in LU of the bins of the block loudness histograms kept per track to compute album loudness
+"""
+_DECODE_FRAMES: Final = 65536
+_CACHE_FILE_NAME: Final = ".loudness.jsonl"
+_JSON_SEPARATORS: Final = (",", ":")
+
+
+class _KWeightingFilter(Biquad):
+    """
+    Private class of the two sections of the K-weighting filter of ITU-R BS.1770,
+    with the coefficients derived for any sample rate
+    """
+    __slots__ = ()
+
+    def _compute_coefficients(self):
+        k = math.tan(math.pi * self._frequency / self._sample_rate)
+        a0 = 1 + k / self._q + k * k
+        a1 = 2 * (k * k - 1) / a0
+        a2 = (1 - k / self._q + k * k) / a0
+        if self._kind == "highshelf":
+            high_gain = 10 ** (self._gain / 20)
+            band_gain = high_gain ** 0.4996667741545416
+            b = (
+                (high_gain + band_gain * k / self._q + k * k) / a0,
+                2 * (k * k - high_gain) / a0,
+                (high_gain - band_gain * k / self._q + k * k) / a0,
+            )
+        else:
+            b = (1, -2, 1)
+        return b[0], b[1], b[2], a1, a2
+
+
+def _to_loudness(power: np.ndarray) -> np.ndarray:
+    """
+    Private function to convert mean square powers (summed over channels) to loudness in LUFS
+    :param power: Powers
+    :return: np.ndarray
+    """
+    return -0.691 + 10 * np.log10(np.maximum(power, 1e-20))
+
+
+def measure_loudness(source: FilePath) -> Dict[str, Any]:
+    """
+    Function to measure the integrated loudness and the peak of an audio file,
+    with the histogram of its gated blocks for album loudness
+    :param source: Path of the audio file
+    :return: Dict[str, Any], loudness (LUFS, `None` if too short or silent), peak (0-1) and histogram
+    """
+    filters = (
+        _KWeightingFilter("highshelf", 1681.974450955533, 3.999843853973347, 0.7071752369554196),
+        _KWeightingFilter("highpass", 38.13547087602444, 0, 0.5003270373238773),
+    )
+    segment_frames = int(LOUDNESS_SAMPLE_RATE * _SEGMENT_DURATION)
+    segment_powers = []
+    leftover = None
+    peak = 0
+    with PCMDecoder(source, sample_rate=LOUDNESS_SAMPLE_RATE) as decoder:
+        for section in filters:
+            section.prepare(LOUDNESS_SAMPLE_RATE, decoder.channels)
+        data = decoder.read(_DECODE_FRAMES)
+        while data:
+            samples = np.frombuffer(data, dtype=np.int16).reshape(-1, decoder.channels)
+            peak = max(peak, int(np.abs(samples.astype(np.int32)).max()))
+            block = samples.astype(np.float32) / 32768
+            for section in filters:
+                block = section.process(block)
+            squares = np.square(block, dtype=np.float64)
+            if leftover is not None:
+                squares = np.concatenate((leftover, squares))
+            whole_frames = len(squares) - len(squares) % segment_frames
+            segment_powers.append(
+                squares[:whole_frames].reshape(-1, segment_frames, decoder.channels).mean(axis=1).sum(axis=1)
+            )
+            leftover = squares[whole_frames:]
+            data = decoder.read(_DECODE_FRAMES)
+    segment_powers = np.concatenate(segment_powers) if segment_powers else np.zeros(0)
+    result = {"loudness": None, "peak": peak / 32768, "histogram": None}
+    if len(segment_powers) < _SEGMENTS_PER_BLOCK:
+        return result
+    # 400ms blocks overlapping by 75%, i.e sliding by one 100ms segment
+    cumulative_powers = np.concatenate(((0,), np.cumsum(segment_powers)))
+    block_powers = (cumulative_powers[_SEGMENTS_PER_BLOCK:] - cumulative_powers[:-_SEGMENTS_PER_BLOCK]) / _SEGMENTS_PER_BLOCK
+    block_powers = block_powers[_to_loudness(block_powers) > _ABSOLUTE_GATE]
+    if not len(block_powers):
+        return result
+    relative_gate = _to_loudness(block_powers.mean()) + _RELATIVE_GATE
+    gated_powers = block_powers[_to_loudness(block_powers) > relative_gate]
+    bins = np.floor((_to_loudness(block_powers) - _ABSOLUTE_GATE) / _HISTOGRAM_RESOLUTION).astype(np.int64)
+    counts = np.bincount(bins - bins.min())
+    result["loudness"] = round(float(_to_loudness(gated_powers.mean())), 2)
+    result["histogram"] = [int(bins.min()), counts.tolist()]
+    return result
+
+
+def _album_loudness(histograms) -> Optional[float]:
+    """
+    Private function to gate the blocks of every track of an album together, from their histograms
+    :param histograms: Histograms returned by `measure_loudness`
+    :return: Optional[float], loudness in LUFS
+    """
+    counts = {}
+    for first_bin, bin_counts in histograms:
+        for offset, count in enumerate(bin_counts):
+            if count:
+                counts[first_bin + offset] = counts.get(first_bin + offset, 0) + count
+    if not counts:
+        return None
+    bins = np.fromiter(counts.keys(), dtype=np.float64)
+    bin_counts = np.fromiter(counts.values(), dtype=np.float64)
+    # Blocks are accounted at the center of their bin
+    bin_powers = 10 ** ((_ABSOLUTE_GATE + (bins + 0.5) * _HISTOGRAM_RESOLUTION + 0.691) / 10)
+    relative_gate = _to_loudness(np.average(bin_powers, weights=bin_counts)) + _RELATIVE_GATE
+    gated = _to_loudness(bin_powers) > relative_gate
+    return round(float(_to_loudness(np.average(bin_powers[gated], weights=bin_counts[gated]))), 2)
+
+
+def _measure_track(source: str) -> Dict[str, Any]:
+    """
+    Private function run in the worker processes, catching decoding errors so one bad file does not stop the scan
+    :param source: Path of the audio file
+    :return: Dict[str, Any]
+    """
+    try:
+        return measure_loudness(source)
+    except (OSError, ValueError) as exception:
+        return {"error": str(exception)}
+
+
+class LoudnessScanner:
+    """
+    Scanner of the audio files of a directory tree, keeping the results in a sidecar JSON lines cache
+    (`.loudness.jsonl` at the root by default). Each measured track is appended as soon as it is done,
+    audio files whose size and modification time did not change are never measured twice
+    """
+
+    def __init__(
+            self,
+            root_directory: FilePath,
+            cache_file_path: Optional[FilePath] = None,
+            workers: Optional[int] = None,
+            extensions=LINUX_PLAYER_SUPPORTED_FILE_EXTENSIONS):
+        self._root_directory = os.path.abspath(convert_file_path_to_string(root_directory))
+        self._cache_file_path = os.path.join(self._root_directory, _CACHE_FILE_NAME) \
+            if cache_file_path is None else convert_file_path_to_string(cache_file_path)
+        self._workers = workers or os.cpu_count() or 1
+        self._extensions = tuple(extension.lower() for extension in extensions)
+        self._tracks = {}
+        self._albums = {}
+        self._stopping = False
+        self._load_cache()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"root_directory={self._root_directory!r}, " \
+               f"tracks={len(self._tracks)!r}, " \
+               f"workers={self._workers!r})"
+
+    def _load_cache(self) -> None:
+        """
+        Private method to read the results of previous (possibly interrupted) scans, later lines win
+        :return: None
+        """
+        try:
+            with open(self._cache_file_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Last line of an interrupted scan
+                        continue
+                    if "album" in record:
+                        self._albums[record["album"]] = record
+                    else:
+                        self._tracks[record["path"]] = record
+        except FileNotFoundError:
+            pass
+
+    def _write_cache(self) -> None:
+        """
+        Private method to rewrite the cache without the superseded lines, atomically
+        :return: None
+        """
+        temporary_file_path = f"{self._cache_file_path}.tmp"
+        with open(temporary_file_path, "w", encoding="utf-8") as file:
+            for record in (*self._tracks.values(), *self._albums.values()):
+                file.write(json.dumps(record, separators=_JSON_SEPARATORS) + "\n")
+        os.replace(temporary_file_path, self._cache_file_path)
+
+    def _get_key(self, source: FilePath) -> str:
+        """
+        Private method to get the key of an audio file in the cache, its path relative to the root
+        :param source: Path of the audio file
+        :return: str
+        """
+        return os.path.relpath(os.path.abspath(convert_file_path_to_string(source)), self._root_directory)
+
+    def _is_up_to_date(self, key: str, stat_result: os.stat_result) -> bool:
+        """
+        Private method to check whether the cached result of an audio file is still valid
+        :param key: Key of the audio file
+        :param stat_result: Current stat of the audio file
+        :return: bool
+        """
+        record = self._tracks.get(key)
+        return record is not None \
+            and record["size"] == stat_result.st_size \
+            and record["mtime_ns"] == stat_result.st_mtime_ns
+
+    def iter_audio_files(self) -> Iterator[str]:
+        """
+        Method to iterate over the keys of the audio files of the directory tree, in a stable order
+        :return: Iterator[str]
+        """
+        for directory_path, directory_names, file_names in os.walk(self._root_directory):
+            directory_names.sort()
+            for file_name in sorted(file_names):
+                if os.path.splitext(file_name)[1].lower() in self._extensions:
+                    yield os.path.relpath(os.path.join(directory_path, file_name), self._root_directory)
+
+    def _update_albums(self) -> None:
+        """
+        Private method to compute the album gain of every directory whose tracks are all measured
+        :return: None
+        """
+        album_tracks = {}
+        for key, record in self._tracks.items():
+            album_tracks.setdefault(os.path.dirname(key), []).append(record)
+        self._albums.clear()
+        for album, records in album_tracks.items():
+            histograms = [record["histogram"] for record in records if record.get("histogram")]
+            loudness = _album_loudness(histograms)
+            if loudness is None:
+                continue
+            self._albums[album] = {
+                "album": album,
+                "loudness": loudness,
+                "gain": round(REPLAYGAIN_REFERENCE_LOUDNESS - loudness, 2),
+                "peak": max(record.get("peak", 0) for record in records),
+                "tracks": len(records),
+            }
+
+    def scan(self, progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Method to measure every new or modified audio file of the directory tree, then update the album gains.
+        Blocking, run it on a background thread (see `threaded`) from an app
+        :param progress_callback: Called from the scanning thread with (measured, pending) after each audio file
+        :return: Dict[str, Any], counts of the scan & its duration
+        """
+        self._stopping = False
+        start_time = time.perf_counter()
+        pending = []
+        for key in self.iter_audio_files():
+            try:
+                stat_result = os.stat(os.path.join(self._root_directory, key))
+            except OSError:
+                continue
+            if not self._is_up_to_date(key, stat_result):
+                pending.append((key, stat_result))
+        measured = errors = 0
+        if pending:
+            with open(self._cache_file_path, "a", encoding="utf-8") as cache_file, \
+                    ProcessPoolExecutor(
+                        max_workers=min(self._workers, len(pending)),
+                        mp_context=multiprocessing.get_context("spawn")) as executor:
+                pending_iterator = iter(pending)
+                running: Dict[Future, tuple] = {}
+                while True:
+                    # Only a couple of audio files per worker are submitted ahead, so stopping is quick
+                    while not self._stopping and len(running) < self._workers * 2:
+                        item = next(pending_iterator, None)
+                        if item is None:
+                            break
+                        running[executor.submit(_measure_track, os.path.join(self._root_directory, item[0]))] = item
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        key, stat_result = running.pop(future)
+                        result = future.result()
+                        if "error" in result:
+                            errors += 1
+                            Logger.warning(f"LoudnessScanner: Unable to measure {key!r}: {result['error']}")
+                            continue
+                        record = {
+                            "path": key,
+                            "size": stat_result.st_size,
+                            "mtime_ns": stat_result.st_mtime_ns,
+                            "loudness": result["loudness"],
+                            "gain": None if result["loudness"] is None
+                            else round(REPLAYGAIN_REFERENCE_LOUDNESS - result["loudness"], 2),
+                            "peak": round(result["peak"], 6),
+                            "histogram": result["histogram"],
+                        }
+                        self._tracks[key] = record
+                        cache_file.write(json.dumps(record, separators=_JSON_SEPARATORS) + "\n")
+                        cache_file.flush()
+                        measured += 1
+                        if progress_callback is not None:
+                            progress_callback(measured, len(pending))
+        if not self._stopping:
+            # Forgetting the audio files which were deleted since
+            audio_files = set(self.iter_audio_files())
+            for key in [key for key in self._tracks if key not in audio_files]:
+                del self._tracks[key]
+            self._update_albums()
+            self._write_cache()
+        return {
+            "measured": measured,
+            "errors": errors,
+            "pending": len(pending) - measured - errors,
+            "tracks": len(self._tracks),
+            "albums": len(self._albums),
+            "duration": time.perf_counter() - start_time,
+        }
+
+    def stop(self) -> None:
+        """
+        Method to stop a scan running on another thread after the audio files being measured,
+        the next scan resumes from there
+        :return: None
+        """
+        self._stopping = True
+
+    def get_result(self, source: FilePath) -> Optional[Dict[str, Any]]:
+        """
+        Method to get the cached measurement of an audio file
+        :param source: Path of the audio file
+        :return: Optional[Dict[str, Any]]
+        """
+        return self._tracks.get(self._get_key(source))
+
+    def get_track_gain(self, source: FilePath) -> Optional[float]:
+        """
+        Method to get the ReplayGain track gain of an audio file in dB, usable as `AudioPlayer.gain_function`
+        :param source: Path of the audio file
+        :return: Optional[float], `None` if it was not measured
+        """
+        record = self.get_result(source)
+        return None if record is None else record["gain"]
+
+    def get_album_gain(self, source: FilePath) -> Optional[float]:
+        """
+        Method to get the ReplayGain album gain of an audio file in dB, usable as `AudioPlayer.gain_function`
+        :param source: Path of the audio file
+        :return: Optional[float], `None` if its album was not measured
+        """
+        album = self._albums.get(os.path.dirname(self._get_key(source)))
+        return None if album is None else album["gain"]
+
+    @property
+    def root_directory(self) -> str:
+        return self._root_directory
+
+    @property
+    def cache_file_path(self) -> str:
+        return self._cache_file_path
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+
+if __name__ == "__main__":
+    scanner = LoudnessScanner(sys.argv[1])
+    stats = scanner.scan(lambda measured, pending: print(f"\r{measured}/{pending}", end="", flush=True))
+    print()
+    for stat_name, value in stats.items():
+        print(f"    {stat_name:<12}{value:.3f}" if isinstance(value, float) else f"    {stat_name:<12}{value}")
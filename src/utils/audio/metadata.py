@@ -1,6 +1,6 @@
 import stagger
 from pathlib import Path
-from typing import Optional, Final
+from typing import Optional, Union, Final
 from src.type_aliases import FilePath
 from src.utils import convert_file_path_to_string
 
@@ -10,7 +10,7 @@ __all__ = (
 
 
 def _convert_lyrics_registration_value_to_tag(
-        string_or_tag: Optional[str, stagger.id3.USLT]) -> stagger.id3.USLT:
+        string_or_tag: Union[str, stagger.id3.USLT]) -> stagger.id3.USLT:
     """
     Private function to check & convert a lyrics' registration value to an id3 USLT tag
     :param string_or_tag: Lyrics value to check and convert
@@ -1,12 +1,105 @@
-from typing import Optional
+import os
+import re
+import weakref
+from bisect import bisect_left, bisect_right
+from typing import Optional, Callable, Hashable, Iterable, Final
 from src.utils import shuffle, is_plural
+from src.utils.audio.metadata import AudioMetadata
 from kivy.core.audio import Sound
 
 __all__ = (
+    "SORT_COLUMNS",
+    "normalized_path_key",
+    "metadata_key",
+    "collation_key",
     "Playlist",
 )
 
 
+SORT_COLUMNS: Final = (
+    "artist",
+    "album",
+    "title",
+    "genre",
+    "date",
+    "path",
+)
+_NATURAL_NUMBER_PATTERN: Final = re.compile(r"(\d+)")
+
+
+def _song_source(song) -> str:
+    """
+    Private function to get the path of a playlist entry, whether a string or a sound object
+    :param song: String or sound object to get the source of
+    :return: str
+    """
+    return song.source if isinstance(song, Sound) else song
+
+
+def normalized_path_key(song) -> str:
+    """
+    Function to build a hashable key for a playlist entry from its normalized absolute path.
+    Used as the default key for set operations on playlists
+    :param song: String or sound object to build the key for
+    :return: str
+    """
+    return os.path.normcase(os.path.abspath(_song_source(song)))
+
+
+def metadata_key(song) -> tuple:
+    """
+    Function to build a hashable key for a playlist entry from its artist, title and duration,
+    to match the same track across different files and paths.
+    The duration (rounded to seconds) is only available for sound objects
+    :param song: String or sound object to build the key for
+    :return: tuple
+    """
+    metadata = AudioMetadata(_song_source(song), silent=True)
+    duration = round(song.length) if isinstance(song, Sound) else None
+    return (
+        (metadata.artist or '').casefold(),
+        (metadata.title or '').casefold(),
+        duration,
+    )
+
+
+def collation_key(value) -> tuple:
+    """
+    Function to build a locale-aware sort key for a tag value.
+    The value is case-folded, stripped of a leading "The" and split into text and number parts
+    so that numbers are ordered naturally ("Track 2" < "Track 10")
+    :param value: Tag value to build the key for
+    :return: tuple
+    """
+    if value is None:
+        return '',
+    text = str(value).strip().casefold()
+    if text.startswith("the "):
+        text = text[4:].lstrip()
+    # Splitting on a capturing group always yields text at even indexes and numbers at odd ones
+    parts = _NATURAL_NUMBER_PATTERN.split(text)
+    parts[1::2] = map(int, parts[1::2])
+    return tuple(parts)
+
+
+class _ReversedKey:
+    """
+    Private class inverting the ordering of a sort key, to keep descending orders bisectable
+    """
+    __slots__ = (
+        "key",
+    )
+
+    def __init__(self, key: tuple):
+        self.key = key
+
+    def __lt__(self, other: "_ReversedKey") -> bool:
+        return other.key < self.key
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _ReversedKey) and self.key == other.key
+
+
 # TODO: add support for loading and saving as m3u files
 class Playlist:
     """
@@ -15,11 +108,24 @@ class Playlist:
     __slots__ = (
         "_name",
         "_songs",
+        "_sort_columns",
+        "_sort_reverse",
+        "_sort_keys",
+        "__weakref__",
     )
     _used_names = []
     """
     List of used names
     """
+    _collation_keys = {}
+    """
+    Private dictionary mapping normalized paths to the collation keys of every sort column,
+    shared by all playlists so re-sorting never re-reads the metadata
+    """
+    _sorted_playlists = weakref.WeakSet()
+    """
+    Private set of the playlists in sorted mode, to move their songs when collation keys are invalidated
+    """
     allowed_classes = [Sound, str]
     """
     List of class names to check against
@@ -29,6 +135,9 @@ class Playlist:
         self._update_used_names(name)
         self._name = name
         self._songs = []
+        self._sort_columns = ()
+        self._sort_reverse = False
+        self._sort_keys = []
         self.add(*args)
 
     def __repr__(self) -> str:
@@ -93,12 +202,256 @@ class Playlist:
         cls._check_playlist_name(name)
         cls._used_names.append(name)
 
+    @classmethod
+    def invalidate_collation_keys(cls, *args) -> None:
+        """
+        Class-method to drop the cached collation keys of the given songs, e.g after re-tagging.
+        The songs are moved to their new position in every sorted playlist.
+        If no songs are given, the whole cache is cleared and the sorted playlists are re-sorted
+        :param args: List of strings or sound objects whose keys should be dropped
+        :return: None
+        """
+        if not args:
+            cls._collation_keys.clear()
+            for playlist in list(cls._sorted_playlists):
+                playlist.sort_by(*playlist._sort_columns, reverse=playlist._sort_reverse)
+        for song in args:
+            path_key = normalized_path_key(song)
+            collation_keys = cls._collation_keys.pop(path_key, None)
+            # Songs of sorted playlists always have cached keys, none of them holds a song without
+            if collation_keys is not None:
+                for playlist in list(cls._sorted_playlists):
+                    playlist._reposition(path_key, collation_keys)
+
+    @classmethod
+    def _get_collation_keys(cls, song) -> tuple:
+        """
+        Private class-method to get the collation keys of every sort column for the given song,
+        reading its metadata only once
+        :param song: String or sound object to get the keys for
+        :return: tuple
+        """
+        path_key = normalized_path_key(song)
+        try:
+            return cls._collation_keys[path_key]
+        except KeyError:
+            source = _song_source(song)
+            metadata = AudioMetadata(source, silent=True)
+            keys = cls._collation_keys[path_key] = (
+                collation_key(metadata.artist),
+                collation_key(metadata.album),
+                collation_key(metadata.title),
+                collation_key(metadata.genre),
+                collation_key(metadata.date),
+                collation_key(source),
+            )
+            return keys
+
+    def _sort_key(self, song):
+        """
+        Private method to build the sort key of a song from the current sort columns
+        :param song: String or sound object to build the key for
+        :return: Union[tuple, _ReversedKey]
+        """
+        return self._project_collation_keys(self._get_collation_keys(song))
+
+    def _project_collation_keys(self, collation_keys: tuple):
+        """
+        Private method to build a sort key from the collation keys of every sort column
+        :param collation_keys: Collation keys of a song, as cached by `_get_collation_keys`
+        :return: Union[tuple, _ReversedKey]
+        """
+        key = tuple(collation_keys[SORT_COLUMNS.index(column)] for column in self._sort_columns)
+        return _ReversedKey(key) if self._sort_reverse else key
+
+    def _reposition(self, path_key: str, old_collation_keys: tuple) -> None:
+        """
+        Private method to move the songs with the given path to their new position after a re-tag.
+        They are found with their old key, as the stored sort keys were built from it
+        :param path_key: Normalized path key of the re-tagged songs
+        :param old_collation_keys: Collation keys of the songs before the re-tag
+        :return: None
+        """
+        old_key = self._project_collation_keys(old_collation_keys)
+        start_index = bisect_left(self._sort_keys, old_key)
+        end_index = bisect_right(self._sort_keys, old_key, start_index)
+        moved_songs = []
+        kept_entries = []
+        for key, song in zip(self._sort_keys[start_index:end_index], self._songs[start_index:end_index]):
+            if normalized_path_key(song) == path_key:
+                moved_songs.append(song)
+            else:
+                kept_entries.append((key, song))
+        if not moved_songs:
+            return
+        self._sort_keys[start_index:end_index] = [key for key, _ in kept_entries]
+        self._songs[start_index:end_index] = [song for _, song in kept_entries]
+        self.add(*moved_songs)
+
+    def _rebuild_sort_keys(self) -> None:
+        """
+        Private method to rebuild the sort keys from the cache after an order preserving change
+        :return: None
+        """
+        if self._sort_columns:
+            self._sort_keys = [self._sort_key(song) for song in self._songs]
+
+    def _index_of(self, song) -> int:
+        """
+        Private method to find the index of a song, using binary search when sorted
+        :param song: The song to be found
+        :return: int
+        """
+        if not self._sort_columns:
+            return self._songs.index(song)
+        key = self._sort_key(song)
+        index = bisect_left(self._sort_keys, key)
+        end_index = bisect_right(self._sort_keys, key, index)
+        return self._songs.index(song, index, end_index)
+
+    def sort_by(self, *columns: str, reverse: bool = False) -> None:
+        """
+        Method to switch the playlist to sorted mode, ordering its songs by the given columns.
+        Songs added later are inserted in place using binary search instead of a full re-sort,
+        and collation keys are cached so re-sorting by other columns is cheap.
+        Calling with no columns switches back to the unsorted (insertion order) mode
+        :param columns: Sort columns in order of priority, from `SORT_COLUMNS`
+        :param reverse: Whether to sort in descending order
+        :return: None
+        """
+        for column in columns:
+            if column not in SORT_COLUMNS:
+                raise ValueError(f"column must be one of {SORT_COLUMNS!r}, not {column!r}")
+        self._sort_columns = columns
+        self._sort_reverse = reverse
+        if not columns:
+            self._sorted_playlists.discard(self)
+            self._sort_keys = []
+            return
+        self._sorted_playlists.add(self)
+        keys = [self._sort_key(song) for song in self._songs]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._songs[:] = [self._songs[index] for index in order]
+        self._sort_keys = [keys[index] for index in order]
+
+    @classmethod
+    def _from_songs(cls, name: str, songs: Iterable) -> "Playlist":
+        """
+        Private class-method to create a new playlist of the same class from already validated songs
+        :param name: Name of the new playlist
+        :param songs: Iterable of already type-checked songs
+        :return: Playlist
+        """
+        playlist = cls(name)
+        playlist._songs.extend(songs)
+        return playlist
+
+    @staticmethod
+    def _keys_of(songs: Iterable, key: Callable[..., Hashable]) -> set:
+        """
+        Private static-method to build the set of keys for the given songs
+        :param songs: Iterable of songs to build the keys for
+        :param key: Function building a hashable key for each song
+        :return: set
+        """
+        return {key(song) for song in songs}
+
+    @staticmethod
+    def _unique(songs: Iterable, key: Callable[..., Hashable], excluded_keys=frozenset()):
+        """
+        Private static-method to yield songs with keys not seen before, preserving their order
+        :param songs: Iterable of songs to be filtered
+        :param key: Function building a hashable key for each song
+        :param excluded_keys: Keys to be treated as already seen
+        :return: Generator
+        """
+        seen_keys = set(excluded_keys)
+        for song in songs:
+            song_key = key(song)
+            if song_key not in seen_keys:
+                seen_keys.add(song_key)
+                yield song
+
+    def union(self, *others: Iterable, name: str,
+              key: Callable[..., Hashable] = normalized_path_key) -> "Playlist":
+        """
+        Method to create a new playlist with the songs of this playlist followed by the songs
+        of the others which are not already present, in linear time and preserving order
+        :param others: Playlists or iterables of songs to be merged
+        :param name: Name of the new playlist
+        :param key: Function building a hashable key for each song (e.g `metadata_key`)
+        :return: Playlist
+        """
+        songs = [self]
+        for other in others:
+            if other is not self:
+                # Materialized first, so one-shot iterables are not consumed by the type checks
+                other = tuple(other)
+                for obj in other:
+                    self._check_obj_type(obj)
+            songs.append(other)
+        return self._from_songs(
+            name, self._unique((song for group in songs for song in group), key)
+        )
+
+    def intersection(self, *others: Iterable, name: str,
+                     key: Callable[..., Hashable] = normalized_path_key) -> "Playlist":
+        """
+        Method to create a new playlist with the songs of this playlist
+        which are present in every one of the others, in linear time and preserving order
+        :param others: Playlists or iterables of songs to intersect with
+        :param name: Name of the new playlist
+        :param key: Function building a hashable key for each song (e.g `metadata_key`)
+        :return: Playlist
+        """
+        other_keys = [self._keys_of(other, key) for other in others]
+        songs = []
+        seen_keys = set()
+        for song in self:
+            # Keys can be costly (e.g reading tags), each song's is built only once
+            song_key = key(song)
+            if song_key in seen_keys:
+                continue
+            seen_keys.add(song_key)
+            if all(song_key in keys for keys in other_keys):
+                songs.append(song)
+        return self._from_songs(name, songs)
+
+    def difference(self, *others: Iterable, name: str,
+                   key: Callable[..., Hashable] = normalized_path_key) -> "Playlist":
+        """
+        Method to create a new playlist with the songs of this playlist
+        which are not present in any of the others, in linear time and preserving order.
+        (e.g songs in the library but not in any playlist)
+        :param others: Playlists or iterables of songs to be subtracted
+        :param name: Name of the new playlist
+        :param key: Function building a hashable key for each song (e.g `metadata_key`)
+        :return: Playlist
+        """
+        excluded_keys = set()
+        for other in others:
+            excluded_keys.update(self._keys_of(other, key))
+        return self._from_songs(name, self._unique(self, key, excluded_keys))
+
+    def dedupe(self, key: Callable[..., Hashable] = normalized_path_key) -> None:
+        """
+        Method to remove duplicate songs from the playlist in-place,
+        in linear time and keeping the first occurrence of each
+        :param key: Function building a hashable key for each song (e.g `metadata_key`)
+        :return: None
+        """
+        self._songs[:] = self._unique(self._songs, key)
+        self._rebuild_sort_keys()
+
     def shuffle(self, return_copy: bool = True) -> Optional[list]:
         """
-        Method to shuffle the playlist's songs, whether in-place or as a copied list
+        Method to shuffle the playlist's songs, whether in-place or as a copied list.
+        Shuffling in-place switches the playlist back to the unsorted mode
         :param return_copy: Return the shuffled songs as a copied list or shuffle in-place
         :return: Optional[list]
         """
+        if not return_copy:
+            self.sort_by()
         return shuffle(self._songs, return_copy=return_copy)
 
     def add(self, *args) -> None:
@@ -109,7 +462,14 @@ class Playlist:
         """
         for obj in args:
             self._check_obj_type(obj)
-        self._songs.extend(args)
+        if not self._sort_columns:
+            self._songs.extend(args)
+            return
+        for obj in args:
+            key = self._sort_key(obj)
+            index = bisect_right(self._sort_keys, key)
+            self._sort_keys.insert(index, key)
+            self._songs.insert(index, obj)
 
     def pop(self, *args: int) -> None:
         """
@@ -119,6 +479,8 @@ class Playlist:
         """
         for index in args:
             self._songs.pop(index)
+            if self._sort_columns:
+                self._sort_keys.pop(index)
 
     def remove(self, *args) -> None:
         """
@@ -127,7 +489,7 @@ class Playlist:
         :return: None
         """
         for song in args:
-            self._songs.remove(song)
+            self.pop(self._index_of(song))
 
     def clear(self) -> None:
         """
@@ -135,6 +497,7 @@ class Playlist:
         :return: None
         """
         self._songs.clear()
+        self._sort_keys.clear()
 
     @property
     def name(self):
@@ -145,6 +508,10 @@ class Playlist:
         self._update_used_names(new_name)
         self._name = new_name
 
+    @property
+    def sort_columns(self) -> tuple:
+        return self._sort_columns
+
     @property
     def string_length(self) -> str:
         current_length = self.__len__()
@@ -0,0 +1,244 @@
+"""
+Detection of the leading & trailing silence of audio files, so `AudioPlayer` can start tracks
+at their first audible frame and switch to the next one at their last, without re-encoding anything:
+
+    cache = TrimPointCache("cache/trim_points.json")
+    cache.scan(playlist_sources)
+    player = AudioPlayer(playlist_sources, trim_function=cache.get_trim_points)
+
+Audio files are decoded by ffmpeg at a reduced sample rate and cut into short windows,
+the RMS level of every window is computed at once with NumPy and compared to a threshold.
+Only silence at the edges is trimmed, quiet passages in the middle of a track are left alone
+"""
+
+import os
+import json
+import time
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Optional, Final, Tuple, Dict, Any
+from kivy.logger import Logger
+from src.type_aliases import Number, FilePath
+from src.utils import convert_file_path_to_string
+from src.utils.audio.decoding import PCMDecoder
+
+__all__ = (
+    "TRIM_SAMPLE_RATE",
+    "find_trim_points",
+    "TrimPointCache",
+)
+
+
+TRIM_SAMPLE_RATE: Final = 22050
+"""
+Sample rate the audio files are decoded at for silence detection, plenty to tell silence from sound
+"""
+_DECODE_FRAMES: Final = 65536
+_CACHE_VERSION: Final = 1
+
+
+def find_trim_points(
+        source: FilePath,
+        threshold: Number = -60,
+        window: Number = 0.05,
+        margin: Number = 0.1) -> Tuple[float, float]:
+    """
+    Function to find where the audible part of an audio file starts and ends
+    :param source: Path of the audio file
+    :param threshold: RMS level in dBFS under which a window is considered silent
+    :param window: Duration of the windows in seconds
+    :param margin: Seconds of silence kept before the first and after the last audible window, for fade-ins & tails
+    :return: Tuple[float, float], start & end in seconds, the whole audio file if it is entirely silent
+    """
+    window_frames = max(int(TRIM_SAMPLE_RATE * window), 1)
+    # Compared to mean squares of samples normalized to 0-1, saving a square root per window
+    threshold_power = 10 ** (threshold / 10)
+    audible_windows = []
+    leftover = np.zeros(0, dtype=np.float64)
+    frame_count = 0
+    with PCMDecoder(source, sample_rate=TRIM_SAMPLE_RATE) as decoder:
+        data = decoder.read(_DECODE_FRAMES)
+        while data:
+            samples = np.frombuffer(data, dtype=np.int16).reshape(-1, decoder.channels)
+            frame_count += len(samples)
+            squares = np.concatenate((leftover, np.square(samples / 32768).mean(axis=1)))
+            whole_frames = len(squares) - len(squares) % window_frames
+            audible_windows.append(squares[:whole_frames].reshape(-1, window_frames).mean(axis=1) > threshold_power)
+            leftover = squares[whole_frames:]
+            data = decoder.read(_DECODE_FRAMES)
+    if len(leftover):
+        audible_windows.append(np.array((leftover.mean() > threshold_power,)))
+    duration = frame_count / TRIM_SAMPLE_RATE
+    audible_indexes = np.flatnonzero(np.concatenate(audible_windows)) if audible_windows else ()
+    if not len(audible_indexes):
+        return 0.0, duration
+    window_duration = window_frames / TRIM_SAMPLE_RATE
+    start = max(audible_indexes[0] * window_duration - margin, 0)
+    end = min((audible_indexes[-1] + 1) * window_duration + margin, duration)
+    return round(float(start), 3), round(float(end), 3)
+
+
+def _find_trim_points(source: str, threshold: Number, window: Number, margin: Number) -> Dict[str, Any]:
+    """
+    Private function run in the worker processes, catching decoding errors so one bad file does not stop the scan
+    :param source: Path of the audio file
+    :param threshold: See `find_trim_points`
+    :param window: See `find_trim_points`
+    :param margin: See `find_trim_points`
+    :return: Dict[str, Any]
+    """
+    try:
+        start, end = find_trim_points(source, threshold, window, margin)
+    except (OSError, ValueError) as exception:
+        return {"error": str(exception)}
+    return {"start": start, "end": end}
+
+
+class TrimPointCache:
+    """
+    Cache of the trim points of local audio files in a single JSON file, keyed by absolute path.
+    Audio files whose size and modification time did not change are never scanned twice,
+    changing the detection settings discards the cached trim points
+    """
+
+    def __init__(
+            self,
+            cache_file_path: FilePath,
+            threshold: Number = -60,
+            window: Number = 0.05,
+            margin: Number = 0.1,
+            workers: Optional[int] = None):
+        self._cache_file_path = convert_file_path_to_string(cache_file_path)
+        self._settings = {"threshold": threshold, "window": window, "margin": margin}
+        self._workers = workers or os.cpu_count() or 1
+        self._tracks = {}
+        self._load_cache()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"cache_file_path={self._cache_file_path!r}, " \
+               f"tracks={len(self._tracks)!r}, " \
+               f"workers={self._workers!r})"
+
+    def _load_cache(self) -> None:
+        """
+        Private method to read the cache file, unless it was written with other settings
+        :return: None
+        """
+        try:
+            with open(self._cache_file_path, encoding="utf-8") as file:
+                cache = json.load(file)
+        except FileNotFoundError:
+            return
+        except ValueError as exception:
+            Logger.warning(f"TrimPointCache: Ignoring the unreadable cache {self._cache_file_path!r}: {exception}")
+            return
+        if cache.get("version") == _CACHE_VERSION and cache.get("settings") == self._settings:
+            self._tracks = cache["tracks"]
+
+    def _write_cache(self) -> None:
+        """
+        Private method to write the cache file atomically
+        :return: None
+        """
+        cache_directory = os.path.dirname(self._cache_file_path)
+        if cache_directory:
+            os.makedirs(cache_directory, exist_ok=True)
+        temporary_file_path = f"{self._cache_file_path}.tmp"
+        with open(temporary_file_path, "w", encoding="utf-8") as file:
+            json.dump({"version": _CACHE_VERSION, "settings": self._settings, "tracks": self._tracks}, file)
+        os.replace(temporary_file_path, self._cache_file_path)
+
+    def _get_up_to_date_record(self, source: str) -> Optional[Dict[str, Any]]:
+        """
+        Private method to get the cached trim points of an audio file, if it did not change since
+        :param source: Absolute path of the audio file
+        :return: Optional[Dict[str, Any]]
+        """
+        record = self._tracks.get(source)
+        if record is None:
+            return None
+        try:
+            stat_result = os.stat(source)
+        except OSError:
+            return None
+        if record["size"] != stat_result.st_size or record["mtime_ns"] != stat_result.st_mtime_ns:
+            return None
+        return record
+
+    def scan(
+            self,
+            sources: Iterable[FilePath],
+            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        """
+        Method to find the trim points of every new or modified audio file among the given ones, then save the cache.
+        Blocking, run it on a background thread (see `threaded`) from an app
+        :param sources: Paths of the audio files
+        :param progress_callback: Called with (scanned, pending) after each audio file
+        :return: Dict[str, Any], counts of the scan & its duration
+        """
+        start_time = time.perf_counter()
+        pending = {}
+        for source in sources:
+            source = os.path.abspath(convert_file_path_to_string(source))
+            if source in pending or self._get_up_to_date_record(source) is not None:
+                continue
+            try:
+                pending[source] = os.stat(source)
+            except OSError as exception:
+                Logger.warning(f"TrimPointCache: Unable to scan {source!r}: {exception}")
+        scanned = errors = 0
+        if pending:
+            with ProcessPoolExecutor(
+                    max_workers=min(self._workers, len(pending)),
+                    mp_context=multiprocessing.get_context("spawn")) as executor:
+                futures = {
+                    executor.submit(_find_trim_points, source, **self._settings): source for source in pending
+                }
+                for future in as_completed(futures):
+                    source = futures[future]
+                    result = future.result()
+                    if "error" in result:
+                        errors += 1
+                        Logger.warning(f"TrimPointCache: Unable to scan {source!r}: {result['error']}")
+                        continue
+                    stat_result = pending[source]
+                    self._tracks[source] = {
+                        "size": stat_result.st_size,
+                        "mtime_ns": stat_result.st_mtime_ns,
+                        "start": result["start"],
+                        "end": result["end"],
+                    }
+                    scanned += 1
+                    if progress_callback is not None:
+                        progress_callback(scanned, len(pending))
+            self._write_cache()
+        return {
+            "scanned": scanned,
+            "errors": errors,
+            "tracks": len(self._tracks),
+            "duration": time.perf_counter() - start_time,
+        }
+
+    def get_trim_points(self, source: FilePath) -> Optional[Tuple[float, float]]:
+        """
+        Method to get the cached trim points of an audio file, usable as `AudioPlayer.trim_function`.
+        Never decodes anything, audio files have to be scanned first
+        :param source: Path of the audio file
+        :return: Optional[Tuple[float, float]], start & end in seconds, `None` if it was not scanned
+        """
+        record = self._get_up_to_date_record(os.path.abspath(convert_file_path_to_string(source)))
+        return None if record is None else (record["start"], record["end"])
+
+    @property
+    def cache_file_path(self) -> str:
+        return self._cache_file_path
+
+    @property
+    def settings(self) -> Dict[str, Number]:
+        return dict(self._settings)
+
+    @property
+    def workers(self) -> int:
+        return self._workers
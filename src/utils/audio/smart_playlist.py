@@ -0,0 +1,448 @@
+import time
+import heapq
+import operator
+from typing import Optional, Callable, Iterable, Dict, Any, Final
+from src.type_aliases import Number
+from src.utils.audio.metadata import AudioMetadata
+from src.utils.audio.playlist import Playlist, normalized_path_key, _song_source
+
+__all__ = (
+    "RULE_OPERATORS",
+    "Rule",
+    "AddedWithin",
+    "SmartPlaylist",
+    "TrackLibrary",
+    "read_tags",
+)
+
+
+RULE_OPERATORS: Final = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "in": lambda tag_value, value: tag_value in value,
+    "contains": operator.contains,
+}
+SECONDS_PER_DAY: Final = 86400
+
+
+def read_tags(song) -> Dict[str, Any]:
+    """
+    Function to read the tags of a song to be evaluated by smart playlist rules
+    :param song: String or sound object to read the tags of
+    :return: Dict[str, Any]
+    """
+    metadata = AudioMetadata(_song_source(song), silent=True)
+    return {
+        "title": metadata.title,
+        "album": metadata.album,
+        "artist": metadata.artist,
+        "genre": metadata.genre,
+        "date": metadata.date,
+    }
+
+
+class Rule:
+    """
+    Class representing a single smart playlist condition on a tag (e.g `Rule("genre", "==", "Jazz")`)
+    """
+    __slots__ = (
+        "_field",
+        "_operator_name",
+        "_operator",
+        "_value",
+    )
+
+    def __init__(self, field: str, operator_name: str, value):
+        if operator_name not in RULE_OPERATORS:
+            raise ValueError(f"operator must be one of {tuple(RULE_OPERATORS)!r}")
+        self._field = field
+        self._operator_name = operator_name
+        self._operator = RULE_OPERATORS[operator_name]
+        self._value = value
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"{self._field!r}, " \
+               f"{self._operator_name!r}, " \
+               f"{self._value!r})"
+
+    def matches(self, tags: Dict[str, Any], now: Optional[Number] = None) -> bool:
+        """
+        Method to check whether the given tags satisfy the rule.
+        Missing or incomparable tag values never match
+        :param tags: Dictionary of the track's tags
+        :param now: Timestamp to check time based rules against, defaults to the current time
+        :return: bool
+        """
+        tag_value = tags.get(self._field)
+        if tag_value is None:
+            return False
+        try:
+            return bool(self._operator(tag_value, self._value))
+        except TypeError:
+            return False
+
+    def expires_at(self, tags: Dict[str, Any]) -> Optional[Number]:
+        """
+        Method to get the timestamp at which a match for the given tags stops being valid.
+        Rules which do not depend on the current time never expire
+        :param tags: Dictionary of the track's tags
+        :return: Optional[Number]
+        """
+        return None
+
+    @property
+    def field(self) -> str:
+        return self._field
+
+    @property
+    def value(self):
+        return self._value
+
+
+class AddedWithin(Rule):
+    """
+    Rule matching tracks added to the library in the last given days
+    """
+    __slots__ = ()
+
+    def __init__(self, days: Number, field: str = "added"):
+        super(AddedWithin, self).__init__(field, ">=", days * SECONDS_PER_DAY)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"days={self._value / SECONDS_PER_DAY!r}, " \
+               f"field={self._field!r})"
+
+    def matches(self, tags: Dict[str, Any], now: Optional[Number] = None) -> bool:
+        added = tags.get(self._field)
+        if added is None:
+            return False
+        now = time.time() if now is None else now
+        try:
+            return bool(added >= now - self._value)
+        except (TypeError, ValueError):
+            return False
+
+    def expires_at(self, tags: Dict[str, Any]) -> Optional[Number]:
+        added = tags.get(self._field)
+        if added is None:
+            return None
+        try:
+            return added + self._value
+        except (TypeError, ValueError):
+            return None
+
+
+class SmartPlaylist(Playlist):
+    """
+    Rule based playlist, maintained as a materialized view of a track library.
+    Every added, removed or re-tagged track only has its own tags evaluated against the rules,
+    so a single change costs O(number of rules) instead of a full re-evaluation.
+    Smart playlists are read-only, their songs only change through their rules,
+    and their set operations return plain playlists
+    """
+    __slots__ = (
+        "_rules",
+        "_match_all",
+        "_members",
+        "_expirations",
+        "_scheduled_expirations",
+        "_materialized",
+    )
+
+    def __init__(self, name: str, *rules: Rule, match_all: bool = True):
+        super(SmartPlaylist, self).__init__(name)
+        self._rules = rules
+        self._match_all = match_all
+        self._members = {}
+        self._expirations = []
+        self._scheduled_expirations = {}
+        self._materialized = True
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"name={self._name!r}, " \
+               f"rules={self._rules!r}, " \
+               f"match_all={self._match_all!r}, " \
+               f"length={self.__len__()})"
+
+    def __contains__(self, item) -> bool:
+        try:
+            return normalized_path_key(item) in self._members
+        except TypeError:
+            return False
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __iter__(self):
+        for song, _ in self._members.values():
+            yield song
+
+    def __getitem__(self, item):
+        return self._materialize().__getitem__(item)
+
+    def _materialize(self) -> list:
+        """
+        Private method to rebuild the list of songs from the members, only when they changed
+        :return: list
+        """
+        if not self._materialized:
+            self._songs = [song for song, _ in self._members.values()]
+            self._materialized = True
+        return self._songs
+
+    @classmethod
+    def _from_songs(cls, name: str, songs: Iterable) -> Playlist:
+        """
+        Private class-method to create the result of a set operation,
+        a plain playlist as no rule maintains its songs
+        :param name: Name of the new playlist
+        :param songs: Iterable of already type-checked songs
+        :return: Playlist
+        """
+        return Playlist._from_songs(name, songs)
+
+    def _read_only(self, *args, **kwargs):
+        """
+        Private method replacing the editing methods of the playlist
+        :return: None
+        """
+        raise TypeError("smart playlists can only be changed through their rules")
+
+    def add(self, *args) -> None:
+        if args:
+            self._read_only()
+
+    pop = remove = clear = dedupe = sort_by = _read_only
+
+    def shuffle(self, return_copy: bool = True) -> Optional[list]:
+        if not return_copy:
+            self._read_only()
+        self._materialize()
+        return super(SmartPlaylist, self).shuffle()
+
+    def evaluate(self, tags: Dict[str, Any], now: Optional[Number] = None) -> bool:
+        """
+        Method to check whether the given tags satisfy the playlist's rules
+        :param tags: Dictionary of the track's tags
+        :param now: Timestamp to check time based rules against, defaults to the current time
+        :return: bool
+        """
+        if self._match_all:
+            return all(rule.matches(tags, now) for rule in self._rules)
+        return any(rule.matches(tags, now) for rule in self._rules)
+
+    def _schedule_expiration(self, key: str, tags: Dict[str, Any]) -> None:
+        """
+        Private method to remember when the membership of a track has to be re-evaluated.
+        Heap entries are deleted lazily: only the expirations in `self._scheduled_expirations`
+        are still valid, the others are skipped when popped
+        :param key: Normalized path key of the track
+        :param tags: Dictionary of the track's tags
+        :return: None
+        """
+        expirations = frozenset(rule.expires_at(tags) for rule in self._rules) - {None}
+        previous_expirations = self._scheduled_expirations.pop(key, frozenset())
+        if expirations:
+            self._scheduled_expirations[key] = expirations
+        for expiration in expirations - previous_expirations:
+            heapq.heappush(self._expirations, (expiration, key))
+        self._compact_expirations()
+
+    def _unschedule_expirations(self, key: str) -> None:
+        """
+        Private method to invalidate the expirations of a track which left the playlist
+        :param key: Normalized path key of the track
+        :return: None
+        """
+        if self._scheduled_expirations.pop(key, None) is not None:
+            self._compact_expirations()
+
+    def _compact_expirations(self) -> None:
+        """
+        Private method to rebuild the expiration heap once it is mostly made of invalidated entries,
+        so re-tagging and removing tracks never grows it without bound
+        :return: None
+        """
+        if len(self._expirations) <= 2 * len(self._rules) * len(self._scheduled_expirations) + 16:
+            return
+        self._expirations = [
+            (expiration, key)
+            for key, expirations in self._scheduled_expirations.items()
+            for expiration in expirations
+        ]
+        heapq.heapify(self._expirations)
+
+    def track_changed(self, song, tags: Dict[str, Any]) -> None:
+        """
+        Method to be called when a track is added to the library or re-tagged,
+        to add it to or remove it from the playlist according to the rules
+        :param song: String or sound object that changed
+        :param tags: Dictionary of the track's (new) tags
+        :return: None
+        """
+        key = normalized_path_key(song)
+        if self.evaluate(tags):
+            self._members[key] = (song, tags)
+            self._schedule_expiration(key, tags)
+        elif self._members.pop(key, None) is not None:
+            self._unschedule_expirations(key)
+        else:
+            return
+        self._materialized = False
+
+    def track_removed(self, song) -> None:
+        """
+        Method to be called when a track is removed from the library
+        :param song: String or sound object that was removed
+        :return: None
+        """
+        key = normalized_path_key(song)
+        if self._members.pop(key, None) is not None:
+            self._unschedule_expirations(key)
+            self._materialized = False
+
+    def expire(self, now: Optional[Number] = None) -> None:
+        """
+        Method to drop tracks whose time based rules (e.g `AddedWithin`) stopped matching.
+        Only tracks with passed expirations are re-evaluated
+        :param now: Timestamp to expire against, defaults to the current time
+        :return: None
+        """
+        now = time.time() if now is None else now
+        while self._expirations and self._expirations[0][0] <= now:
+            expiration, key = heapq.heappop(self._expirations)
+            expirations = self._scheduled_expirations.get(key, ())
+            if expiration not in expirations:
+                # Invalidated by a re-tag or removal since it was scheduled
+                continue
+            expirations = expirations - {expiration}
+            if expirations:
+                self._scheduled_expirations[key] = expirations
+            else:
+                del self._scheduled_expirations[key]
+            member = self._members.get(key)
+            if member is not None and not self.evaluate(member[1], now):
+                del self._members[key]
+                self._unschedule_expirations(key)
+                self._materialized = False
+
+    @property
+    def rules(self) -> tuple:
+        return self._rules
+
+    @property
+    def match_all(self) -> bool:
+        return self._match_all
+
+
+class TrackLibrary:
+    """
+    Utility class holding the tags of every track in the library,
+    forwarding each change to the subscribed smart playlists
+    """
+
+    def __init__(self, tags_reader: Callable[..., Dict[str, Any]] = read_tags):
+        self._tags_reader = tags_reader
+        self._tracks = {}
+        self._smart_playlists = []
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"length={self.__len__()}, " \
+               f"smart_playlists={len(self._smart_playlists)})"
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, item) -> bool:
+        return normalized_path_key(item) in self._tracks
+
+    def __iter__(self):
+        for song, _ in self._tracks.values():
+            yield song
+
+    def subscribe(self, smart_playlist: SmartPlaylist) -> None:
+        """
+        Method to keep the given smart playlist up to date with the library.
+        The playlist is populated once from the tracks already in the library
+        :param smart_playlist: Smart playlist to be subscribed
+        :return: None
+        """
+        self._smart_playlists.append(smart_playlist)
+        for song, tags in self._tracks.values():
+            smart_playlist.track_changed(song, tags)
+
+    def unsubscribe(self, smart_playlist: SmartPlaylist) -> None:
+        """
+        Method to stop updating the given smart playlist
+        :param smart_playlist: Smart playlist to be unsubscribed
+        :return: None
+        """
+        self._smart_playlists.remove(smart_playlist)
+
+    def add(self, song, **tags) -> None:
+        """
+        Method to add a track to the library. The "added" tag defaults to the current time
+        and the rest of the tags are read from the file if none are given
+        :param song: String or sound object to be added
+        :param tags: Keyword arguments holding the track's tags
+        :return: None
+        """
+        Playlist._check_obj_type(song)
+        if not tags:
+            tags = self._tags_reader(song)
+        tags.setdefault("added", time.time())
+        self._tracks[normalized_path_key(song)] = (song, tags)
+        for smart_playlist in self._smart_playlists:
+            smart_playlist.track_changed(song, tags)
+
+    def remove(self, song) -> None:
+        """
+        Method to remove a track from the library
+        :param song: String or sound object to be removed
+        :return: None
+        """
+        del self._tracks[normalized_path_key(song)]
+        for smart_playlist in self._smart_playlists:
+            smart_playlist.track_removed(song)
+
+    def retag(self, song, **new_tags) -> None:
+        """
+        Method to update some of the tags of a track in the library
+        :param song: String or sound object to be re-tagged
+        :param new_tags: Keyword arguments holding the new values for each tag
+        :return: None
+        """
+        key = normalized_path_key(song)
+        song, tags = self._tracks[key]
+        tags = {**tags, **new_tags}
+        self._tracks[key] = (song, tags)
+        Playlist.invalidate_collation_keys(song)
+        for smart_playlist in self._smart_playlists:
+            smart_playlist.track_changed(song, tags)
+
+    def get_tags(self, song, default_value=None) -> Optional[Dict[str, Any]]:
+        """
+        Method to get the tags of a track in the library
+        :param song: String or sound object to get the tags of
+        :param default_value: Value to return if the track is not in the library
+        :return: Optional[Dict[str, Any]]
+        """
+        track = self._tracks.get(normalized_path_key(song))
+        return default_value if track is None else track[1]
+
+    def expire(self, now: Optional[Number] = None) -> None:
+        """
+        Method to expire the time based rules of every subscribed smart playlist
+        :param now: Timestamp to expire against, defaults to the current time
+        :return: None
+        """
+        for smart_playlist in self._smart_playlists:
+            smart_playlist.expire(now)
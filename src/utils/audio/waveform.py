@@ -0,0 +1,371 @@
+"""
+Waveform overviews of local audio files for seek bars.
+Audio files are decoded once in a worker process and reduced to min/max peaks at several zoom levels,
+which are cached in a compact binary file keyed by the path, size and modification time of the audio file:
+
+    cache = WaveformCache("cache/waveforms")
+    waveform = cache.get_cached("song.mp3")
+    if waveform is None:
+        cache.request("song.mp3", callback=lambda waveform: seek_bar.draw(waveform.peaks(seek_bar.width)))
+    else:
+        seek_bar.draw(waveform.peaks(seek_bar.width))
+
+Only the latest request is generated: requesting another audio file (e.g when the user skips)
+or calling `cancel` aborts the generation in progress
+"""
+
+import os
+import struct
+import hashlib
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, Future
+from typing import Callable, Optional, Final, Tuple, Dict
+from kivy.clock import Clock
+from kivy.logger import Logger
+from src.type_aliases import Number, FilePath
+from src.utils import convert_file_path_to_string
+from src.utils.audio.decoding import PCMDecoder
+
+__all__ = (
+    "WAVEFORM_LEVELS",
+    "Waveform",
+    "WaveformCache",
+)
+
+
+WAVEFORM_LEVELS: Final = (256, 1024, 4096, 16384)
+"""
+Frames per bucket of each zoom level, from the finest to the coarsest.
+Each level must be a multiple of the previous one
+"""
+_CACHE_MAGIC: Final = b"WFPK"
+_CACHE_VERSION: Final = 1
+_CACHE_HEADER: Final = struct.Struct("<4sBIQB")
+"""
+Magic, version, sample rate, frame count and level count
+"""
+_CACHE_LEVEL_HEADER: Final = struct.Struct("<II")
+"""
+Frames per bucket and bucket count of a level, followed by the (min, max) int8 pairs of its buckets
+"""
+_CACHE_FILE_EXTENSION: Final = ".peaks"
+_DECODE_BUCKETS: Final = 512
+_PEAK_SCALE: Final = 127
+_current_job = None
+
+
+class Waveform:
+    """
+    Min/max peaks of an audio file at every zoom level, stored as int8 pairs scaled to [-127, 127]
+    """
+    __slots__ = (
+        "_sample_rate",
+        "_frame_count",
+        "_levels",
+    )
+
+    def __init__(self, sample_rate: int, frame_count: int, levels: Dict[int, np.ndarray]):
+        self._sample_rate = sample_rate
+        self._frame_count = frame_count
+        self._levels = levels
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"duration={self.duration!r}, " \
+               f"levels={tuple(self._levels)!r})"
+
+    def to_bytes(self) -> bytes:
+        """
+        Method to serialize the waveform to the binary cache format
+        :return: bytes
+        """
+        parts = [_CACHE_HEADER.pack(_CACHE_MAGIC, _CACHE_VERSION, self._sample_rate, self._frame_count, len(self._levels))]
+        for frames_per_bucket, peaks in self._levels.items():
+            parts.append(_CACHE_LEVEL_HEADER.pack(frames_per_bucket, len(peaks)))
+            parts.append(peaks.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Waveform":
+        """
+        Class-method to deserialize a waveform from the binary cache format
+        :param data: Serialized waveform
+        :return: Waveform
+        """
+        magic, version, sample_rate, frame_count, level_count = _CACHE_HEADER.unpack_from(data)
+        if magic != _CACHE_MAGIC or version != _CACHE_VERSION:
+            raise ValueError("not a waveform cache file")
+        offset = _CACHE_HEADER.size
+        levels = {}
+        for _ in range(level_count):
+            frames_per_bucket, bucket_count = _CACHE_LEVEL_HEADER.unpack_from(data, offset)
+            offset += _CACHE_LEVEL_HEADER.size
+            levels[frames_per_bucket] = np.frombuffer(
+                data, dtype=np.int8, count=bucket_count * 2, offset=offset
+            ).reshape(bucket_count, 2)
+            offset += bucket_count * 2
+        return cls(sample_rate, frame_count, levels)
+
+    def peaks(self, width: int, start: Number = 0, end: Optional[Number] = None) -> np.ndarray:
+        """
+        Method to get the min/max peaks of `width` pixel buckets between two positions,
+        reduced from the coarsest zoom level which still has a bucket per pixel
+        :param width: Number of pixel buckets
+        :param start: Position in seconds of the first bucket
+        :param end: Position in seconds of the end of the last bucket, the end of the audio file if `None`
+        :return: np.ndarray, float32 array of shape (width, 2) of (min, max) pairs from -1 to 1
+        """
+        start_frame = max(int(start * self._sample_rate), 0)
+        end_frame = self._frame_count if end is None else min(int(end * self._sample_rate), self._frame_count)
+        output = np.zeros((width, 2), dtype=np.float32)
+        if width <= 0 or end_frame <= start_frame or not self._levels:
+            return output
+        frames_per_pixel = (end_frame - start_frame) / width
+        frames_per_bucket = min(self._levels)
+        for level_frames_per_bucket in self._levels:
+            if frames_per_bucket < level_frames_per_bucket <= frames_per_pixel:
+                frames_per_bucket = level_frames_per_bucket
+        level = self._levels[frames_per_bucket]
+        first_bucket = start_frame // frames_per_bucket
+        last_bucket = min(-(-end_frame // frames_per_bucket), len(level))
+        buckets = level[first_bucket:last_bucket]
+        if not len(buckets):
+            return output
+        # Pixels narrower than a bucket repeat the bucket they fall in
+        pixel_starts = np.minimum(
+            (np.arange(width) * len(buckets) / width).astype(np.intp), len(buckets) - 1
+        )
+        output[:, 0] = np.minimum.reduceat(buckets[:, 0], pixel_starts)
+        output[:, 1] = np.maximum.reduceat(buckets[:, 1], pixel_starts)
+        output /= _PEAK_SCALE
+        return output
+
+    @property
+    def sample_rate(self) -> int:
+        return self._sample_rate
+
+    @property
+    def frame_count(self) -> int:
+        return self._frame_count
+
+    @property
+    def duration(self) -> float:
+        return self._frame_count / self._sample_rate
+
+    @property
+    def levels(self) -> Tuple[int, ...]:
+        return tuple(self._levels)
+
+
+def _initialize_worker(current_job) -> None:
+    """
+    Private function run in the worker process to share the id of the latest request with it
+    :param current_job: Shared value holding the id of the latest request
+    :return: None
+    """
+    global _current_job
+    _current_job = current_job
+
+
+def _reduce_to_buckets(samples: np.ndarray, frames_per_bucket: int) -> np.ndarray:
+    """
+    Private function to reduce interleaved samples to (min, max) pairs of every bucket, across channels
+    :param samples: int16 array of shape (frames, channels), a multiple of `frames_per_bucket` frames
+    :param frames_per_bucket: Frames per bucket
+    :return: np.ndarray, int16 array of shape (buckets, 2)
+    """
+    buckets = samples.reshape(-1, frames_per_bucket * samples.shape[1])
+    return np.stack((buckets.min(axis=1), buckets.max(axis=1)), axis=1)
+
+
+def _generate_waveform(source: str, job_id: int, levels: Tuple[int, ...], cache_file_path: str) -> Optional[bytes]:
+    """
+    Private function run in the worker process to decode an audio file, reduce it to peaks and cache them.
+    Decoding stops as soon as a newer request is made
+    :param source: Path of the audio file
+    :param job_id: Id of the request
+    :param levels: Frames per bucket of each zoom level
+    :param cache_file_path: Path of the cache file to be written
+    :return: Optional[bytes], the serialized waveform, `None` if the request was cancelled
+    """
+    finest_level = levels[0]
+    finest_buckets = []
+    frame_count = 0
+    with PCMDecoder(source) as decoder:
+        channels = decoder.channels
+        remainder = np.empty((0, channels), dtype=np.int16)
+        # A newer request (or `WaveformCache.cancel`) changes the shared job id and ends the loop early
+        while _current_job.value == job_id:
+            data = decoder.read(finest_level * _DECODE_BUCKETS)
+            if not data:
+                break
+            samples = np.concatenate((remainder, np.frombuffer(data, dtype=np.int16).reshape(-1, channels)))
+            frame_count += len(samples) - len(remainder)
+            whole_frames = len(samples) - len(samples) % finest_level
+            finest_buckets.append(_reduce_to_buckets(samples[:whole_frames], finest_level))
+            remainder = samples[whole_frames:]
+        else:
+            return None
+    if len(remainder):
+        finest_buckets.append(np.array([[remainder.min(), remainder.max()]], dtype=np.int16))
+    finest_peaks = np.concatenate(finest_buckets) if finest_buckets else np.zeros((0, 2), dtype=np.int16)
+    peak_levels = {}
+    for frames_per_bucket in levels:
+        group_size = frames_per_bucket // finest_level
+        bucket_count = -(-len(finest_peaks) // group_size)
+        # Padding the last group with values which never win its min/max, it is shorter than the others
+        padded_peaks = np.empty((bucket_count * group_size, 2), dtype=np.int16)
+        padded_peaks[:, 0] = np.iinfo(np.int16).max
+        padded_peaks[:, 1] = np.iinfo(np.int16).min
+        padded_peaks[:len(finest_peaks)] = finest_peaks
+        grouped_peaks = padded_peaks.reshape(bucket_count, group_size, 2)
+        level_peaks = np.stack((grouped_peaks[:, :, 0].min(axis=1), grouped_peaks[:, :, 1].max(axis=1)), axis=1)
+        peak_levels[frames_per_bucket] = (level_peaks.astype(np.int32) * _PEAK_SCALE // 32768).astype(np.int8)
+    data = Waveform(decoder.sample_rate, frame_count, peak_levels).to_bytes()
+    temporary_file_path = f"{cache_file_path}.tmp"
+    with open(temporary_file_path, "wb") as file:
+        file.write(data)
+    os.replace(temporary_file_path, cache_file_path)
+    return data
+
+
+class WaveformCache:
+    """
+    Cache of the waveforms of local audio files, generating the missing ones in a worker process
+    """
+
+    def __init__(self, cache_directory: FilePath, levels: Tuple[int, ...] = WAVEFORM_LEVELS):
+        self._cache_directory = convert_file_path_to_string(cache_directory)
+        self._levels = tuple(levels)
+        self._context = multiprocessing.get_context("spawn")
+        self._current_job = self._context.Value("q", 0, lock=False)
+        self._last_job_id = 0
+        self._executor = None
+        os.makedirs(self._cache_directory, exist_ok=True)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(" \
+               f"cache_directory={self._cache_directory!r}, " \
+               f"levels={self._levels!r})"
+
+    def get_cache_file_path(self, source: FilePath) -> str:
+        """
+        Method to get the path of the cache file of an audio file, keyed by its path, size and modification time
+        :param source: Path of the audio file
+        :return: str
+        """
+        source = os.path.abspath(convert_file_path_to_string(source))
+        stat_result = os.stat(source)
+        key = f"{source}\0{stat_result.st_size}\0{stat_result.st_mtime_ns}\0{self._levels}"
+        return os.path.join(self._cache_directory, hashlib.sha1(key.encode()).hexdigest() + _CACHE_FILE_EXTENSION)
+
+    def get_cached(self, source: FilePath) -> Optional[Waveform]:
+        """
+        Method to get the cached waveform of an audio file right away
+        :param source: Path of the audio file
+        :return: Optional[Waveform], `None` if it is not cached (or the audio file is missing)
+        """
+        try:
+            cache_file_path = self.get_cache_file_path(source)
+        except FileNotFoundError:
+            return None
+        return self._read_cache_file(source, cache_file_path)
+
+    @staticmethod
+    def _read_cache_file(source: FilePath, cache_file_path: str) -> Optional[Waveform]:
+        """
+        Static-method to read the cached waveform of an audio file
+        :param source: Path of the audio file
+        :param cache_file_path: Path of its cache file
+        :return: Optional[Waveform], `None` if it is not cached
+        """
+        try:
+            with open(cache_file_path, "rb") as file:
+                return Waveform.from_bytes(file.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as exception:
+            Logger.warning(f"WaveformCache: Unable to read the cached waveform of {str(source)!r}: {exception}")
+            return None
+
+    def request(self, source: FilePath, callback: Optional[Callable[[Waveform], None]] = None) -> Future:
+        """
+        Method to get the waveform of an audio file, from the cache or generated in the worker process.
+        Any generation still in progress is cancelled
+        :param source: Path of the audio file
+        :param callback: Called on the Kivy main thread with the waveform, unless the request is cancelled
+        :return: Future, resolved with the waveform or `None` if the request was cancelled or failed
+        """
+        future = Future()
+
+        def on_done(done_future: Future) -> None:
+            if done_future.result() is not None:
+                Clock.schedule_once(lambda dt: callback(done_future.result()))
+
+        if callback is not None:
+            future.add_done_callback(on_done)
+        self.cancel()
+        try:
+            cache_file_path = self.get_cache_file_path(source)
+        except OSError as exception:
+            Logger.warning(f"WaveformCache: Unable to generate the waveform of {str(source)!r}: {exception}")
+            future.set_result(None)
+            return future
+        waveform = self._read_cache_file(source, cache_file_path)
+        if waveform is not None:
+            future.set_result(waveform)
+            return future
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._context,
+                initializer=_initialize_worker,
+                initargs=(self._current_job,),
+            )
+        job_id = self._last_job_id
+        self._current_job.value = job_id
+        worker_future = self._executor.submit(
+            _generate_waveform,
+            convert_file_path_to_string(source),
+            job_id,
+            self._levels,
+            cache_file_path,
+        )
+
+        def on_generated(done_future: Future) -> None:
+            try:
+                data = done_future.result()
+                future.set_result(None if data is None else Waveform.from_bytes(data))
+            except Exception as exception:
+                Logger.warning(f"WaveformCache: Unable to generate the waveform of {str(source)!r}: {exception}")
+                future.set_result(None)
+
+        worker_future.add_done_callback(on_generated)
+        return future
+
+    def cancel(self) -> None:
+        """
+        Method to abort the generation in progress, if any
+        :return: None
+        """
+        self._last_job_id += 1
+        self._current_job.value = -1
+
+    def close(self) -> None:
+        """
+        Method to cancel the generation in progress and shut the worker process down
+        :return: None
+        """
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    @property
+    def cache_directory(self) -> str:
+        return self._cache_directory
+
+    @property
+    def levels(self) -> Tuple[int, ...]:
+        return self._levels
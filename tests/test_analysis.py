@@ -0,0 +1,83 @@
+import time
+import unittest
+from unittest import mock
+import numpy as np
+from src.utils.audio.decoding import PCM_SAMPLE_RATE
+from src.utils.audio.audioplayer.analysis import SILENCE_DB, AnalysisFrame, LatestValueSlot, AnalysisTap
+
+
+def sine_block(frequency, amplitude, frames=4096):
+    samples = amplitude * np.sin(2 * np.pi * frequency * np.arange(frames) / PCM_SAMPLE_RATE)
+    return np.repeat((samples * 32767).astype(np.int16)[:, np.newaxis], 2, axis=1).tobytes()
+
+
+class AnalysisTapTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tap = AnalysisTap(bands=16, rate=200)
+        self.frame = AnalysisFrame(self.tap.bands, self.tap.channels)
+
+    def tearDown(self):
+        self.tap.stop()
+
+    def test_sine_levels(self):
+        self.tap.push(sine_block(1000, 0.5))
+        self.tap._analyze()
+        self.assertTrue(self.tap.read(self.frame))
+        np.testing.assert_allclose(self.frame.rms, 0.5 / np.sqrt(2), atol=1e-3)
+        np.testing.assert_allclose(self.frame.peak, 0.5, atol=1e-3)
+        loudest_band = int(np.argmax(self.frame.bands))
+        self.assertAlmostEqual(self.frame.bands[loudest_band], 20 * np.log10(0.5), delta=1.5)
+        # The energy stays around the sine's band
+        self.assertLess(np.delete(self.frame.bands, range(loudest_band - 1, loudest_band + 2)).max(), -40)
+
+    def test_falls_back_to_silence_once(self):
+        self.tap.push(sine_block(1000, 0.5))
+        self.tap._analyze()
+        self.tap._analyze()
+        self.assertTrue(self.tap.read(self.frame))
+        np.testing.assert_array_equal(self.frame.bands, SILENCE_DB)
+        np.testing.assert_array_equal(self.frame.peak, 0)
+        self.tap._analyze()
+        self.assertFalse(self.tap.read(self.frame))
+
+    def test_blocks_are_dropped_when_the_analysis_falls_behind(self):
+        block = sine_block(1000, 0.5, frames=PCM_SAMPLE_RATE // 8)
+        for _ in range(5):
+            self.tap.push(block)
+        self.assertEqual(self.tap.dropped_blocks, 1)
+
+    def test_analysis_thread(self):
+        self.tap.start()
+        self.assertTrue(self.tap.running)
+        self.tap.push(sine_block(440, 0.25))
+        deadline = time.monotonic() + 2
+        while not self.frame.peak.any() and time.monotonic() < deadline:
+            self.tap.read(self.frame)
+            time.sleep(0.005)
+        np.testing.assert_allclose(self.frame.peak, 0.25, atol=1e-3)
+        self.tap.stop()
+        self.assertFalse(self.tap.running)
+
+    def test_attach(self):
+        sound = mock.Mock(spec=("add_tap", "remove_tap"))
+        self.tap.attach(sound)
+        sound.add_tap.assert_called_once_with(self.tap)
+        self.tap.attach(mock.Mock(spec=()))
+        sound.remove_tap.assert_called_once_with(self.tap)
+
+
+class LatestValueSlotTestCase(unittest.TestCase):
+    def test_only_newer_frames_are_read(self):
+        slot = LatestValueSlot(4, 2)
+        written, frame = AnalysisFrame(4, 2), AnalysisFrame(4, 2)
+        self.assertTrue(slot.read(frame))
+        self.assertFalse(slot.read(frame))
+        written.peak[:] = 0.5
+        slot.write(written)
+        self.assertTrue(slot.read(frame))
+        np.testing.assert_array_equal(frame.peak, 0.5)
+        self.assertEqual(frame.sequence, slot.sequence)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import asyncio
+import unittest
+from src.utils.audio.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.asyncio_support import AsyncAudioPlayer
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+
+
+class AsyncAudioPlayerTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        # Loading takes long enough for `play` to find the prefetch still running
+        self.sources = virtual_sources(3, length=1, load_delay=0.05)
+        self.player = AudioPlayer(self.sources)
+        self.async_player = AsyncAudioPlayer(self.player)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def test_play_after_prefetch(self):
+        async def play():
+            await self.async_player.prefetch()
+            self.assertEqual(self.player.get_prefetch_futures(), [])
+            return await self.async_player.play(timeout=1)
+
+        self.assertEqual(asyncio.run(play()).source, self.sources[0])
+        self.assertIsNotNone(self.async_player.sound)
+
+    def test_play_waits_for_a_pending_prefetch(self):
+        async def play():
+            # Adopted by the Kivy clock in an app, which is not ticking here
+            asyncio.get_running_loop().call_soon(self.player.wait_prefetches)
+            return await self.async_player.play(timeout=1)
+
+        self.assertEqual(asyncio.run(play()).source, self.sources[0])
+        self.assertEqual(self.player.state, "play")
+
+
+if __name__ == '__main__':
+    unittest.main()
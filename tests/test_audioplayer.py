@@ -0,0 +1,444 @@
+import time
+import asyncio
+import itertools
+import unittest
+from unittest import mock
+from kivy.clock import Clock
+from src.utils.audio.audioplayer import AudioPlayer, audioplayer
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound
+
+
+def tick_until(predicate, timeout=2.0):
+    # Gapless & crossfade switches run on the Kivy clock, virtual audio files only end when their clock is advanced
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.005)
+        Clock.tick()
+    return predicate()
+
+
+class AudioPlayerTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(2, length=1)
+        self.player = AudioPlayer(self.sources)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def play_to_the_end(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        for _ in self.sources:
+            VirtualSound.clock.advance_to_end()
+            self.player.wait_prefetches()
+
+    def test_natural_track_ends_advance_the_queue(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        VirtualSound.clock.advance_to_end()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.state, "play")
+        self.assertEqual(self.player.current_entry.source, self.sources[1])
+        self.assertEqual(len(self.player.telemetry.get_histogram("gap")), 1)
+
+    def test_end_of_queue(self):
+        self.play_to_the_end()
+        self.assertEqual(self.player.state, "queue loaded")
+        self.assertIsNone(self.player.current_entry)
+
+    def test_play_after_the_end_of_queue(self):
+        self.play_to_the_end()
+        self.player.play()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.state, "play")
+        self.assertEqual(self.player.current_entry.source, self.sources[0])
+        # Starting over is not a gap after the last audio file
+        self.assertEqual(len(self.player.telemetry.get_histogram("gap")), 1)
+
+
+class AudioPlayerPrefetchTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(3, length=1, load_delay=0.3)
+        self.player = AudioPlayer(self.sources, prefetch=0)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def get_underruns(self):
+        return self.player.stats()["counters"]["underruns"]
+
+    def test_properties_never_wait_for_prefetches(self):
+        self.player.play()
+        start_time = time.perf_counter()
+        self.assertEqual(self.player.source, self.sources[0])
+        self.assertIsNone(self.player.length)
+        self.assertEqual(self.player.get_pos(), 0)
+        self.player.seek(0.5)
+        self.assertEqual(self.player.get_pos(), 0.5)
+        self.assertLess(time.perf_counter() - start_time, 0.1)
+        self.assertTrue(self.player.play_pending)
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.state, "play")
+        self.assertEqual(self.player.length, 1)
+        self.assertEqual(self.player.get_pos(), 0.5)
+
+    def test_skipping_never_waits_for_prefetches(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        self.player.skip_to_next()
+        self.player.skip_to_next()
+        start_time = time.perf_counter()
+        self.assertEqual(self.player.source, self.sources[2])
+        self.assertIsNone(self.player.length)
+        self.assertLess(time.perf_counter() - start_time, 0.1)
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.current_entry.source, self.sources[2])
+        self.assertEqual(self.player.state, "play")
+
+    def test_underruns_are_counted_once_per_entry(self):
+        self.player.play()
+        self.player.play()
+        for _ in range(3):
+            self.assertIsNone(self.player.length)
+            self.player.get_pos()
+        self.assertEqual(self.get_underruns(), 1)
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.length, 1)
+        self.assertEqual(self.get_underruns(), 1)
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.assertEqual(self.get_underruns(), 2)
+
+    def test_failed_loads_are_not_retried(self):
+        player = AudioPlayer(["missing.unknown-extension"])
+        player.wait_prefetches()
+        player.play()
+        player.play()
+        self.assertNotEqual(player.state, "play")
+        self.assertTrue(player.current_entry.load_failed)
+        self.assertIsNone(player.length)
+        self.assertIsNone(player.length)
+        self.assertEqual(player.get_pos(), 0)
+        counters = player.stats()["counters"]
+        self.assertEqual((counters["underruns"], counters["errors"]), (0, 1))
+        player.unload()
+
+
+class AudioPlayerGaplessTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(2, length=1)
+        self.player = AudioPlayer(self.sources, gapless=True, preroll=0.1)
+        self.ended = []
+        self.player.bind(on_track_ended=lambda dispatcher, queue_entry: self.ended.append(queue_entry.source))
+
+    def tearDown(self):
+        self.player.unload()
+
+    def test_next_audio_file_starts_on_a_timer(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        first_sound = self.player.current_entry.sound
+        # Right before the end, which is never reached as the virtual clock stays there
+        VirtualSound.clock.advance(0.95)
+        self.player.seek(0.95)
+        self.assertTrue(tick_until(lambda: self.player.current_entry.source == self.sources[1]))
+        self.assertEqual(first_sound.state, "stop")
+        self.assertEqual(self.player.current_entry.sound.state, "play")
+        self.assertEqual(self.ended, [self.sources[0]])
+        self.assertEqual(len(self.player.transition_latencies), 1)
+        self.assertLess(self.player.last_transition_latency, 0.5)
+
+    def test_pausing_cancels_the_switch(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        VirtualSound.clock.advance(0.95)
+        self.player.seek(0.95)
+        self.player.stop()
+        self.assertFalse(tick_until(lambda: self.player.current_entry.source == self.sources[1], timeout=0.3))
+        self.assertEqual(self.ended, [])
+
+    def test_natural_end_still_advances_without_a_switch(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        VirtualSound.clock.advance_to_end()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.current_entry.source, self.sources[1])
+        self.assertEqual(self.ended, [self.sources[0]])
+        self.assertEqual(self.player.transition_latencies, ())
+
+
+class AudioPlayerCrossfadeTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(2, length=1)
+        self.player = AudioPlayer(self.sources, crossfade=0.3, preroll=0.1, volume=0.5)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def start_crossfade(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        previous_sound = self.player.current_entry.sound
+        VirtualSound.clock.advance(0.65)
+        self.player.seek(0.65)
+        self.assertTrue(tick_until(lambda: self.player.current_entry.source == self.sources[1]))
+        return previous_sound, self.player.current_entry.sound
+
+    def test_equal_power_fade(self):
+        previous_sound, next_sound = self.start_crossfade()
+        self.assertEqual(previous_sound.state, "play")
+        self.assertEqual(next_sound.state, "play")
+        while previous_sound.state == "play":
+            # Equal power: the volumes follow a quarter of a circle of the player's volume
+            self.assertAlmostEqual(previous_sound.volume ** 2 + next_sound.volume ** 2, 0.25, places=3)
+            tick_until(lambda: False, timeout=0.02)
+        self.assertEqual(next_sound.volume, 0.5)
+        self.assertEqual(len(self.player.transition_latencies), 1)
+
+    def test_pausing_finishes_the_fade(self):
+        previous_sound, next_sound = self.start_crossfade()
+        self.player.stop()
+        self.assertEqual(previous_sound.state, "stop")
+        self.assertEqual(next_sound.state, "stop")
+        self.assertEqual(next_sound.volume, 0.5)
+
+
+class AudioPlayerPositionEstimateTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.now = 100.0
+        # Only the player's clock is frozen, Kivy's and the prefetch worker's keep running
+        patcher = mock.patch.object(audioplayer, "time", mock.Mock(wraps=time, monotonic=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.player = AudioPlayer(virtual_sources(2, length=60), interval=0.01)
+        self.player.play()
+        self.player.wait_prefetches()
+
+    def tearDown(self):
+        self.player.unload()
+
+    def test_computed_from_the_monotonic_clock(self):
+        self.now += 2.5
+        self.assertEqual(self.player.pos_estimate, 2.5)
+        self.player.seek(10)
+        self.now += 1
+        self.assertEqual(self.player.pos_estimate, 11)
+        self.player.stop()
+        self.now += 5
+        self.assertEqual(self.player.pos_estimate, 11)
+        self.player.play()
+        self.now += 1
+        self.assertEqual(self.player.pos_estimate, 12)
+        self.assertEqual(self.player.human_readable_pos_estimate, "0:12")
+
+    def test_skipping_restarts_it(self):
+        self.now += 5
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.pos_estimate, 0)
+
+    def test_notifier_only_runs_while_bound_and_playing(self):
+        positions = []
+        callback = lambda player, pos_estimate: positions.append(pos_estimate)
+        self.player.bind_pos_estimate(callback)
+        self.now += 3
+        self.assertTrue(tick_until(lambda: positions))
+        self.assertEqual(positions[-1], 3)
+        self.player.stop()
+        del positions[:]
+        self.assertFalse(tick_until(lambda: positions, timeout=0.1))
+        self.player.play()
+        self.assertTrue(tick_until(lambda: positions))
+        self.player.unbind_pos_estimate(callback)
+        del positions[:]
+        self.assertFalse(tick_until(lambda: positions, timeout=0.1))
+
+
+class AudioPlayerRadioTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.pulled = []
+        self.player = AudioPlayer(radio=self.station(), radio_lookahead=2, radio_history=3)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def station(self):
+        for index in itertools.count():
+            self.pulled.append(index)
+            yield virtual_sources(index + 1, length=1)[index]
+
+    def test_sources_are_pulled_lazily(self):
+        self.assertEqual(self.pulled, [0, 1])
+        self.assertTrue(self.player.radio)
+        self.player.play()
+        self.player.wait_prefetches()
+        self.assertEqual(self.pulled, [0, 1, 2])
+        self.assertEqual(len(self.player), 2)
+
+    def test_history_is_capped(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        for _ in range(10):
+            VirtualSound.clock.advance_to_end()
+            self.player.wait_prefetches()
+        self.assertEqual(self.player.source, virtual_sources(11, length=1)[10])
+        self.assertEqual(self.player._queue.history_length, 3)
+        self.assertEqual(len(self.pulled), 13)
+
+    def test_finite_station_ends(self):
+        self.player.start_radio(virtual_sources(2, length=1), lookahead=1)
+        self.player.clear_queue()
+        self.player.play()
+        self.player.wait_prefetches()
+        for _ in range(2):
+            VirtualSound.clock.advance_to_end()
+            self.player.wait_prefetches()
+        self.assertFalse(self.player.radio)
+        self.assertIsNone(self.player.current_entry)
+
+    def test_stop_radio_keeps_the_pulled_sources(self):
+        self.player.stop_radio()
+        self.player.play()
+        self.assertFalse(self.player.radio)
+        self.assertEqual(self.pulled, [0, 1])
+        self.assertEqual(len(self.player), 1)
+
+    def test_async_station_resumes_playback(self):
+        sources = virtual_sources(2, length=1)
+
+        async def station():
+            for source in sources:
+                await asyncio.sleep(0.05)
+                yield source
+
+        async def listen():
+            player = AudioPlayer()
+            player.start_radio(station(), lookahead=1)
+            while not len(player):
+                await asyncio.sleep(0.01)
+            player.play()
+            player.wait_prefetches()
+            VirtualSound.clock.advance_to_end()
+            # Waiting for the station instead of ending the queue
+            self.assertNotEqual(player.state, "queue loaded")
+            while player.source != sources[1]:
+                await asyncio.sleep(0.01)
+            player.wait_prefetches()
+            self.assertEqual(player.state, "play")
+            player.unload()
+
+        asyncio.run(asyncio.wait_for(listen(), 5))
+
+    def test_async_station_needs_an_event_loop(self):
+        async def station():
+            yield virtual_sources(1)[0]
+
+        with self.assertRaises(RuntimeError):
+            self.player.start_radio(station())
+
+
+class AudioPlayerVolumeTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(2, length=1)
+        self.gain_function = mock.Mock(side_effect=lambda source: -6 if source == self.sources[1] else None)
+        self.player = AudioPlayer(self.sources, volume=0.5, gain_function=self.gain_function)
+        self.player.play()
+        self.player.wait_prefetches()
+        self.sound = self.player.current_entry.sound
+
+    def tearDown(self):
+        self.player.unload()
+
+    def test_volume_changes_are_coalesced(self):
+        volumes = []
+        self.sound.bind(volume=lambda sound_obj, volume: volumes.append(volume))
+        for volume in (0.1, 0.2, 0.3):
+            self.player.volume = volume
+        self.assertEqual(volumes, [])
+        self.assertTrue(tick_until(lambda: volumes, timeout=0.5))
+        self.assertEqual(volumes, [0.3])
+
+    def test_gain_offsets(self):
+        self.assertEqual(self.sound.volume, 0.5)
+        next_sound = self.player._queue.peek().sound
+        next_volume = next_sound.volume
+        self.player.volume = 0.8
+        tick_until(lambda: self.sound.volume == 0.8, timeout=0.5)
+        # Sound objects which are not playing are only updated when they start
+        self.assertEqual(next_sound.volume, next_volume)
+        self.player.skip_to_next()
+        self.assertAlmostEqual(next_sound.volume, 0.8 * 10 ** (-6 / 20))
+        self.player.skip_to_previous()
+        self.assertEqual(self.gain_function.call_count, 2)
+
+    def test_set_gain(self):
+        self.player.set_gain(self.sources[0], 20)
+        self.assertTrue(tick_until(lambda: self.sound.volume == 1, timeout=0.5))
+        self.player.set_gain(self.sources[0], None)
+        self.assertTrue(tick_until(lambda: self.sound.volume == 0.5, timeout=0.5))
+        self.assertEqual(self.gain_function.call_count, 2)
+
+    def test_invalid_volume(self):
+        with self.assertRaises(ValueError):
+            self.player.volume = 1.5
+        with self.assertRaises(TypeError):
+            self.player.volume = "1"
+        self.assertEqual(self.player.volume, 0.5)
+
+
+class AudioPlayerTrimTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(3, length=1)
+        trim_points = {self.sources[0]: (0.2, 0.7), self.sources[1]: (0.3, 0.9), self.sources[2]: (0.5, 0.5)}
+        self.player = AudioPlayer(self.sources, preroll=0.1, trim_function=trim_points.get)
+        self.player.play()
+        self.player.wait_prefetches()
+
+    def tearDown(self):
+        self.player.unload()
+
+    def test_audio_files_start_at_their_first_audible_frame(self):
+        self.assertEqual(self.player.get_pos(), 0.2)
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.get_pos(), 0.3)
+
+    def test_trailing_silence_is_skipped(self):
+        first_sound = self.player.current_entry.sound
+        VirtualSound.clock.advance(0.45)
+        self.player.seek(0.65)
+        self.assertTrue(tick_until(lambda: self.player.source == self.sources[1]))
+        self.assertEqual(first_sound.state, "stop")
+        self.assertEqual(self.player.get_pos(), 0.3)
+        self.assertEqual(len(self.player.transition_latencies), 1)
+
+    def test_invalid_trim_points_are_ignored(self):
+        self.player.skip_to_next()
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.get_pos(), 0)
+        self.assertEqual(self.player.current_entry.trim, ())
+
+    def test_last_audio_file_plays_to_its_end(self):
+        player = AudioPlayer(self.sources[:1], preroll=0.1, trim_function=self.player.trim_function)
+        player.play()
+        player.wait_prefetches()
+        VirtualSound.clock.advance(0.6)
+        self.assertEqual(player.get_pos(), 0.8)
+        self.assertFalse(tick_until(lambda: player.current_entry is None, timeout=0.2))
+        VirtualSound.clock.advance_to_end()
+        self.assertIsNone(player.current_entry)
+        player.unload()
+
+
+if __name__ == '__main__':
+    unittest.main()
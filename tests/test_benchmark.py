@@ -0,0 +1,21 @@
+import unittest
+from src.utils.audio.audioplayer.benchmark import _summarize
+
+
+class SummarizeTestCase(unittest.TestCase):
+    def test_p95_is_the_nearest_rank(self):
+        self.assertEqual(_summarize([0.001])["p95_ms"], 1)
+        self.assertEqual(_summarize([0.002, 0.001])["p95_ms"], 2)
+        self.assertEqual(_summarize([index / 1000 for index in range(1, 21)])["p95_ms"], 19)
+        self.assertEqual(_summarize([index / 1000 for index in range(1, 101)])["p95_ms"], 95)
+
+    def test_summary(self):
+        summary = _summarize([0.003, 0.001, 0.002])
+        self.assertEqual(summary["count"], 3)
+        self.assertAlmostEqual(summary["mean_ms"], 2)
+        self.assertAlmostEqual(summary["median_ms"], 2)
+        self.assertAlmostEqual(summary["max_ms"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
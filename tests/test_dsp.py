@@ -0,0 +1,78 @@
+import itertools
+import unittest
+import numpy as np
+from src.utils.audio.audioplayer.dsp import Biquad, ParametricEQ, ReplayGain, SoftLimiter
+
+BANDS = (
+    ("lowshelf", 60, 6),
+    ("highpass", 20),
+    ("peaking", 3000, -2, 1.4),
+)
+# Odd sizes on both sides of the chunk length, so the state is carried across blocks and chunks
+BLOCK_SIZES = (1, 3, 100, 255, 256, 257, 1000, 4096)
+
+
+def reference_recursion(section, samples):
+    b0, b1, b2, a1, a2 = section.coefficients
+    output = np.empty(samples.shape)
+    for channel in range(samples.shape[1]):
+        x1 = x2 = y1 = y2 = 0.0
+        for index, x in enumerate(samples[:, channel].astype(np.float64)):
+            y = b0 * x + b1 * x1 + b2 * x2 - a1 * y1 - a2 * y2
+            output[index, channel] = y
+            x1, x2, y1, y2 = x, x1, y, y1
+    return output
+
+
+def process_in_blocks(stage, samples):
+    blocks, position = [], 0
+    for size in itertools.cycle(BLOCK_SIZES):
+        if position >= len(samples):
+            return np.concatenate(blocks)
+        blocks.append(stage.process(samples[position:position + size].copy()))
+        position += size
+
+
+class BiquadTestCase(unittest.TestCase):
+    def setUp(self):
+        # One second of stereo noise, long enough for float32 round-off to build up at low frequencies
+        self.samples = np.random.default_rng(0).uniform(-0.5, 0.5, (44100, 2)).astype(np.float32)
+
+    def test_sections_match_the_reference_recursion(self):
+        for band in BANDS:
+            with self.subTest(band=band):
+                section = Biquad(*band)
+                output = process_in_blocks(section, self.samples)
+                self.assertEqual(output.dtype, np.float32)
+                np.testing.assert_allclose(output, reference_recursion(section, self.samples), rtol=0, atol=1e-6)
+
+    def test_equalizer_matches_the_reference_recursion(self):
+        equalizer = ParametricEQ(BANDS)
+        output = process_in_blocks(equalizer, self.samples)
+        expected = self.samples
+        for section in equalizer.sections:
+            expected = reference_recursion(section, expected).astype(np.float32)
+        np.testing.assert_allclose(output, expected, rtol=0, atol=1e-6)
+
+    def test_reset_clears_the_state(self):
+        section = Biquad(*BANDS[0])
+        first = section.process(self.samples[:1000].copy())
+        section.reset()
+        np.testing.assert_array_equal(section.process(self.samples[:1000].copy()), first)
+
+
+class GainStagesTestCase(unittest.TestCase):
+    def test_replay_gain_prevents_clipping(self):
+        self.assertAlmostEqual(ReplayGain(-6).scale, 10 ** (-6 / 20))
+        self.assertAlmostEqual(ReplayGain(6, peak=0.9).scale, 1 / 0.9)
+
+    def test_soft_limiter_stays_in_range(self):
+        block = np.linspace(-4, 4, 1001, dtype=np.float32).reshape(-1, 1)
+        output = SoftLimiter().process(block.copy())
+        self.assertLessEqual(np.abs(output).max(), 1)
+        below = np.abs(block) < 10 ** (-1 / 20)
+        np.testing.assert_array_equal(output[below], block[below])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from src.utils.audio.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound
+
+EVENTS = (
+    "on_track_started",
+    "on_resumed",
+    "on_track_ended",
+    "on_paused",
+    "on_seeked",
+)
+
+
+class PlayerEventDispatcherTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(2, length=1)
+        self.player = AudioPlayer(self.sources)
+        self.events = []
+        for event in EVENTS:
+            self.player.bind(**{event: lambda dispatcher, queue_entry, *args, event=event: self.events.append(
+                (event, queue_entry.source, *args)
+            )})
+        self.player.bind(on_queue_changed=lambda dispatcher: self.events.append(("on_queue_changed",)))
+
+    def tearDown(self):
+        self.player.unload()
+
+    def play(self):
+        self.player.play()
+        self.player.wait_prefetches()
+
+    def test_pause_and_resume(self):
+        self.play()
+        self.player.stop()
+        self.player.play()
+        self.assertEqual(self.events, [
+            ("on_track_started", self.sources[0]),
+            ("on_paused", self.sources[0]),
+            ("on_resumed", self.sources[0]),
+        ])
+
+    def test_natural_track_end(self):
+        self.play()
+        VirtualSound.clock.advance_to_end()
+        self.player.wait_prefetches()
+        self.assertEqual(self.events, [
+            ("on_track_started", self.sources[0]),
+            ("on_track_ended", self.sources[0]),
+            ("on_track_started", self.sources[1]),
+        ])
+
+    def test_skipping_is_not_a_track_end(self):
+        self.play()
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.player.skip_to_previous()
+        self.player.wait_prefetches()
+        self.assertEqual(self.events, [
+            ("on_track_started", self.sources[0]),
+            ("on_track_started", self.sources[1]),
+            ("on_track_started", self.sources[0]),
+        ])
+
+    def test_seek_and_queue_changes(self):
+        self.play()
+        self.player.seek(0.5)
+        self.player.load(*self.sources)
+        self.assertEqual(self.events, [
+            ("on_track_started", self.sources[0]),
+            ("on_seeked", self.sources[0], 0.5),
+            ("on_queue_changed",),
+        ])
+
+    def test_only_the_active_sound_object_is_followed(self):
+        self.play()
+        first_sound = self.player.current_entry.sound
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.assertIs(self.player.events.active_sound, self.player.current_entry.sound)
+        del self.events[:]
+        # A stray stop of the previous sound object is not taken as the end of the current one
+        first_sound.play()
+        first_sound.stop()
+        self.assertEqual(self.events, [])
+        self.assertEqual(self.player.source, self.sources[1])
+
+    def test_unbind(self):
+        ended = []
+        callback = lambda dispatcher, queue_entry: ended.append(queue_entry)
+        self.player.bind(on_track_ended=callback)
+        self.player.unbind(on_track_ended=callback)
+        self.play()
+        VirtualSound.clock.advance_to_end()
+        self.assertEqual(ended, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
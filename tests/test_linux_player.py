@@ -0,0 +1,164 @@
+import os
+import math
+import time
+import wave
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from kivy.clock import Clock
+from src.utils.audio import decoding
+from src.utils.audio.audioplayer import _linux_player_integration
+from src.utils.audio.audioplayer.sinks import AudioSink, NullSink
+from src.utils.audio.audioplayer._linux_player_integration import LinuxSoundPlayer
+
+LENGTH = 0.5
+LATENCY = 0.1
+
+
+class FakeDecoder:
+    def __init__(self, source, start=0, frames_per_read=None, read_delay=0):
+        self.source = source
+        self._data = bytes(int((LENGTH - start) * decoding.PCM_SAMPLE_RATE) * decoding.PCM_FRAME_SIZE)
+        self._frames_per_read = frames_per_read
+        self._read_delay = read_delay
+
+    def read(self, frames):
+        time.sleep(self._read_delay)
+        size = min(frames, self._frames_per_read or frames) * decoding.PCM_FRAME_SIZE
+        data, self._data = self._data[:size], self._data[size:]
+        return data
+
+    def close(self):
+        pass
+
+
+class FakeDeviceSink(AudioSink):
+    """
+    Sink consuming the frames right away, which are only played `LATENCY` seconds later (or once released)
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.finished = False
+        self.closed = False
+        self.release = threading.Event()
+
+    def write(self, data):
+        pass
+
+    def finish(self):
+        self.finished = True
+
+    def close(self):
+        self.closed = True
+
+    @property
+    def latency(self):
+        return 0.0 if self.release.is_set() else LATENCY
+
+    @property
+    def drained(self):
+        return self.release.is_set()
+
+
+class LinuxSoundPlayerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sinks = []
+        patchers = (
+            mock.patch.object(_linux_player_integration, "probe_duration", return_value=LENGTH),
+            mock.patch.object(_linux_player_integration, "PCMDecoder", FakeDecoder),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sound = LinuxSoundPlayer(source="/music/track.mp3")
+        self.sound.sink_factory = self.create_sink
+        self.sound.drain_timeout = 5
+
+    def tearDown(self):
+        self.sound.unload()
+
+    def create_sink(self):
+        self.sinks.append(FakeDeviceSink())
+        return self.sinks[-1]
+
+    def wait_for(self, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+            Clock.tick()
+        return predicate()
+
+    def test_position_subtracts_the_sink_latency(self):
+        self.sound.play()
+        self.assertTrue(self.wait_for(lambda: self.sinks[0].finished))
+        self.assertAlmostEqual(self.sound.get_pos(), LENGTH - LATENCY, places=3)
+        self.sinks[0].release.set()
+        self.assertTrue(self.wait_for(lambda: self.sound.state == "stop"))
+        self.assertEqual(self.sound.get_pos(), 0)
+
+    def test_natural_end_waits_for_the_sink_to_drain(self):
+        self.sound.play()
+        self.assertTrue(self.wait_for(lambda: self.sinks[0].finished))
+        self.assertFalse(self.wait_for(lambda: self.sound.state == "stop", timeout=0.2))
+        self.assertFalse(self.sinks[0].closed)
+        self.sinks[0].release.set()
+        self.assertTrue(self.wait_for(lambda: self.sound.state == "stop"))
+        self.assertTrue(self.sinks[0].closed)
+
+    def test_stop_and_seek_drop_the_sink_right_away(self):
+        self.sound.sink_factory = lambda: self.create_sink() and NullSink()
+        with mock.patch.object(_linux_player_integration, "PCMDecoder", self.slow_decoder):
+            self.sound.play()
+            self.sound.seek(0.25)
+            self.assertEqual(len(self.sinks), 2)
+            self.sound.stop()
+        self.assertEqual(self.sound.state, "stop")
+        self.assertAlmostEqual(self.sound.get_pos(), 0.25, delta=0.05)
+
+    @staticmethod
+    def slow_decoder(source, start=0):
+        return FakeDecoder(source, start, frames_per_read=1024, read_delay=0.05)
+
+    def test_underruns_are_counted_once_per_starvation(self):
+        self.sound.sink_factory = lambda: NullSink(realtime=False)
+        self.sound.prebuffer_duration = 0
+        with mock.patch.object(_linux_player_integration, "PCMDecoder", self.slow_decoder):
+            self.sound.play()
+            self.assertTrue(self.wait_for(lambda: self.sound.state == "stop", timeout=10))
+        # Every read is slower than the output, which starves once before each of them (the last one finds the end)
+        reads = math.ceil(LENGTH * decoding.PCM_SAMPLE_RATE / 1024) + 1
+        self.assertGreater(self.sound._underruns, 1)
+        self.assertLessEqual(self.sound._underruns, reads)
+
+    def test_loop(self):
+        self.sound.sink_factory = lambda: NullSink(realtime=False)
+        self.sound.loop = True
+        self.sound.play()
+        self.assertFalse(self.wait_for(lambda: self.sound.state == "stop", timeout=0.3))
+        self.assertEqual(self.sound.state, "play")
+
+
+@unittest.skipUnless(shutil.which("ffmpeg"), "ffmpeg is not installed")
+class PCMDecoderTestCase(unittest.TestCase):
+    def test_reads_until_the_end_of_the_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "silence.wav")
+            with wave.open(file_path, "wb") as wave_file:
+                wave_file.setnchannels(1)
+                wave_file.setsampwidth(2)
+                wave_file.setframerate(8000)
+                wave_file.writeframes(bytes(8000 * 2))
+            with decoding.PCMDecoder(file_path) as decoder:
+                frames = 0
+                while data := decoder.read(4096):
+                    self.assertEqual(len(data) % decoder.frame_size, 0)
+                    frames += len(data) // decoder.frame_size
+                self.assertEqual(decoder.read(4096), b"")
+            self.assertAlmostEqual(frames, decoding.PCM_SAMPLE_RATE, delta=decoding.PCM_SAMPLE_RATE // 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
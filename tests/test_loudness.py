@@ -0,0 +1,111 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.utils.audio import loudness
+from src.utils.audio.loudness import REPLAYGAIN_REFERENCE_LOUDNESS, measure_loudness, LoudnessScanner
+
+
+class FakeDecoder:
+    """
+    Decoder of fake audio files holding the level in dBFS of a 1 kHz stereo sine, three seconds long
+    """
+    channels = 2
+
+    def __init__(self, source, sample_rate):
+        with open(source) as file:
+            level = file.read()
+        if level == "corrupted":
+            raise ValueError(f"unable to decode {source!r}")
+        frames = np.arange(3 * sample_rate)
+        samples = 10 ** (float(level) / 20) * np.sin(2 * np.pi * 1000 * frames / sample_rate)
+        self._data = np.repeat(np.round(samples * 32767).astype(np.int16)[:, np.newaxis], 2, axis=1).tobytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def read(self, frames):
+        data, self._data = self._data[:frames * 4], self._data[frames * 4:]
+        return data
+
+
+class LoudnessTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        patchers = (
+            mock.patch.object(loudness, "PCMDecoder", FakeDecoder),
+            # Measured on threads, so the workers see the fake decoder
+            mock.patch.object(
+                loudness, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+            ),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_audio_file(self, name, level):
+        file_path = os.path.join(self.directory.name, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as file:
+            file.write(str(level))
+        return file_path
+
+    def test_reference_sine(self):
+        # EBU Tech 3341 case 1: a -23 dBFS 1 kHz stereo sine measures -23 LUFS
+        result = measure_loudness(self.write_audio_file("sine.wav", -23))
+        self.assertAlmostEqual(result["loudness"], -23, delta=0.1)
+        self.assertAlmostEqual(result["peak"], 10 ** (-23 / 20), places=3)
+
+    def test_silence(self):
+        self.assertIsNone(measure_loudness(self.write_audio_file("silence.wav", -200))["loudness"])
+
+    def test_scan(self):
+        quiet = self.write_audio_file("album/quiet.flac", -40)
+        loud = self.write_audio_file("album/loud.flac", -20)
+        self.write_audio_file("album/corrupted.mp3", "corrupted")
+        self.write_audio_file("album/cover.jpg", -20)
+        progress = []
+        scanner = LoudnessScanner(self.directory.name, workers=2)
+        stats = scanner.scan(lambda measured, pending: progress.append((measured, pending)))
+        self.assertEqual((stats["measured"], stats["errors"], stats["tracks"], stats["albums"]), (2, 1, 2, 1))
+        self.assertEqual(progress[-1], (2, 3))
+        self.assertAlmostEqual(scanner.get_track_gain(quiet), REPLAYGAIN_REFERENCE_LOUDNESS + 40, delta=0.1)
+        self.assertAlmostEqual(scanner.get_track_gain(loud), REPLAYGAIN_REFERENCE_LOUDNESS + 20, delta=0.1)
+        # The quiet track is gated out of the album loudness, more than 10 LU below the loud one
+        self.assertAlmostEqual(scanner.get_album_gain(quiet), scanner.get_track_gain(loud), delta=0.1)
+        self.assertIsNone(scanner.get_track_gain(os.path.join(self.directory.name, "missing.mp3")))
+
+    def test_scans_resume_from_the_cache(self):
+        self.write_audio_file("a.mp3", -20)
+        self.assertEqual(LoudnessScanner(self.directory.name).scan()["measured"], 1)
+        modified = self.write_audio_file("b.mp3", -25)
+        scanner = LoudnessScanner(self.directory.name)
+        self.assertEqual(scanner.scan()["measured"], 1)
+        self.assertEqual(scanner.scan()["measured"], 0)
+        with open(modified, "w") as file:
+            file.write("-26.0")
+        os.remove(os.path.join(self.directory.name, "a.mp3"))
+        scanner = LoudnessScanner(self.directory.name)
+        stats = scanner.scan()
+        self.assertEqual((stats["measured"], stats["tracks"]), (1, 1))
+        self.assertAlmostEqual(scanner.get_track_gain(modified), REPLAYGAIN_REFERENCE_LOUDNESS + 26, delta=0.1)
+
+    def test_interrupted_cache_lines_are_skipped(self):
+        self.write_audio_file("a.mp3", -20)
+        scanner = LoudnessScanner(self.directory.name)
+        scanner.scan()
+        with open(scanner.cache_file_path, "a") as file:
+            file.write('{"path":"b.mp')
+        self.assertIsNotNone(LoudnessScanner(self.directory.name).get_result(os.path.join(self.directory.name, "a.mp3")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from src.utils.audio.playlist import Playlist
+
+
+class PlaylistSetOperationsTestCase(unittest.TestCase):
+    def setUp(self):
+        self.playlist = Playlist(f"{self.id()}-base", "/a", "/b", "/c", "/a")
+
+    def test_union_keeps_order_and_skips_duplicates(self):
+        union = self.playlist.union(["/c", "/d"], ["/./d", "/e"], name=f"{self.id()}-union")
+        self.assertEqual(list(union), ["/a", "/b", "/c", "/d", "/e"])
+
+    def test_union_accepts_generators(self):
+        union = self.playlist.union((song for song in ["/c", "/d"]), name=f"{self.id()}-union")
+        self.assertEqual(list(union), ["/a", "/b", "/c", "/d"])
+
+    def test_union_type_checks_others(self):
+        with self.assertRaises(TypeError):
+            self.playlist.union(["/d", 1], name=f"{self.id()}-union")
+
+    def test_intersection(self):
+        intersection = self.playlist.intersection(
+            ["/c", "/a", "/d"], (song for song in ["/a", "/c"]), name=f"{self.id()}-intersection"
+        )
+        self.assertEqual(list(intersection), ["/a", "/c"])
+
+    def test_intersection_builds_each_key_once(self):
+        calls = []
+
+        def key(song):
+            calls.append(song)
+            return song
+
+        self.playlist.intersection(["/a"], ["/a", "/b"], name=f"{self.id()}-intersection", key=key)
+        # 4 songs of the playlist, then 1 + 2 songs of the others
+        self.assertEqual(len(calls), 7)
+
+    def test_difference(self):
+        difference = self.playlist.difference(["/b"], ["/c"], name=f"{self.id()}-difference")
+        self.assertEqual(list(difference), ["/a"])
+
+    def test_set_operations_keep_the_class(self):
+        class CustomPlaylist(Playlist):
+            __slots__ = ()
+
+        playlist = CustomPlaylist(f"{self.id()}-custom", "/a", "/b")
+        self.assertIs(type(playlist.union(["/c"], name=f"{self.id()}-union")), CustomPlaylist)
+        self.assertIs(type(playlist.intersection(["/a"], name=f"{self.id()}-intersection")), CustomPlaylist)
+        self.assertIs(type(playlist.difference(["/a"], name=f"{self.id()}-difference")), CustomPlaylist)
+
+    def test_dedupe(self):
+        self.playlist.dedupe()
+        self.assertEqual(list(self.playlist), ["/a", "/b", "/c"])
+
+
+class PlaylistSortedModeTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tags = {
+            "/a": {"artist": "The Beatles", "title": "Track 10"},
+            "/b": {"artist": "ABBA", "title": "Track 2"},
+            "/c": {"artist": "Coldplay", "title": "Track 1"},
+            "/d": {"artist": "Blur", "title": "Track 3"},
+        }
+        patcher = mock.patch("src.utils.audio.playlist.AudioMetadata", self.read_metadata)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(Playlist.invalidate_collation_keys)
+        Playlist.invalidate_collation_keys()
+        self.playlist = Playlist(f"{self.id()}-sorted", "/a", "/b", "/c")
+        self.playlist.sort_by("artist")
+
+    def read_metadata(self, source, silent=False):
+        tags = self.tags.get(source, {})
+        return SimpleNamespace(**{column: tags.get(column) for column in ("artist", "album", "title", "genre", "date")})
+
+    def test_sort_and_insert(self):
+        self.assertEqual(list(self.playlist), ["/b", "/a", "/c"])
+        self.playlist.add("/d")
+        self.assertEqual(list(self.playlist), ["/b", "/a", "/d", "/c"])
+        self.playlist.sort_by("title", reverse=True)
+        self.assertEqual(list(self.playlist), ["/a", "/d", "/b", "/c"])
+        self.playlist.add("/./b")
+        self.assertEqual(list(self.playlist), ["/a", "/d", "/b", "/./b", "/c"])
+
+    def test_remove(self):
+        self.playlist.add("/d")
+        self.playlist.remove("/a", "/c")
+        self.assertEqual(list(self.playlist), ["/b", "/d"])
+        with self.assertRaises(ValueError):
+            self.playlist.remove("/a")
+
+    def test_retag_moves_the_song(self):
+        self.tags["/b"]["artist"] = "Oasis"
+        Playlist.invalidate_collation_keys("/b")
+        self.assertEqual(list(self.playlist), ["/a", "/c", "/b"])
+        self.playlist.add("/d")
+        self.assertEqual(list(self.playlist), ["/a", "/d", "/c", "/b"])
+        self.playlist.remove("/b")
+        self.assertEqual(list(self.playlist), ["/a", "/d", "/c"])
+
+    def test_invalidating_every_key_resorts(self):
+        self.tags["/c"]["artist"] = "A-ha"
+        Playlist.invalidate_collation_keys()
+        self.assertEqual(list(self.playlist), ["/c", "/b", "/a"])
+        self.playlist.remove("/c")
+        self.assertEqual(list(self.playlist), ["/b", "/a"])
+
+    def test_unsorted_playlists_are_left_in_place(self):
+        unsorted = Playlist(f"{self.id()}-unsorted", "/a", "/b")
+        self.tags["/b"]["artist"] = "Oasis"
+        Playlist.invalidate_collation_keys("/b")
+        self.assertEqual(list(unsorted), ["/a", "/b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
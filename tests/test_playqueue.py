@@ -0,0 +1,115 @@
+import random
+import unittest
+from src.utils.audio.audioplayer.playqueue import PlayQueue
+
+
+class PlayQueueTestCase(unittest.TestCase):
+    def setUp(self):
+        self.queue = PlayQueue("abcde")
+
+    def test_advance_and_retreat(self):
+        self.assertEqual(self.queue.index, -1)
+        self.assertEqual(self.queue.advance(), "a")
+        self.assertEqual(self.queue.advance(), "b")
+        self.assertEqual((self.queue.index, self.queue.history_length, self.queue.upcoming_length), (1, 1, 3))
+        self.assertEqual(self.queue.retreat(), "a")
+        self.assertEqual(list(self.queue.iter_upcoming()), ["b", "c", "d", "e"])
+
+    def test_advance_past_the_end_rewinds(self):
+        for _ in range(5):
+            self.queue.advance()
+        self.assertIsNone(self.queue.advance())
+        self.assertIsNone(self.queue.current)
+        self.assertEqual(list(self.queue), list("abcde"))
+
+    def test_contains_compares_by_equality(self):
+        queue = PlayQueue(["/a.mp3", "/b.mp3"])
+        queue.advance()
+        # Equal but distinct strings, as read back from a saved session
+        current = "".join(["/a", ".mp3"])
+        self.assertIn(current, queue)
+        queue.advance()
+        self.assertIn(current, queue)
+        self.assertIn("/b.mp3", queue)
+        self.assertNotIn(None, queue)
+
+    def test_retreat_without_history_wraps_around(self):
+        self.assertEqual(self.queue.retreat(), "e")
+        self.assertEqual(self.queue.history_length, 4)
+
+    def test_enqueue_both_ends(self):
+        self.queue.advance()
+        self.queue.appendleft("x")
+        self.queue.extendleft("yz")
+        self.queue.append("w")
+        self.assertEqual(list(self.queue.iter_upcoming()), ["y", "z", "x", "b", "c", "d", "e", "w"])
+        self.assertEqual(len(self.queue), 9)
+
+    def test_move_and_remove_upcoming(self):
+        self.queue.move(0, -1)
+        self.assertEqual(self.queue.remove_upcoming(-1), "a")
+        self.assertEqual(list(self.queue.iter_upcoming()), ["b", "c", "d", "e"])
+        with self.assertRaises(IndexError):
+            self.queue.peek(4)
+
+    def test_set_index(self):
+        self.queue.advance()
+        self.queue.set_index(3)
+        self.assertEqual(self.queue.current, "d")
+        self.assertEqual(self.queue.history_length, 3)
+        with self.assertRaises(IndexError):
+            self.queue.set_index(5)
+
+    def test_max_history(self):
+        self.queue.max_history = 2
+        for _ in range(4):
+            self.queue.advance()
+        self.assertEqual(list(self.queue), ["b", "c", "d", "e"])
+        with self.assertRaises(ValueError):
+            self.queue.max_history = -1
+
+    def test_shuffle_plays_every_item_once(self):
+        queue = PlayQueue(range(100), random_generator=random.Random(0))
+        queue.shuffle()
+        self.assertEqual(queue.drawn_length, 0)
+        played = [queue.advance() for _ in range(100)]
+        self.assertEqual(sorted(played), list(range(100)))
+        self.assertNotEqual(played, list(range(100)))
+
+    def test_shuffle_is_reproducible_with_a_seeded_generator(self):
+        orders = []
+        for _ in range(2):
+            queue = PlayQueue(range(20), random_generator=random.Random(42))
+            queue.shuffle()
+            orders.append([queue.advance() for _ in range(20)])
+        self.assertEqual(orders[0], orders[1])
+
+    def test_shuffle_keeps_drawn_items(self):
+        self.queue.shuffle(keep_drawn=2)
+        self.assertEqual((self.queue.peek(0), self.queue.peek(1)), ("a", "b"))
+
+    def test_unshuffle_restores_the_original_order(self):
+        queue = PlayQueue(range(10), random_generator=random.Random(1))
+        queue.shuffle()
+        queue.advance()
+        queue.append(10)
+        queue.appendleft(-1)
+        queue.unshuffle()
+        upcoming = list(queue.iter_upcoming())
+        self.assertEqual(upcoming[0], -1)
+        self.assertEqual(upcoming[1:], sorted(upcoming[1:]))
+        self.assertEqual(upcoming[-1], 10)
+
+    def test_sequences_round_trip(self):
+        queue = PlayQueue(range(10), random_generator=random.Random(2))
+        queue.shuffle()
+        queue.peek(3)
+        items, sequences = list(queue.iter_upcoming()), queue.get_sequences()
+        restored = PlayQueue(items)
+        restored.shuffle(keep_drawn=4, sequences=sequences)
+        restored.unshuffle()
+        self.assertEqual(list(restored.iter_upcoming()), list(range(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import os
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from kivy.clock import Clock
+from src.utils.audio.audioplayer import AudioPlayer
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound
+from src.utils.audio.audioplayer.recorder import SessionRecorder, SessionReplayer
+
+
+def read_records(file_path):
+    with open(file_path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+def record_session(player, file_path):
+    with SessionRecorder(player, file_path) as recorder:
+        player = recorder.player
+        player.play()
+        player.wait_prefetches()
+        player.volume = 0.5
+        VirtualSound.clock.advance_to_end()
+        player.wait_prefetches()
+        player.skip_to_next()
+        player.wait_prefetches()
+
+
+class SessionRecorderTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "session.jsonl")
+        self.sources = virtual_sources(3, length=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_only_outside_calls_are_recorded(self):
+        player = AudioPlayer(self.sources)
+        record_session(player, self.file_path)
+        records = read_records(self.file_path)
+        self.assertEqual([record[2] for record in records if record[1] == "call"], ["play", "skip_to_next"])
+        self.assertEqual([record[2:] for record in records if record[1] == "set"], [["volume", 0.5]])
+        self.assertEqual(
+            [record[3][0] for record in records if record[2] == "on_track_started"], self.sources
+        )
+        player.unload()
+
+    def test_random_states_are_recorded_without_reseeding(self):
+        player = AudioPlayer(self.sources, shuffle=True, random_generator=random.Random(42))
+        expected_state = player.random_generator.getstate()
+        with SessionRecorder(player, self.file_path) as recorder:
+            self.assertEqual(player.random_generator.getstate(), expected_state)
+            recorder.player.reshuffle()
+        records = read_records(self.file_path)
+        self.assertEqual(records[0][2]["random_state"][1], list(expected_state[1]))
+        self.assertEqual([record[1] for record in records[1:3]], ["random_state", "call"])
+        self.assertEqual(records[2][2], "reshuffle")
+        player.unload()
+
+    def test_the_player_is_left_untouched(self):
+        player = AudioPlayer(self.sources)
+        first = SessionRecorder(player, self.file_path)
+        second_file_path = os.path.join(self.directory, "second.jsonl")
+        second = SessionRecorder(first.player, second_file_path)
+        self.assertIs(type(player), AudioPlayer)
+        self.assertNotIn("play", vars(player))
+        first.player.volume = 0.5
+        player.volume = 0.4
+        first.close()
+        second.player.volume = 0.3
+        second.close()
+        second.player.volume = 0.2
+        self.assertEqual(player.volume, 0.2)
+        first_sets = [record[2:] for record in read_records(self.file_path) if record[1] == "set"]
+        second_sets = [record[2:] for record in read_records(second_file_path) if record[1] == "set"]
+        self.assertEqual(first_sets, [["volume", 0.5]])
+        self.assertEqual(second_sets, [["volume", 0.5], ["volume", 0.3]])
+        player.unload()
+
+
+class SessionReplayerTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.directory = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.directory, "session.jsonl")
+        self.sources = virtual_sources(3, length=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_session(self, player, *records):
+        # Recorded timestamps are real seconds, the records following the start are timed by hand
+        SessionRecorder(player, self.file_path).close()
+        player.unload()
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+
+    def test_replayed_events_match(self):
+        self.write_session(
+            AudioPlayer(self.sources),
+            [0, "call", "play", [], {}],
+            [0, "event", "on_track_started", [self.sources[0], 1]],
+            [1, "event", "on_track_ended", [self.sources[0]]],
+            [1, "event", "on_track_started", [self.sources[1], 1]],
+            [1.5, "call", "skip_to_next", [], {}],
+            [1.5, "event", "on_track_started", [self.sources[2], 1]],
+        )
+        replayer = SessionReplayer(self.file_path)
+        self.assertTrue(replayer.replay()["events_match"])
+        replayer.player.unload()
+
+    def test_shuffled_session_is_replayed_in_the_same_order(self):
+        player = AudioPlayer(virtual_sources(30, length=1), shuffle=True)
+        player.play()
+        player.wait_prefetches()
+        with SessionRecorder(player, self.file_path) as recorder:
+            for index in range(8):
+                if index == 4:
+                    recorder.player.reshuffle()
+                recorder.player.skip_to_next()
+                player.wait_prefetches()
+        player.unload()
+        replayer = SessionReplayer(self.file_path)
+        self.assertTrue(replayer.replay()["events_match"])
+        replayer.player.unload()
+
+    def test_gains_are_set_on_the_replayed_sources(self):
+        self.write_session(
+            AudioPlayer(self.sources),
+            [0, "call", "set_gain", [self.sources[1], -6], {}],
+            [0, "call", "set_gain", [], {"item": self.sources[2], "gain": 3}],
+        )
+        replayer = SessionReplayer(self.file_path)
+        replayer.replay()
+        self.assertEqual([queue_entry.gain for queue_entry in replayer.player], [None, -6, 3])
+        replayer.player.unload()
+
+    def test_kivy_clock_gets_its_time_source_back(self):
+        self.write_session(AudioPlayer(self.sources), [0, "call", "play", [], {}], [60, "set", "volume", 1])
+        replayer = SessionReplayer(self.file_path)
+        replayer.replay()
+        self.assertNotIn("time", Clock.__dict__)
+        # Neither an hour ahead nor waiting for the time source to catch up
+        self.assertAlmostEqual(Clock.get_time(), Clock.time(), delta=1)
+        fired = []
+        Clock.schedule_once(lambda dt: fired.append(dt), 0)
+        Clock.tick()
+        self.assertEqual(len(fired), 1)
+        replayer.player.unload()
+
+    def test_crossfade_fires_while_replaying(self):
+        self.write_session(
+            AudioPlayer(self.sources, crossfade=0.3),
+            [0, "call", "play", [], {}],
+            [0, "event", "on_track_started", [self.sources[0], 1]],
+            [0.7, "event", "on_track_ended", [self.sources[0]]],
+            [0.7, "event", "on_track_started", [self.sources[1], 1]],
+            [1.2, "set", "volume", 1],
+        )
+        replayer = SessionReplayer(self.file_path)
+        self.assertTrue(replayer.replay()["events_match"])
+        # Switched by the clock event of the crossfade at 0.7 s, not by the track end at 1 s
+        self.assertEqual(replayer.replayed_events, [
+            ["on_track_started", [self.sources[0]]],
+            ["on_track_ended", [self.sources[0]]],
+            ["on_track_started", [self.sources[1]]],
+        ])
+        self.assertEqual(len(replayer.player.transition_latencies), 1)
+        replayer.player.unload()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from src.utils.audio.audioplayer.ringbuffer import RingBuffer
+
+
+class RingBufferTestCase(unittest.TestCase):
+    def setUp(self):
+        self.ring_buffer = RingBuffer(8, alignment=2)
+
+    def test_write_stops_when_full(self):
+        self.assertEqual(self.ring_buffer.write(b"0123456789"), 8)
+        self.assertEqual(self.ring_buffer.free, 0)
+        self.assertEqual(self.ring_buffer.write(b"ab"), 0)
+        self.assertEqual(self.ring_buffer.read(100), b"01234567")
+
+    def test_read_is_empty_when_underrun(self):
+        self.assertEqual(self.ring_buffer.read(4), b"")
+        self.ring_buffer.write(b"01")
+        self.assertEqual(self.ring_buffer.read(4), b"01")
+        self.assertEqual(self.ring_buffer.read(4), b"")
+        self.assertEqual(self.ring_buffer.available, 0)
+
+    def test_reads_whole_frames_only(self):
+        self.ring_buffer.write(b"012")
+        self.assertEqual(self.ring_buffer.read(3), b"01")
+        self.assertEqual(self.ring_buffer.read(3), b"")
+        self.ring_buffer.write(b"3")
+        self.assertEqual(self.ring_buffer.read(3), b"23")
+
+    def test_wraparound(self):
+        self.ring_buffer.write(b"012345")
+        self.assertEqual(self.ring_buffer.read(4), b"0123")
+        # Split across the end of the buffer on both sides
+        self.assertEqual(self.ring_buffer.write(b"abcdef"), 6)
+        self.assertEqual(self.ring_buffer.free, 0)
+        self.assertEqual(self.ring_buffer.read(8), b"45abcdef")
+        for _ in range(10):
+            self.assertEqual(self.ring_buffer.write(b"xyz0"), 4)
+            self.assertEqual(self.ring_buffer.read(6), b"xyz0")
+
+    def test_clear(self):
+        self.ring_buffer.write(b"0123")
+        self.ring_buffer.clear()
+        self.assertEqual(self.ring_buffer.available, 0)
+        self.assertEqual(self.ring_buffer.free, 8)
+
+    def test_capacity_must_be_whole_frames(self):
+        with self.assertRaises(ValueError):
+            RingBuffer(7, alignment=2)
+        with self.assertRaises(ValueError):
+            RingBuffer(0)
+
+
+if __name__ == '__main__':
+    unittest.main()
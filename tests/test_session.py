@@ -0,0 +1,103 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from kivy.clock import Clock
+from src.utils.audio.audioplayer import AudioPlayer, session
+from src.utils.audio.audioplayer.session import write_snapshot, read_snapshot, restore_session, SessionAutosaver
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+
+
+def tick_for(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        time.sleep(0.005)
+        Clock.tick()
+
+
+class SessionTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sources = virtual_sources(4, length=60)
+        self.player = AudioPlayer(self.sources, volume=0.7, loop=True, estimate_position=False)
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, "session.json")
+
+    def tearDown(self):
+        self.player.unload()
+        self.directory.cleanup()
+
+    def play_second_track(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        self.player.skip_to_next()
+        self.player.wait_prefetches()
+        self.player.seek(12.5)
+        self.player.set_gain(self.sources[2], -3)
+
+    def test_snapshot_round_trip(self):
+        self.play_second_track()
+        write_snapshot(self.player.snapshot(), self.file_path)
+        restored = restore_session(self.file_path, prefetch=1)
+        self.assertEqual(restored.snapshot(), self.player.snapshot())
+        self.assertEqual((restored.volume, restored.source), (0.7, self.sources[1]))
+        # Nothing is loaded but the prefetch window, playback resumes from the saved position
+        self.assertEqual(len(restored.sound_pool) + len(restored.get_prefetch_futures()), 2)
+        restored.play()
+        restored.wait_prefetches()
+        self.assertEqual(restored.get_pos(), 12.5)
+        restored.unload()
+
+    def test_shuffled_order_is_restored(self):
+        self.player.shuffle = True
+        self.play_second_track()
+        restored = AudioPlayer.from_snapshot(self.player.snapshot())
+        self.assertEqual(
+            [queue_entry.source for queue_entry in restored],
+            [queue_entry.source for queue_entry in self.player],
+        )
+        self.assertTrue(restored.shuffle)
+        restored.unload()
+
+    def test_unreadable_sessions(self):
+        self.assertIsNone(restore_session(self.file_path))
+        with open(self.file_path, "w") as file:
+            file.write("{")
+        self.assertIsNone(read_snapshot(self.file_path))
+
+    def test_interrupted_writes_keep_the_previous_session(self):
+        write_snapshot(self.player.snapshot(), self.file_path)
+        with mock.patch.object(session.json, "dump", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                write_snapshot({}, self.file_path)
+        self.assertEqual(read_snapshot(self.file_path), self.player.snapshot())
+
+    def test_autosave_is_debounced(self):
+        with mock.patch.object(session, "write_snapshot") as write:
+            autosaver = SessionAutosaver(self.player, self.file_path, delay=0.1, interval=None)
+            self.play_second_track()
+            self.player.stop()
+            self.assertEqual(write.call_count, 0)
+            tick_for(0.3)
+            self.assertEqual(write.call_count, 1)
+            self.assertEqual(write.call_args.args, (self.player.snapshot(), self.file_path))
+            autosaver.close()
+            self.assertEqual(write.call_count, 2)
+            self.player.play()
+            tick_for(0.3)
+            self.assertEqual(write.call_count, 2)
+
+    def test_autosave_interval(self):
+        with mock.patch.object(session, "write_snapshot") as write:
+            autosaver = SessionAutosaver(self.player, self.file_path, delay=1, interval=0.05)
+            tick_for(0.3)
+            self.assertGreaterEqual(write.call_count, 2)
+            autosaver.close(save=False)
+            call_count = write.call_count
+            tick_for(0.2)
+            self.assertEqual(write.call_count, call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from src.utils.audio import silence
+from src.utils.audio.silence import find_trim_points, TrimPointCache
+
+
+class FakeDecoder:
+    """
+    Decoder of fake audio files describing their mono content, e.g "silence:0.5,sine:1,silence:0.7"
+    """
+    channels = 1
+
+    def __init__(self, source, sample_rate):
+        with open(source) as file:
+            description = file.read()
+        if description == "corrupted":
+            raise ValueError(f"unable to decode {source!r}")
+        parts = []
+        for part in description.split(","):
+            kind, duration = part.split(":")
+            frames = np.arange(int(float(duration) * sample_rate))
+            amplitude = {"silence": 0, "noise": 10 ** (-70 / 20), "sine": 0.5}[kind]
+            parts.append(amplitude * np.sin(2 * np.pi * 440 * frames / sample_rate))
+        self._data = np.round(np.concatenate(parts) * 32767).astype(np.int16).tobytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def read(self, frames):
+        data, self._data = self._data[:frames * 2], self._data[frames * 2:]
+        return data
+
+
+class SilenceTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        patchers = (
+            mock.patch.object(silence, "PCMDecoder", FakeDecoder),
+            # Scanned on threads, so the workers see the fake decoder
+            mock.patch.object(
+                silence, "ProcessPoolExecutor", lambda max_workers, mp_context: ThreadPoolExecutor(max_workers)
+            ),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_audio_file(self, name, description):
+        file_path = os.path.join(self.directory.name, name)
+        with open(file_path, "w") as file:
+            file.write(description)
+        return file_path
+
+    def test_edges_are_trimmed_with_a_margin(self):
+        start, end = find_trim_points(self.write_audio_file("a.wav", "silence:0.5,sine:1,noise:0.7"))
+        self.assertAlmostEqual(start, 0.4, delta=0.05)
+        self.assertAlmostEqual(end, 1.6, delta=0.05)
+
+    def test_quiet_passages_are_kept(self):
+        start, end = find_trim_points(self.write_audio_file("a.wav", "sine:0.5,silence:1,sine:0.5"), margin=0)
+        self.assertEqual((start, end), (0, 2))
+
+    def test_silent_audio_files_are_not_trimmed(self):
+        self.assertEqual(find_trim_points(self.write_audio_file("a.wav", "silence:1.5")), (0, 1.5))
+        # Noise above the threshold is audible
+        self.assertEqual(find_trim_points(self.write_audio_file("b.wav", "noise:1"), threshold=-80), (0, 1))
+
+    def test_cache(self):
+        trimmed = self.write_audio_file("trimmed.wav", "silence:1,sine:1")
+        self.write_audio_file("corrupted.wav", "corrupted")
+        cache_file_path = os.path.join(self.directory.name, "cache", "trim_points.json")
+        cache = TrimPointCache(cache_file_path, workers=2)
+        self.assertIsNone(cache.get_trim_points(trimmed))
+        stats = cache.scan([trimmed, *(os.path.join(self.directory.name, name) for name in ("corrupted.wav", "missing.wav"))])
+        self.assertEqual((stats["scanned"], stats["errors"], stats["tracks"]), (1, 1, 1))
+        self.assertAlmostEqual(cache.get_trim_points(trimmed)[0], 0.9, delta=0.05)
+        # Audio files which did not change are not scanned again, unless the settings changed
+        self.assertEqual(TrimPointCache(cache_file_path).scan([trimmed])["scanned"], 0)
+        self.assertEqual(TrimPointCache(cache_file_path, margin=0).scan([trimmed])["scanned"], 1)
+        with open(trimmed, "w") as file:
+            file.write("sine:2")
+        self.assertIsNone(cache.get_trim_points(trimmed))
+
+
+if __name__ == '__main__':
+    unittest.main()
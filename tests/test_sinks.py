@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import wave
+import tempfile
+import unittest
+from src.utils.audio.audioplayer.sinks import DeviceSink, FileSink, NullSink
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+# A tenth of a second of silence
+BLOCK = bytes(SAMPLE_RATE // 10 * CHANNELS * 2)
+# Playback tool reading its input to the end, then taking a while to play it out
+SLOW_DEVICE = (sys.executable, "-c", "import sys, time; sys.stdin.buffer.read(); time.sleep(0.5)")
+
+
+class NullSinkTestCase(unittest.TestCase):
+    def test_not_realtime(self):
+        sink = NullSink(realtime=False)
+        sink.open(SAMPLE_RATE, CHANNELS)
+        start = time.monotonic()
+        for _ in range(10):
+            sink.write(BLOCK)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(sink.frames_written, SAMPLE_RATE)
+        self.assertEqual(sink.latency, 0)
+        self.assertTrue(sink.drained)
+
+    def test_realtime(self):
+        sink = NullSink()
+        sink.open(SAMPLE_RATE, CHANNELS)
+        start = time.monotonic()
+        for _ in range(3):
+            sink.write(BLOCK)
+        # The last block is still queued
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertGreater(sink.latency, 0)
+        self.assertFalse(sink.drained)
+        time.sleep(sink.latency)
+        self.assertTrue(sink.drained)
+
+
+class FileSinkTestCase(unittest.TestCase):
+    def test_writes_a_wav_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, "output.wav")
+            sink = FileSink(file_path)
+            sink.open(SAMPLE_RATE, CHANNELS)
+            sink.write(BLOCK)
+            sink.write(BLOCK)
+            sink.close()
+            with wave.open(file_path, "rb") as wave_file:
+                self.assertEqual(wave_file.getframerate(), SAMPLE_RATE)
+                self.assertEqual(wave_file.getnchannels(), CHANNELS)
+                self.assertEqual(wave_file.getnframes(), SAMPLE_RATE // 5)
+
+
+class DeviceSinkTestCase(unittest.TestCase):
+    def setUp(self):
+        self.sink = DeviceSink((SLOW_DEVICE,), device_latency=0.05)
+        self.sink.open(SAMPLE_RATE, CHANNELS)
+
+    def tearDown(self):
+        self.sink.close()
+
+    def test_latency(self):
+        self.assertEqual(self.sink.latency, 0)
+        self.sink.write(BLOCK)
+        self.sink.write(BLOCK)
+        self.assertGreater(self.sink.latency, 0.2)
+        self.assertLessEqual(self.sink.latency, 0.25)
+
+    def test_finish_lets_the_device_play_out(self):
+        self.sink.write(BLOCK)
+        self.sink.finish()
+        self.assertFalse(self.sink.drained)
+        deadline = time.monotonic() + 5
+        while not self.sink.drained and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(self.sink.drained)
+        self.assertEqual(self.sink.latency, 0)
+
+    def test_close_drops_the_buffered_frames(self):
+        self.sink.write(BLOCK)
+        start = time.monotonic()
+        self.sink.close()
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertTrue(self.sink.drained)
+
+    def test_missing_device(self):
+        sink = DeviceSink((("no-such-playback-tool",),))
+        with self.assertRaises(OSError):
+            sink.open(SAMPLE_RATE, CHANNELS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import time
+import unittest
+from src.utils.audio.playlist import Playlist
+from src.utils.audio.smart_playlist import Rule, AddedWithin, SmartPlaylist, TrackLibrary, SECONDS_PER_DAY
+
+NOW = time.time()
+
+
+class SmartPlaylistTestCase(unittest.TestCase):
+    def setUp(self):
+        self.library = TrackLibrary(tags_reader=lambda song: {})
+        self.jazz = SmartPlaylist(f"{self.id()}-jazz", Rule("genre", "==", "Jazz"))
+        self.recent = SmartPlaylist(f"{self.id()}-recent", AddedWithin(7))
+        self.library.subscribe(self.jazz)
+        self.library.subscribe(self.recent)
+
+    def test_membership_follows_tags(self):
+        self.library.add("/a", genre="Jazz", added=NOW)
+        self.library.add("/b", genre="Rock", added=NOW)
+        self.assertEqual(list(self.jazz), ["/a"])
+        self.library.retag("/b", genre="Jazz")
+        self.assertEqual(self.jazz[:], ["/a", "/b"])
+        self.library.retag("/a", genre="Rock")
+        self.library.remove("/b")
+        self.assertEqual(len(self.jazz), 0)
+        self.assertEqual(self.jazz[:], [])
+
+    def test_subscribe_populates_from_library(self):
+        self.library.add("/a", genre="Jazz", added=NOW)
+        late = SmartPlaylist(f"{self.id()}-late", Rule("genre", "in", ("Jazz", "Blues")))
+        self.library.subscribe(late)
+        self.assertIn("/a", late)
+
+    def test_shuffle_materializes(self):
+        self.library.add("/a", genre="Jazz", added=NOW)
+        self.library.add("/b", genre="Jazz", added=NOW)
+        self.assertEqual(sorted(self.jazz.shuffle()), ["/a", "/b"])
+
+    def test_set_operations(self):
+        self.library.add("/a", genre="Jazz", added=NOW)
+        self.library.add("/b", genre="Jazz", added=NOW)
+        self.library.add("/c", genre="Rock", added=NOW - 30 * SECONDS_PER_DAY)
+        union = self.jazz.union(self.recent, name=f"{self.id()}-union")
+        self.assertIs(type(union), Playlist)
+        self.assertEqual(list(union), ["/a", "/b"])
+        self.assertEqual(list(self.jazz.union(["/c"], name=f"{self.id()}-union-c")), ["/a", "/b", "/c"])
+        self.assertEqual(list(self.jazz.intersection(["/b", "/a"], name=f"{self.id()}-intersection")), ["/a", "/b"])
+        self.assertEqual(list(self.jazz.difference(["/a"], name=f"{self.id()}-difference")), ["/b"])
+        self.assertEqual(list(Playlist(f"{self.id()}-all", "/a", "/c").difference(
+            self.jazz, name=f"{self.id()}-not-jazz")), ["/c"])
+        with self.assertRaises(TypeError):
+            self.jazz.dedupe()
+
+    def test_read_only(self):
+        with self.assertRaises(TypeError):
+            self.jazz.add("/a")
+        with self.assertRaises(TypeError):
+            self.jazz.shuffle(return_copy=False)
+
+    def test_expire(self):
+        self.library.add("/a", genre="Jazz", added=NOW)
+        self.library.add("/b", genre="Jazz", added=NOW + 2 * SECONDS_PER_DAY)
+        self.recent.expire(NOW + 3 * SECONDS_PER_DAY)
+        self.assertEqual(list(self.recent), ["/a", "/b"])
+        self.recent.expire(NOW + 8 * SECONDS_PER_DAY)
+        self.assertEqual(list(self.recent), ["/b"])
+        self.recent.expire(NOW + 10 * SECONDS_PER_DAY)
+        self.assertEqual(list(self.recent), [])
+
+    def test_retag_invalidates_previous_expiration(self):
+        self.library.add("/a", added=NOW)
+        self.library.retag("/a", added=NOW + 5 * SECONDS_PER_DAY)
+        self.recent.expire(NOW + 8 * SECONDS_PER_DAY)
+        self.assertIn("/a", self.recent)
+
+    def test_expiration_heap_stays_bounded(self):
+        self.library.add("/a", added=NOW)
+        for index in range(1000):
+            self.library.retag("/a", added=NOW + index)
+            self.library.add(f"/removed-{index}", added=NOW)
+            self.library.remove(f"/removed-{index}")
+        self.assertLess(len(self.recent._expirations), 100)
+
+    def test_malformed_added_tag_never_matches(self):
+        self.library.add("/a", genre="Jazz", added="yesterday")
+        self.assertNotIn("/a", self.recent)
+        self.assertIn("/a", self.jazz)
+
+
+if __name__ == '__main__':
+    unittest.main()
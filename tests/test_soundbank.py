@@ -0,0 +1,89 @@
+import unittest
+from src.utils.audio.audioplayer import AudioPlayer, SoundBank
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend
+from src.utils.audio.audioplayer._virtual_player_integration import VirtualSound, virtual_source
+
+CLICK = virtual_source("click", length=0.1)
+
+
+class SoundBankTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.sound_bank = SoundBank(voices=2)
+        self.sound_bank.register("click", CLICK)
+
+    def tearDown(self):
+        self.sound_bank.unregister("click")
+
+    def test_voices_play_polyphonically(self):
+        first_sound = self.sound_bank.trigger("click")
+        VirtualSound.clock.advance(0.05)
+        second_sound = self.sound_bank.trigger("click", volume=0.5)
+        self.assertIsNot(first_sound, second_sound)
+        self.assertEqual((first_sound.state, second_sound.state), ("play", "play"))
+        self.assertEqual(second_sound.volume, 0.5)
+        self.assertEqual(len(self.sound_bank.latencies), 2)
+
+    def test_the_oldest_voice_is_stolen(self):
+        first_sound = self.sound_bank.trigger("click")
+        VirtualSound.clock.advance(0.05)
+        self.sound_bank.trigger("click")
+        VirtualSound.clock.advance(0.01)
+        third_sound = self.sound_bank.trigger("click")
+        self.assertIs(third_sound, first_sound)
+        self.assertEqual(third_sound.state, "play")
+        self.assertEqual(third_sound.get_pos(), 0)
+
+    def test_stopped_voices_start_over(self):
+        first_sound = self.sound_bank.trigger("click")
+        VirtualSound.clock.advance(0.05)
+        self.sound_bank.stop_all()
+        self.assertIs(self.sound_bank.trigger("click"), first_sound)
+        self.assertEqual(first_sound.get_pos(), 0)
+
+    def test_idle_voices_are_reused(self):
+        first_sound = self.sound_bank.trigger("click")
+        VirtualSound.clock.advance_to_end()
+        self.assertIs(self.sound_bank.trigger("click"), first_sound)
+
+    def test_stop_all(self):
+        sounds = [self.sound_bank.trigger("click") for _ in range(2)]
+        self.sound_bank.stop_all()
+        self.assertEqual([sound_obj.state for sound_obj in sounds], ["stop", "stop"])
+
+    def test_unknown_audio_file(self):
+        with self.assertRaises(ValueError):
+            self.sound_bank.register("missing", "missing.unknown-extension")
+        self.assertNotIn("missing", self.sound_bank)
+
+
+class AudioPlayerAliasTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        AudioPlayer.register("click", CLICK, voices=3)
+
+    def tearDown(self):
+        AudioPlayer.register("click", CLICK)
+        del AudioPlayer._aliases["click"]
+
+    def test_registered_voices_are_triggered(self):
+        self.assertIn("click", AudioPlayer.sound_bank())
+        sounds = {AudioPlayer.trigger("click") for _ in range(3)}
+        self.assertEqual(len(sounds), 3)
+
+    def test_registering_without_voices_unregisters_them(self):
+        AudioPlayer.register("click", CLICK)
+        self.assertNotIn("click", AudioPlayer.sound_bank())
+        self.assertEqual(AudioPlayer.get_alias("click"), CLICK)
+
+    def test_the_queue_plays_its_own_sound_object(self):
+        player = AudioPlayer(["click"])
+        player.play()
+        player.wait_prefetches()
+        self.assertEqual(player.source, CLICK)
+        self.assertNotIn(player.current_entry.sound, {AudioPlayer.trigger("click") for _ in range(3)})
+        player.unload()
+
+
+if __name__ == '__main__':
+    unittest.main()
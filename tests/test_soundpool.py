@@ -0,0 +1,87 @@
+import unittest
+from src.utils.audio.audioplayer import AudioPlayer, SoundPool
+from src.utils.audio.audioplayer.playqueue import QueueEntry
+from src.utils.audio.audioplayer.benchmark import register_virtual_backend, virtual_sources
+
+SIZES = {
+    "a.mp3": 400,
+    "b.mp3": 300,
+    "c.mp3": 200,
+    "d.mp3": 100,
+}
+
+
+class SoundPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        self.pool = SoundPool(max_sounds=3, size_function=SIZES.__getitem__)
+        self.entries = [QueueEntry(source) for source in SIZES]
+
+    def test_least_recently_used_entries_are_evicted(self):
+        for queue_entry in self.entries:
+            self.pool.add(queue_entry)
+        self.assertTrue(self.pool.access(self.entries[0]))
+        self.assertEqual(self.pool.evict(), [self.entries[1]])
+        self.assertEqual(list(self.pool), [self.entries[2], self.entries[3], self.entries[0]])
+        self.assertEqual(self.pool.memory, 700)
+
+    def test_protected_entries_are_kept(self):
+        for queue_entry in self.entries:
+            self.pool.add(queue_entry)
+        self.assertEqual(self.pool.evict(protected=self.entries[:2]), [self.entries[2]])
+        self.assertIn(self.entries[0], self.pool)
+
+    def test_memory_cap(self):
+        self.pool.max_memory = 500
+        for queue_entry in self.entries[:3]:
+            self.pool.add(queue_entry)
+        self.assertEqual(self.pool.evict(), [self.entries[0]])
+        self.assertEqual(self.pool.memory, 500)
+
+    def test_stats(self):
+        self.pool.add(self.entries[0])
+        self.pool.access(self.entries[0])
+        self.pool.access(self.entries[1])
+        self.pool.touch(self.entries[0])
+        self.assertEqual(
+            self.pool.stats(),
+            {"hits": 1, "misses": 1, "evictions": 0, "sounds": 1, "memory": 400},
+        )
+        self.pool.discard(self.entries[0])
+        self.pool.reset_stats()
+        self.assertEqual(self.pool.stats(), {"hits": 0, "misses": 0, "evictions": 0, "sounds": 0, "memory": 0})
+
+
+class AudioPlayerSoundPoolTestCase(unittest.TestCase):
+    def setUp(self):
+        register_virtual_backend()
+        self.player = AudioPlayer(virtual_sources(5, length=1), prefetch=1, max_sounds=2)
+
+    def tearDown(self):
+        self.player.unload()
+
+    def skip_through(self):
+        self.player.play()
+        self.player.wait_prefetches()
+        for _ in range(4):
+            self.player.skip_to_next()
+            self.player.wait_prefetches()
+
+    def test_played_audio_files_are_unloaded_when_evicted(self):
+        self.skip_through()
+        self.assertEqual(len(self.player.sound_pool), 2)
+        loaded = [queue_entry.source for queue_entry in self.player.sound_pool]
+        self.assertEqual(loaded, [virtual_sources(5, length=1)[3], self.player.source])
+        self.assertEqual(self.player.sound_pool.evictions, 3)
+
+    def test_evicted_audio_files_are_reloaded(self):
+        self.skip_through()
+        self.player.skip_to_previous()
+        self.player.skip_to_previous()
+        self.player.wait_prefetches()
+        self.assertEqual(self.player.state, "play")
+        self.assertEqual(self.player.source, virtual_sources(5, length=1)[2])
+        self.assertEqual(self.player.current_entry.sound.state, "play")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from src.utils.audio.audioplayer.telemetry import HISTOGRAM_BOUNDS, TIMINGS, COUNTERS, Histogram, PlayerTelemetry
+
+
+class HistogramTestCase(unittest.TestCase):
+    def test_empty(self):
+        histogram = Histogram()
+        self.assertEqual(len(histogram), 0)
+        self.assertIsNone(histogram.mean)
+        self.assertIsNone(histogram.percentile(50))
+        self.assertIsNone(histogram.snapshot()["max_ms"])
+
+    def test_percentiles_are_bucket_upper_bounds(self):
+        histogram = Histogram()
+        for _ in range(99):
+            histogram.record(0.0001)
+        histogram.record(0.1)
+        self.assertEqual(histogram.percentile(50), HISTOGRAM_BOUNDS[0])
+        self.assertEqual(histogram.percentile(99), HISTOGRAM_BOUNDS[0])
+        self.assertEqual(histogram.percentile(100), 0.1)
+        self.assertAlmostEqual(histogram.mean, (99 * 0.0001 + 0.1) / 100)
+
+    def test_percentiles_never_exceed_the_max(self):
+        histogram = Histogram()
+        histogram.record(0.003)
+        self.assertEqual(histogram.percentile(50), 0.003)
+        histogram.record(100)
+        self.assertEqual(histogram.percentile(100), 100)
+        self.assertEqual(histogram.buckets[-1], 1)
+
+    def test_snapshot_and_reset(self):
+        histogram = Histogram()
+        histogram.record(0.002)
+        histogram.record(0.004)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 2)
+        self.assertEqual((snapshot["min_ms"], snapshot["mean_ms"], snapshot["max_ms"]), (2, 3, 4))
+        histogram.reset()
+        self.assertEqual(len(histogram), 0)
+        self.assertEqual(sum(histogram.buckets), 0)
+
+
+class PlayerTelemetryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.telemetry = PlayerTelemetry()
+
+    def test_stats(self):
+        self.telemetry.record("play_dispatch", 0.001)
+        self.telemetry.count("underruns")
+        self.telemetry.count("errors", 2)
+        stats = self.telemetry.stats()
+        self.assertEqual(set(stats["timings"]), set(TIMINGS))
+        self.assertEqual(stats["timings"]["play_dispatch"]["count"], 1)
+        self.assertEqual(stats["counters"], {"underruns": 1, "errors": 2})
+        self.assertEqual(set(self.telemetry.counters), set(COUNTERS))
+
+    def test_unknown_names(self):
+        with self.assertRaises(KeyError):
+            self.telemetry.record("play_to_audible", 0.001)
+        with self.assertRaises(KeyError):
+            self.telemetry.count("warnings")
+
+    def test_reset(self):
+        self.telemetry.record("gap", 0.01)
+        self.telemetry.count("errors")
+        self.telemetry.reset()
+        self.assertEqual(len(self.telemetry.get_histogram("gap")), 0)
+        self.assertEqual(self.telemetry.counters["errors"], 0)
+
+    def test_logging(self):
+        self.telemetry.start_logging(60)
+        self.assertIn("logging=True", repr(self.telemetry))
+        self.telemetry.log_stats()
+        self.telemetry.stop_logging()
+        self.assertIn("logging=False", repr(self.telemetry))
+
+
+if __name__ == '__main__':
+    unittest.main()
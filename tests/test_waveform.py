@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from src.utils.audio import waveform
+from src.utils.audio.waveform import Waveform, WaveformCache
+
+LEVELS = (4, 16)
+
+
+class FakeDecoder:
+    sample_rate = 44100
+    channels = 1
+
+    def __init__(self, samples):
+        self._data = np.asarray(samples, dtype=np.int16).tobytes()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+    def read(self, frames):
+        size = frames * 2
+        data, self._data = self._data[:size], self._data[size:]
+        return data
+
+
+class GenerateWaveformTestCase(unittest.TestCase):
+    def generate(self, samples):
+        waveform._initialize_worker(SimpleNamespace(value=1))
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(waveform, "PCMDecoder", lambda source: FakeDecoder(samples)):
+            data = waveform._generate_waveform("track.mp3", 1, LEVELS, os.path.join(directory, "track.peaks"))
+        return Waveform.from_bytes(data)
+
+    def test_levels(self):
+        samples = np.tile(np.array([-16384, 16384], dtype=np.int16), 16)
+        generated = self.generate(samples)
+        self.assertEqual(generated.frame_count, 32)
+        self.assertEqual(generated.levels, LEVELS)
+        np.testing.assert_array_equal(generated.peaks(8), np.full((8, 2), (-64 / 127, 63 / 127), dtype=np.float32))
+
+    def test_last_coarse_bucket_is_not_padded(self):
+        # 20 frames: the last coarse bucket only holds a single finest bucket, of negative samples
+        samples = np.concatenate((np.full(16, 16384), np.full(4, -16384)))
+        generated = self.generate(samples)
+        np.testing.assert_array_equal(generated._levels[16], ((63, 63), (-64, -64)))
+
+    def test_cancelled(self):
+        waveform._initialize_worker(SimpleNamespace(value=-1))
+        with mock.patch.object(waveform, "PCMDecoder", lambda source: FakeDecoder(np.zeros(32))):
+            self.assertIsNone(waveform._generate_waveform("track.mp3", 1, LEVELS, "unused.peaks"))
+
+
+class WaveformCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = WaveformCache(self.directory.name, levels=LEVELS)
+
+    def tearDown(self):
+        self.cache.close()
+        self.directory.cleanup()
+
+    def test_missing_audio_file(self):
+        source = os.path.join(self.directory.name, "missing.mp3")
+        self.assertIsNone(self.cache.get_cached(source))
+        callback = mock.Mock()
+        future = self.cache.request(source, callback)
+        self.assertTrue(future.done())
+        self.assertIsNone(future.result())
+        callback.assert_not_called()
+
+    def test_cached(self):
+        source = os.path.join(self.directory.name, "track.mp3")
+        with open(source, "wb") as file:
+            file.write(b"audio")
+        cached = Waveform(44100, 4, {4: np.array([[-1, 1]], dtype=np.int8), 16: np.array([[-1, 1]], dtype=np.int8)})
+        with open(self.cache.get_cache_file_path(source), "wb") as file:
+            file.write(cached.to_bytes())
+        self.assertEqual(self.cache.request(source).result().frame_count, 4)
+        self.assertEqual(self.cache.get_cached(source).levels, LEVELS)
+
+
+if __name__ == '__main__':
+    unittest.main()